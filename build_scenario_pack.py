@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compile the QualityQuest, RequirementRally and UsabilityUniverse scenarios
+into a single memory-mapped scenario pack.
+
+Usage:
+    python build_scenario_pack.py [output_path]
+
+Then point the servers at it with SCENARIO_PACK_PATH=<output_path>.
+"""
+
+import os
+import sys
+import time
+
+import quality_scenarios_db
+import requirements_scenarios_db
+import usability_scenarios_db
+from iso_standards_games.core.scenario_pack import ScenarioPack, write_pack
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "scenarios.pack")
+
+
+def build_pack(output_path: str) -> None:
+    """Compile all scenario sources into output_path."""
+    start = time.perf_counter()
+    snapshots = {
+        module.GAME_ID: module.source_catalog.get()
+        for module in (quality_scenarios_db, requirements_scenarios_db, usability_scenarios_db)
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    counts = write_pack(snapshots, output_path)
+    elapsed = time.perf_counter() - start
+
+    # Sanity check: the pack must open and serve the same scenarios
+    pack = ScenarioPack(output_path)
+    for game, snapshot in snapshots.items():
+        packed = pack.snapshot(game)
+        for language in snapshot.languages:
+            assert list(packed.records(language)) == list(snapshot.records(language)), (game, language)
+
+    print(f"✅ Wrote {output_path} ({os.path.getsize(output_path)} bytes) in {elapsed * 1000:.1f} ms")
+    for game, count in counts.items():
+        print(f"   {game}: {count} scenarios")
+
+
+if __name__ == "__main__":
+    build_pack(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Import the QualityQuest, RequirementRally and UsabilityUniverse scenarios
+into the SQLite scenario store.
+
+Usage:
+    python import_scenarios.py [database_url]
+
+The database defaults to DATABASE_URL. Serve scenarios from it with
+SCENARIO_DATABASE=true; re-run the import whenever the sources change.
+"""
+
+import sys
+import time
+
+import quality_scenarios_db
+import requirements_scenarios_db
+import usability_scenarios_db
+from iso_standards_games.core.config import settings
+from iso_standards_games.core.scenario_store import ScenarioStore, sqlite_path, write_store
+
+
+def import_scenarios(database_url: str) -> None:
+    """Import all scenario sources into the database at database_url."""
+    path = sqlite_path(database_url)
+    start = time.perf_counter()
+    snapshots = {
+        module.GAME_ID: module.source_catalog.get()
+        for module in (quality_scenarios_db, requirements_scenarios_db, usability_scenarios_db)
+    }
+    counts = write_store(snapshots, path)
+    elapsed = time.perf_counter() - start
+
+    # Sanity check: the store must serve the same scenarios and buckets
+    store = ScenarioStore(path)
+    for game, snapshot in snapshots.items():
+        stored = store.snapshot(game)
+        for language in snapshot.languages:
+            assert list(stored.records(language)) == list(snapshot.records(language)), (game, language)
+        for key, positions in snapshot.facets.items():
+            filters = dict(zip(snapshot.facets.names, key))
+            assert tuple(stored.facets.bucket(**filters)) == tuple(positions), (game, key)
+
+    print(f"✅ Imported scenarios into {path} in {elapsed * 1000:.1f} ms")
+    for game, count in counts.items():
+        print(f"   {game}: {count} scenarios")
+
+
+if __name__ == "__main__":
+    import_scenarios(sys.argv[1] if len(sys.argv) > 1 else settings.DATABASE_URL)
@@ -18,9 +18,22 @@ class Agent(ABC):
         """
         self.name = name
         self.description = description
-        self.llm = get_llm_provider()
+        self._llm: Optional[LLMInterface] = None
         self.memory: List[Dict[str, Any]] = []
     
+    @property
+    def llm(self) -> LLMInterface:
+        """LLM provider of the agent.
+        
+        Resolved on each use, so an agent outliving ``close_llm_providers()``
+        gets the provider created after it rather than the closed one.
+        """
+        return self._llm if self._llm is not None else get_llm_provider()
+    
+    @llm.setter
+    def llm(self, provider: Optional[LLMInterface]) -> None:
+        self._llm = provider
+    
     def add_to_memory(self, item: Dict[str, Any]) -> None:
         """Add an item to the agent's memory."""
         self.memory.append(item)
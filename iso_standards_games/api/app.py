@@ -6,6 +6,7 @@ from fastapi.staticfiles import StaticFiles
 
 from iso_standards_games.api.routes import router
 from iso_standards_games.core.config import settings
+from iso_standards_games.llm.provider import close_llm_providers
 
 
 def create_app() -> FastAPI:
@@ -26,6 +27,11 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # The game agents share one LLM provider; release its connections
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await close_llm_providers()
+    
     # Include API routes
     app.include_router(router, prefix="/api")
     
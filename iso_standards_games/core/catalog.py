@@ -0,0 +1,411 @@
+"""Process-wide scenario catalogs.
+
+Scenario files are parsed once, frozen, pre-localized and shared by every
+request. A catalog only re-reads its file when the modification stamp changes,
+and only rebuilds its snapshot when the content hash changes, so the request
+path never parses JSON or copies scenarios.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections.abc import Sequence as SequenceABC
+from functools import lru_cache
+from itertools import product
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from iso_standards_games.core.search import SearchIndex
+
+
+class FrozenDict(dict):
+    """Read-only dict used for catalog data shared between requests.
+
+    It is still a ``dict`` subclass so JSON encoding and pydantic validation
+    treat it exactly like the plain dicts the games used before.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Catalog data is read-only; copy it before modifying")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to FrozenDict and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class LazySequence(SequenceABC):
+    """Read-only sequence decoding items on demand (e.g. from a pack or database).
+
+    The most recently used items are kept decoded.
+    """
+
+    def __init__(self, count: int, decode: Callable[[int], Any], cache_size: int = 4096):
+        self._count = count
+        self._decode = lru_cache(maxsize=cache_size)(decode)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("scenario index out of range")
+        return self._decode(index)
+
+
+EMPTY_CATALOG = freeze({"scenarios": [], "game_info": {}})
+
+# Difficulty spellings accepted by every game (matched after normalize_facet)
+DIFFICULTY_ALIASES = {
+    "facil": "easy",
+    "beginner": "easy",
+    "medio": "medium",
+    "media": "medium",
+    "intermedio": "medium",
+    "intermediate": "medium",
+    "dificil": "hard",
+    "advanced": "hard",
+    "avanzado": "hard",
+}
+
+
+def normalize_facet(value: Any) -> str:
+    """Normalize a facet value for index lookups.
+
+    Case, accents and separators are ignored, so "Non-Functional",
+    "non_functional" and "NON FUNCTIONAL" all become "nonfunctional".
+    """
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r"[\W_]+", "", text.lower())
+
+
+class FacetIndex:
+    """Scenario positions bucketed by every combination of facet values.
+
+    A bucket is precomputed for every subset of facets (``None`` meaning "any
+    value"), so a filtered lookup is a single dict access whatever the size of
+    the corpus. Values and aliases are normalized once at build time; only the
+    query values are normalized per request.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        aliases: Optional[Dict[str, Dict[str, str]]] = None,
+    ):
+        """Initialize the index.
+
+        Args:
+            names: Facet names, e.g. ("category", "difficulty", "language")
+            aliases: Optional {facet: {alias: canonical value}} tables
+        """
+        self.names = tuple(names)
+        self.aliases = {
+            name: {normalize_facet(k): normalize_facet(v) for k, v in table.items()}
+            for name, table in (aliases or {}).items()
+        }
+        self._buckets: Dict[Tuple[Optional[str], ...], Any] = {}
+
+    def normalize(self, name: str, value: Any) -> str:
+        """Normalize a value of one facet, resolving aliases."""
+        key = normalize_facet(value)
+        return self.aliases.get(name, {}).get(key, key)
+
+    def add(self, position: int, **values: Any) -> None:
+        """Index a scenario position under its facet values.
+
+        Each value may be a single string or an iterable of strings (e.g. all
+        languages a scenario is written in).
+        """
+        choices = []
+        for name in self.names:
+            value = values.get(name)
+            if value is None or isinstance(value, str):
+                value = [value]
+            normalized = {self.normalize(name, v) for v in value if v}
+            choices.append([None, *sorted(normalized)])
+        for key in product(*choices):
+            self._buckets.setdefault(key, []).append(position)
+
+    def seal(self) -> "FacetIndex":
+        """Freeze the buckets once every scenario has been added.
+
+        A position added several times (once per language, say) is kept once
+        per bucket.
+        """
+        self._buckets = {
+            key: tuple(dict.fromkeys(bucket)) for key, bucket in self._buckets.items()
+        }
+        return self
+
+    @classmethod
+    def from_buckets(
+        cls,
+        names: Sequence[str],
+        aliases: Optional[Dict[str, Dict[str, str]]],
+        buckets: Dict[Tuple[Optional[str], ...], Sequence[int]],
+    ) -> "FacetIndex":
+        """Create an index from already built buckets (e.g. a scenario pack)."""
+        index = cls(names, aliases)
+        index._buckets = buckets
+        return index
+
+    def items(self) -> Iterable[Tuple[Tuple[Optional[str], ...], Sequence[int]]]:
+        """Iterate over (facet key, positions) pairs."""
+        return self._buckets.items()
+
+    def key(self, **filters: Any) -> Tuple[Optional[str], ...]:
+        """Return the normalized bucket key of the given facet values."""
+        return tuple(
+            self.normalize(name, filters[name]) if filters.get(name) else None
+            for name in self.names
+        )
+
+    def bucket(self, **filters: Any) -> Sequence[int]:
+        """Return the sorted positions matching the given facet values.
+
+        Facets that are not given (or are falsy) match any value.
+        """
+        return self._buckets.get(self.key(**filters), ())
+
+
+class CatalogSnapshot:
+    """Immutable, pre-localized view of one scenario catalog.
+
+    ``localized[language][i]`` is the frozen record for ``scenarios[i]`` with
+    every per-language field already resolved, so serving a scenario is an
+    index lookup that returns a shared reference instead of a fresh copy.
+    """
+
+    __slots__ = (
+        "data", "scenarios", "localized", "default_language", "facets", "_positions",
+        "_search",
+    )
+
+    # Serializes the (rare) lazy builds of search indexes
+    _search_lock = threading.Lock()
+
+    def __init__(
+        self,
+        data: Any,
+        localized: Dict[str, Tuple[FrozenDict, ...]],
+        default_language: Optional[str] = None,
+        facets: Optional[FacetIndex] = None,
+    ):
+        """Initialize the snapshot.
+
+        Args:
+            data: Frozen source data (``{"scenarios": [...], ...}``)
+            localized: Pre-built records per language, aligned with ``scenarios``
+            default_language: Language served for unsupported languages, or
+                None to serve nothing
+            facets: Facet index over the scenario positions
+        """
+        self.data = data
+        self.scenarios = data.get("scenarios", ())
+        self.localized = localized
+        self.default_language = default_language
+        self.facets = facets or FacetIndex(()).seal()
+        self._positions: Optional[Dict[str, int]] = None
+        self._search: Optional[SearchIndex] = None
+
+    def position(self, scenario_id: str) -> Optional[int]:
+        """Return the position of a scenario by ID, or None if unknown."""
+        if self._positions is None:
+            self._positions = {
+                scenario.get("id"): i for i, scenario in enumerate(self.scenarios)
+            }
+        return self._positions.get(scenario_id)
+
+    def search_index(self) -> SearchIndex:
+        """Return the full-text index of the records, building it on first use."""
+        if self._search is None:
+            with self._search_lock:
+                if self._search is None:
+                    self._search = SearchIndex(self.localized, self.default_language)
+        return self._search
+
+    @property
+    def languages(self) -> List[str]:
+        return list(self.localized)
+
+    def records(self, language: str) -> Tuple[FrozenDict, ...]:
+        """Return the localized records for a language (with fallback)."""
+        records = self.localized.get(language)
+        if records is None and self.default_language is not None:
+            records = self.localized.get(self.default_language)
+        return records or ()
+
+
+def build_snapshot(
+    data: Any,
+    localize: Callable[[Any, str], Dict[str, Any]],
+    languages: Iterable[str],
+    default_language: Optional[str] = None,
+    facet_values: Optional[Callable[[Any], Dict[str, Any]]] = None,
+    aliases: Optional[Dict[str, Dict[str, str]]] = None,
+) -> CatalogSnapshot:
+    """Freeze catalog data, pre-localize, index and full-text index every scenario once.
+
+    Args:
+        data: Parsed catalog data with a ``scenarios`` list
+        localize: Function returning the localized dict for (scenario, language)
+        languages: Languages to build records for
+        default_language: Fallback language for unsupported requests
+        facet_values: Function returning {facet: value(s)} for a scenario, or
+            a list of such dicts to index several combinations (e.g. one per
+            language); defaults to its category, difficulty and every language
+        aliases: Optional {facet: {alias: canonical value}} tables
+
+    Returns:
+        A CatalogSnapshot sharing one frozen record per (scenario, language)
+    """
+    data = freeze(data)
+    scenarios = data.get("scenarios", ())
+    languages = list(languages)
+    localized = {
+        language: tuple(freeze(localize(scenario, language)) for scenario in scenarios)
+        for language in languages
+    }
+
+    if facet_values is None:
+        def facet_values(scenario):
+            return {
+                "category": scenario.get("category"),
+                "difficulty": scenario.get("difficulty"),
+                "language": languages,
+            }
+    facets = FacetIndex(("category", "difficulty", "language"), aliases)
+    for position, scenario in enumerate(scenarios):
+        values = facet_values(scenario)
+        for combination in values if isinstance(values, list) else [values]:
+            facets.add(position, **combination)
+
+    snapshot = CatalogSnapshot(data, localized, default_language, facets.seal())
+    snapshot.search_index()
+    return snapshot
+
+
+class ScenarioCatalog:
+    """A JSON scenario file held in memory as an immutable snapshot.
+
+    ``get()`` costs one ``os.stat`` call when the file is unchanged. When the
+    file changes, a new snapshot is built off to the side and swapped in with a
+    single assignment, so concurrent readers always see either the old or the
+    new snapshot, never a partially built one.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        build: Callable[[Any], Any] = freeze,
+    ):
+        """Initialize the catalog.
+
+        Args:
+            path: Path to the JSON scenarios file
+            build: Function turning the parsed JSON into the snapshot object
+        """
+        self.path = path
+        self._build = build
+        self._lock = threading.Lock()
+        self._snapshot: Any = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._digest: Optional[str] = None
+        self.version = 0
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self) -> Any:
+        """Return the current snapshot, reloading it if the file changed."""
+        stamp = self._file_stamp()
+        snapshot = self._snapshot
+        if snapshot is not None and stamp == self._stamp:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or stamp != self._stamp:
+                self._reload(stamp)
+            return self._snapshot
+
+    def _reload(self, stamp: Optional[Tuple[int, int]]) -> None:
+        """Re-read the file and swap in a new snapshot if its content changed."""
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            print(f"ERROR: Could not find scenarios file at {self.path}")
+            self._fallback(stamp)
+            return
+
+        digest = hashlib.sha256(raw).hexdigest()
+        if self._snapshot is not None and digest == self._digest:
+            # Touched but not modified: keep the snapshot we already have
+            self._stamp = stamp
+            return
+
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            print(f"ERROR: Invalid JSON in scenarios file: {e}")
+            self._fallback(stamp)
+            return
+
+        snapshot = self._build(data)
+        self._digest = digest
+        self._stamp = stamp
+        self.version += 1
+        self._snapshot = snapshot
+        print(f"Loaded scenario catalog {os.path.basename(self.path)} (version {self.version})")
+
+    def _fallback(self, stamp: Optional[Tuple[int, int]]) -> None:
+        """Keep serving the last good snapshot, or an empty one on first load."""
+        if self._snapshot is None:
+            self._snapshot = self._build(EMPTY_CATALOG)
+        self._stamp = stamp
+
+
+class StaticCatalog:
+    """Catalog for scenarios defined in Python, built on first use."""
+
+    def __init__(self, build: Callable[[], Any]):
+        """Initialize the catalog.
+
+        Args:
+            build: Function returning the snapshot
+        """
+        self._build = build
+        self._lock = threading.Lock()
+        self._snapshot: Any = None
+
+    def get(self) -> Any:
+        """Return the snapshot, building it the first time."""
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build()
+        return self._snapshot
@@ -33,10 +33,91 @@ class Settings(BaseSettings):
     AZURE_OPENAI_ENDPOINT: Optional[str] = None
     AZURE_OPENAI_API_VERSION: str = "2023-05-15"
     AZURE_OPENAI_DEPLOYMENT_NAME: str = "gpt-35-turbo"
+
+    # HTTP connection pool of the LLM provider, shared by the whole process
+    LLM_HTTP_TIMEOUT: float = 300.0
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    # Seconds an idle connection is kept open
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    # HTTP/2 over TLS when the h2 package is installed (Ollama over http:// stays on HTTP/1.1)
+    LLM_HTTP2: bool = True
+
+    # LLM response cache, a table in LLM_CACHE_DATABASE_URL (or DATABASE_URL)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_DATABASE_URL: Optional[str] = None
+    LLM_CACHE_TTL: float = 7 * 24 * 3600.0
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Responses kept per prompt; later calls pick one of them at random
+    LLM_CACHE_VARIANTS: int = 5
+    # Concurrent identical LLM calls sharing one generation at most (1 = no sharing)
+    LLM_SINGLE_FLIGHT_MAX_FAN_IN: int = 50
+
+    # Circuit breaker: fail fast (and use the database) while the LLM is down
+    LLM_BREAKER_ENABLED: bool = True
+    # Opens when this share of the last LLM_BREAKER_WINDOW calls failed (after LLM_BREAKER_MIN_CALLS calls)
+    LLM_BREAKER_WINDOW: int = 10
+    LLM_BREAKER_MIN_CALLS: int = 3
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    # Calls slower than this count as failed (streams: time to the first chunk)
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 30.0
+    # Seconds the circuit stays open before a probe call
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+
+    # Pre-generated LLM scenarios, per (quality attribute, language)
+    # Scenarios kept ready per queue (0 = no pool: always use the database)
+    LLM_POOL_DEPTH: int = 20
+    # Seconds between two LLM batches while a queue is not full
+    LLM_POOL_REFILL_INTERVAL: float = 5.0
+    # Seconds one LLM batch may take
+    LLM_POOL_TIMEOUT: float = 60.0
+    # Milliseconds a session creation may spend on its scenarios (requests may pass their own):
+    # a live LLM generation is only tried when its recent p95 latency fits
+    SESSION_LATENCY_BUDGET_MS: float = 300.0
     
     # Database settings (for storing game progress)
     DATABASE_URL: str = "sqlite:///./iso_standards_games.db"
-    
+
+    # Scenario settings
+    # Compiled scenario pack (see build_scenario_pack.py); unset = read the sources
+    SCENARIO_PACK_PATH: Optional[str] = None
+    # Serve scenarios from DATABASE_URL (see import_scenarios.py)
+    SCENARIO_DATABASE: bool = False
+    SCENARIO_DATABASE_POOL_SIZE: int = 8
+    # When to build the catalogs: "eager", "background" or "lazy"
+    SCENARIO_WARMUP: str = "background"
+
+    # Session settings
+    # Where sessions live: "memory" (one process), "sqlite" (shared by every
+    # worker, in SESSION_DATABASE_URL or else DATABASE_URL) or "token" (signed
+    # tokens held by the clients, with SESSION_TOKEN_SECRET)
+    SESSION_BACKEND: str = "memory"
+    SESSION_DATABASE_URL: Optional[str] = None
+    SESSION_TOKEN_SECRET: Optional[str] = None
+    # In-memory sessions are saved here periodically and on shutdown, and
+    # reloaded on startup (unset = no snapshots)
+    SESSION_SNAPSHOT_PATH: Optional[str] = None
+    SESSION_SNAPSHOT_INTERVAL: float = 60.0
+    # Lifetimes in seconds
+    # Sessions expire TTL seconds after creation, or IDLE_TIMEOUT seconds after
+    # their last request (unset = no idle limit)
+    SESSION_REAPER_INTERVAL: float = 30.0
+    QUALITY_QUEST_SESSION_TTL: float = 3600.0
+    QUALITY_QUEST_SESSION_IDLE_TIMEOUT: Optional[float] = None
+    REQUIREMENT_RALLY_SESSION_TTL: float = 3600.0
+    REQUIREMENT_RALLY_SESSION_IDLE_TIMEOUT: Optional[float] = None
+    USABILITY_UNIVERSE_SESSION_TTL: float = 3600.0
+    USABILITY_UNIVERSE_SESSION_IDLE_TIMEOUT: Optional[float] = None
+    # Caps of the in-memory sessions per game, by count and approximate bytes;
+    # beyond them the least recently used sessions are evicted, completed
+    # ones first (unset = no cap)
+    QUALITY_QUEST_MAX_SESSIONS: Optional[int] = 50000
+    QUALITY_QUEST_SESSION_MAX_BYTES: Optional[int] = 64 * 1024 * 1024
+    REQUIREMENT_RALLY_MAX_SESSIONS: Optional[int] = 50000
+    REQUIREMENT_RALLY_SESSION_MAX_BYTES: Optional[int] = 64 * 1024 * 1024
+    USABILITY_UNIVERSE_MAX_SESSIONS: Optional[int] = 50000
+    USABILITY_UNIVERSE_SESSION_MAX_BYTES: Optional[int] = 64 * 1024 * 1024
+
     class Config:
         """Pydantic config."""
 
@@ -0,0 +1,174 @@
+"""Per-player, non-repeating scenario decks.
+
+Each player gets a shuffled deck per scenario pool (a facet bucket) and is dealt
+every scenario of the pool once before any repeats. A deck does not store the
+shuffled order: it is a seed, a shuffle counter and a cursor, and the card at
+any cursor position is computed in O(1) by a keyed permutation of the pool.
+
+A ``DeckRegistry`` lives in the memory of one process: under ``--workers N``
+(or with the SQLite session backend) every worker keeps its own decks, so a
+player's "no repeats" guarantee only holds within the worker that serves them.
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from typing import Callable, Collection, Hashable, List, Optional, Sequence, Tuple
+
+_MASK64 = (1 << 64) - 1
+
+# Feistel rounds of the keyed permutation
+_ROUNDS = 4
+
+# Decks kept per registry; the least recently used player is forgotten first
+MAX_PLAYERS = 10000
+
+
+def _mix(value: int) -> int:
+    """splitmix64 finalizer: a fast, well-distributed 64-bit hash."""
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & _MASK64
+    return value ^ (value >> 31)
+
+
+class Permutation:
+    """A keyed pseudo-random permutation of ``range(size)``.
+
+    A balanced Feistel network permutes the smallest even-bit domain that
+    holds ``size``; values falling outside the range are walked through the
+    network again (at most four steps on average), so ``self[i]`` is O(1)
+    and nothing proportional to ``size`` is ever allocated.
+    """
+
+    __slots__ = ("size", "_half", "_mask", "_keys")
+
+    def __init__(self, size: int, key: int):
+        self.size = size
+        self._half = max(1, ((size - 1).bit_length() + 1) // 2)
+        self._mask = (1 << self._half) - 1
+        self._keys = tuple(_mix(key + r * 0x9E3779B97F4A7C15 & _MASK64) for r in range(_ROUNDS))
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self._half, value & self._mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix(right ^ key) & self._mask)
+        return (left << self._half) | right
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError("permutation index out of range")
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class Deck:
+    """Compact dealing state of one player over one scenario pool."""
+
+    __slots__ = ("seed", "shuffle", "cursor", "size")
+
+    def __init__(self, seed: int, size: int):
+        self.seed = seed
+        self.shuffle = 0
+        self.cursor = 0
+        self.size = size
+
+    def order(self) -> Permutation:
+        """Permutation of the current shuffle."""
+        return Permutation(self.size, _mix(self.seed ^ _mix(self.shuffle)))
+
+    def deal(self, count: int, skip: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """Deal up to ``count`` distinct pool indexes.
+
+        When the deck runs out it is reshuffled and dealing continues, skipping
+        cards already dealt in this hand. Cards for which ``skip`` is true (the
+        player already has them from another deck) are passed over.
+        """
+        count = min(count, self.size)
+        hand: List[int] = []
+        dealt = set()
+        order = self.order()
+        # Two passes over the deck find every card that is not skipped
+        budget = 2 * self.size
+        while len(hand) < count and budget > 0:
+            if self.cursor >= self.size:
+                self.shuffle += 1
+                self.cursor = 0
+                order = self.order()
+            card = order[self.cursor]
+            self.cursor += 1
+            budget -= 1
+            if card not in dealt and not (skip and skip(card)):
+                dealt.add(card)
+                hand.append(card)
+        return hand
+
+    def state(self) -> Tuple[int, int, int, int]:
+        return (self.seed, self.shuffle, self.cursor, self.size)
+
+
+class DeckRegistry:
+    """Decks per (player, pool), bounded to the most recently active players."""
+
+    def __init__(self, max_players: int = MAX_PLAYERS):
+        """Initialize the registry.
+
+        Args:
+            max_players: Players whose decks are kept; older ones start over
+        """
+        self.max_players = max_players
+        self._players: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def deal(
+        self,
+        player: Hashable,
+        pool: Hashable,
+        positions: Sequence[int],
+        count: int,
+        rng: Optional[random.Random] = None,
+        exclude: Collection[int] = (),
+    ) -> List[int]:
+        """Deal ``count`` positions the player has not seen since their last reshuffle.
+
+        Args:
+            player: Player or device token
+            pool: Key identifying ``positions`` (e.g. the facet filters)
+            positions: Scenario positions of the pool
+            count: Number of positions wanted
+            rng: Source of the seed of a new deck (defaults to ``random``)
+            exclude: Positions the player already holds; they are passed over
+                in the deck rather than dealt and thrown away
+
+        Returns:
+            Up to ``count`` distinct positions
+        """
+        if not positions:
+            return []
+        with self._lock:
+            decks = self._players.get(player)
+            if decks is None:
+                decks = self._players[player] = {}
+                if len(self._players) > self.max_players:
+                    self._players.popitem(last=False)
+            else:
+                self._players.move_to_end(player)
+
+            deck = decks.get(pool)
+            if deck is None or deck.size != len(positions):
+                # New pool, or the catalog changed size: start a fresh deck
+                deck = decks[pool] = Deck((rng or random).getrandbits(64), len(positions))
+            skip = (lambda i: positions[i] in exclude) if exclude else None
+            return [positions[i] for i in deck.deal(count, skip)]
+
+    def forget(self, player: Hashable) -> None:
+        """Drop every deck of a player."""
+        with self._lock:
+            self._players.pop(player, None)
+
+    def __len__(self) -> int:
+        return len(self._players)
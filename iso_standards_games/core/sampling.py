@@ -0,0 +1,35 @@
+"""Seeded scenario sampling.
+
+Every session selects its scenarios with its own ``random.Random``, seeded
+from an explicit seed or from the session ID, instead of the process-wide
+``random`` module. Selecting again with the same seed and filters (and no
+player deck) returns the same scenarios, so a session can be replayed or
+benchmarked from its seed alone.
+"""
+
+import hashlib
+import random
+from typing import Optional, Union
+
+_MASK64 = (1 << 64) - 1
+
+
+def derive_seed(value: Union[int, str]) -> int:
+    """Return a 64-bit seed for an integer seed or any string (e.g. a session ID)."""
+    if isinstance(value, int):
+        return value & _MASK64
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def session_rng(session_id: str, seed: Optional[int] = None) -> random.Random:
+    """Return the random generator of a session.
+
+    Args:
+        session_id: Session ID, used when no explicit seed is given
+        seed: Explicit seed requested by the client
+
+    Returns:
+        A generator private to the session
+    """
+    return random.Random(derive_seed(session_id if seed is None else seed))
@@ -0,0 +1,364 @@
+"""Compiled, memory-mapped scenario packs.
+
+A scenario pack holds the pre-localized records, facet buckets and source
+scenarios of every game in one versioned file:
+
+    header | u32 arrays (records, facets, ids) | string index | string blob | directory
+
+Every string (IDs, texts, categories, JSON-encoded option lists...) is stored
+once in an interned string table, and each localized record is a fixed-width
+row of string IDs. Loading a pack only parses the small JSON directory; the
+rest is read lazily through ``mmap``, so every server process maps the same
+page cache instead of holding its own copy of the scenario dicts.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from iso_standards_games.core.catalog import (
+    CatalogSnapshot,
+    FacetIndex,
+    FrozenDict,
+    LazySequence,
+    freeze,
+)
+from iso_standards_games.core.config import settings
+
+PACK_MAGIC = b"ISOSCPK\0"
+PACK_VERSION = 1
+
+# magic, version, reserved, string index offset, string count, blob offset,
+# directory offset, directory length
+_HEADER = struct.Struct("<8sIIQQQQQ")
+
+# String ID marking a field that a record does not have
+_MISSING = 0xFFFFFFFF
+
+# Decoded records kept per language and game
+RECORD_CACHE_SIZE = 4096
+
+
+class PackFormatError(ValueError):
+    """Raised when a file is not a scenario pack this code can read."""
+
+
+def _u32(values) -> array:
+    """Build a little-endian u32 array."""
+    data = array("I", values)
+    if data.itemsize != 4:
+        raise PackFormatError("Platform has no 32-bit unsigned array type")
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_pack(snapshots: Dict[str, CatalogSnapshot], path: str) -> Dict[str, int]:
+    """Compile catalog snapshots into a scenario pack.
+
+    Args:
+        snapshots: Snapshot per game ID (e.g. "quality_quest")
+        path: Output file path; written atomically
+
+    Returns:
+        Number of scenarios written per game
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        return sid
+
+    body = bytearray(_HEADER.size)
+
+    def append(values) -> Tuple[int, int]:
+        offset = len(body)
+        body.extend(_u32(values).tobytes())
+        return offset, len(values)
+
+    directory: Dict[str, Any] = {"games": {}}
+    counts = {}
+    for game, snapshot in snapshots.items():
+        scenarios = snapshot.scenarios
+        records = {language: snapshot.localized[language] for language in snapshot.languages}
+
+        # Union of localized fields; a field whose values are not all strings
+        # is stored JSON-encoded
+        fields: List[str] = []
+        kinds: Dict[str, str] = {}
+        for language_records in records.values():
+            for record in language_records:
+                for field, value in record.items():
+                    if field not in kinds:
+                        fields.append(field)
+                        kinds[field] = "s"
+                    if not isinstance(value, str):
+                        kinds[field] = "j"
+
+        def encode(value: Any, kind: str) -> int:
+            return intern(value if kind == "s" else _dumps(value))
+
+        record_tables = {}
+        for language, language_records in records.items():
+            row = []
+            for record in language_records:
+                for field in fields:
+                    row.append(encode(record[field], kinds[field]) if field in record else _MISSING)
+            record_tables[language] = append(row)[0]
+
+        ids = [intern(str(scenario.get("id", ""))) for scenario in scenarios]
+        by_id = sorted(range(len(scenarios)), key=lambda i: str(scenarios[i].get("id", "")))
+
+        buckets = []
+        for key, positions in snapshot.facets.items():
+            offset, count = append(positions)
+            buckets.append([list(key), offset, count])
+
+        directory["games"][game] = {
+            "count": len(scenarios),
+            "fields": fields,
+            "kinds": [kinds[field] for field in fields],
+            "languages": list(records),
+            "default_language": snapshot.default_language,
+            "records": record_tables,
+            "scenarios": append([intern(_dumps(scenario)) for scenario in scenarios])[0],
+            "ids": append(ids)[0],
+            "by_id": append(by_id)[0],
+            "facet_names": list(snapshot.facets.names),
+            "facet_aliases": snapshot.facets.aliases,
+            "buckets": buckets,
+            "data": _dumps({k: v for k, v in snapshot.data.items() if k != "scenarios"}),
+        }
+        counts[game] = len(scenarios)
+
+    # String table: offsets into the blob (one extra for the end), then the blob
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    string_index, _ = append(offsets)
+    blob_offset = len(body)
+    for item in encoded:
+        body.extend(item)
+
+    directory_bytes = _dumps(directory).encode("utf-8")
+    directory_offset = len(body)
+    body.extend(directory_bytes)
+    _HEADER.pack_into(
+        body, 0, PACK_MAGIC, PACK_VERSION, 0, string_index, len(strings),
+        blob_offset, directory_offset, len(directory_bytes),
+    )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    return counts
+
+
+class PackSnapshot(CatalogSnapshot):
+    """Catalog snapshot whose records live in a memory-mapped pack."""
+
+    __slots__ = ("_pack", "_ids", "_by_id")
+
+    def position(self, scenario_id: str) -> Optional[int]:
+        """Binary search the pack's sorted ID index."""
+        lo, hi = 0, len(self._by_id)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_at(mid) < scenario_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._by_id) and self._id_at(lo) == scenario_id:
+            return self._by_id[lo]
+        return None
+
+    def _id_at(self, rank: int) -> str:
+        return self._pack.string(self._ids[self._by_id[rank]])
+
+
+class ScenarioPack:
+    """A scenario pack opened read-only through ``mmap``."""
+
+    def __init__(self, path: str):
+        """Open and validate a pack.
+
+        Raises:
+            PackFormatError: If the file is not a compatible scenario pack
+        """
+        if sys.byteorder != "little":
+            raise PackFormatError("Scenario packs are little-endian")
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise PackFormatError(f"{path} is too small to be a scenario pack")
+        (magic, version, _, string_index, string_count,
+         blob_offset, directory_offset, directory_length) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC:
+            raise PackFormatError(f"{path} is not a scenario pack")
+        if version != PACK_VERSION:
+            raise PackFormatError(
+                f"{path} has pack version {version}, expected {PACK_VERSION}"
+            )
+        self.version = version
+        self._view = memoryview(self._mmap)
+        self._string_index = self._u32(string_index, string_count + 1)
+        self._blob = blob_offset
+        self._directory = json.loads(
+            bytes(self._view[directory_offset:directory_offset + directory_length])
+        )
+        self._snapshots: Dict[str, PackSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def _u32(self, offset: int, count: int) -> memoryview:
+        return self._view[offset:offset + 4 * count].cast("I")
+
+    def string(self, sid: int) -> str:
+        """Decode one string of the interned string table."""
+        start = self._blob + self._string_index[sid]
+        end = self._blob + self._string_index[sid + 1]
+        return str(self._mmap[start:end], "utf-8")
+
+    @property
+    def games(self) -> List[str]:
+        return list(self._directory["games"])
+
+    def __contains__(self, game: str) -> bool:
+        return game in self._directory["games"]
+
+    def snapshot(self, game: str) -> PackSnapshot:
+        """Return the (cached) snapshot of one game."""
+        snapshot = self._snapshots.get(game)
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshots.get(game)
+                if snapshot is None:
+                    snapshot = self._snapshots[game] = self._load_snapshot(game)
+        return snapshot
+
+    def _load_snapshot(self, game: str) -> PackSnapshot:
+        entry = self._directory["games"][game]
+        count = entry["count"]
+        fields = list(zip(entry["fields"], entry["kinds"]))
+        width = len(fields)
+
+        def record_decoder(table: memoryview):
+            def decode(index: int) -> FrozenDict:
+                record = {}
+                base = index * width
+                for j, (field, kind) in enumerate(fields):
+                    sid = table[base + j]
+                    if sid == _MISSING:
+                        continue
+                    value = self.string(sid)
+                    record[field] = value if kind == "s" else freeze(json.loads(value))
+                return FrozenDict(record)
+            return decode
+
+        localized = {
+            language: LazySequence(count, record_decoder(self._u32(offset, count * width)), RECORD_CACHE_SIZE)
+            for language, offset in entry["records"].items()
+        }
+        source = self._u32(entry["scenarios"], count)
+        scenarios = LazySequence(
+            count, lambda i: freeze(json.loads(self.string(source[i]))), RECORD_CACHE_SIZE
+        )
+
+        buckets = {
+            tuple(key): self._u32(offset, size) for key, offset, size in entry["buckets"]
+        }
+        facets = FacetIndex.from_buckets(entry["facet_names"], entry["facet_aliases"], buckets)
+
+        data = dict(json.loads(entry["data"]))
+        data["scenarios"] = scenarios
+        snapshot = PackSnapshot(
+            freeze(data),
+            localized,
+            entry["default_language"],
+            facets,
+        )
+        snapshot._pack = self
+        snapshot._ids = self._u32(entry["ids"], count)
+        snapshot._by_id = self._u32(entry["by_id"], count)
+        return snapshot
+
+
+# Open packs per path, reopened only when the file's stamp changes
+_packs: Dict[str, Tuple[Optional[Tuple[int, int]], Optional[ScenarioPack]]] = {}
+_packs_lock = threading.Lock()
+
+
+def open_pack(path: str) -> Optional[ScenarioPack]:
+    """Return the pack at ``path``, or None if it is missing or incompatible.
+
+    Packs are shared by every catalog of the process and reopened only when
+    the file is replaced.
+    """
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+
+    cached = _packs.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with _packs_lock:
+        cached = _packs.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        pack = None
+        if stamp is None:
+            print(f"WARNING: Scenario pack not found at {path}, using scenario sources")
+        else:
+            try:
+                pack = ScenarioPack(path)
+                print(f"Mapped scenario pack {path} (games: {', '.join(pack.games)})")
+            except (OSError, ValueError) as e:
+                print(f"WARNING: Ignoring scenario pack {path}: {e}")
+        _packs[path] = (stamp, pack)
+        return pack
+
+
+class PackCatalog:
+    """Serve a game from the compiled scenario pack, or from its sources.
+
+    The pack is used when ``settings.SCENARIO_PACK_PATH`` (or ``path``) points
+    to a compatible pack containing the game; otherwise every call is
+    delegated to the ``fallback`` catalog.
+    """
+
+    def __init__(self, game: str, fallback: Any, path: Optional[str] = None):
+        """Initialize the catalog.
+
+        Args:
+            game: Game ID inside the pack (e.g. "requirement_rally")
+            fallback: Catalog built from the scenario sources
+            path: Pack path overriding the setting
+        """
+        self.game = game
+        self.fallback = fallback
+        self.path = path
+
+    def get(self) -> CatalogSnapshot:
+        """Return the pack snapshot of the game, or the fallback snapshot."""
+        path = self.path or settings.SCENARIO_PACK_PATH
+        if path:
+            pack = open_pack(path)
+            if pack is not None and self.game in pack:
+                return pack.snapshot(self.game)
+        return self.fallback.get()
@@ -0,0 +1,431 @@
+"""SQLite scenario store.
+
+Scenarios can be imported into the database configured by
+``settings.DATABASE_URL`` (see import_scenarios.py) and served from there
+instead of from per-process dicts:
+
+    scenario_games    one row per game: languages, facet aliases, game info, version
+    scenarios         source scenario JSON per (game, position), indexed by ID
+    scenario_records  pre-localized record JSON per (game, language, position)
+    scenario_facets   normalized (category, difficulty, language) rows per position
+
+The database is written in WAL mode, so any number of server processes read it
+while it is being re-imported. Readers share a small pool of read-only
+connections with cached prepared statements; decoded records and facet buckets
+are cached per catalog version.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from iso_standards_games.core.catalog import (
+    CatalogSnapshot,
+    FacetIndex,
+    LazySequence,
+    freeze,
+)
+from iso_standards_games.core.config import settings
+
+# Facets stored as columns of scenario_facets (those of build_snapshot)
+FACET_COLUMNS = ("category", "difficulty", "language")
+
+# Seconds between checks of a game's version
+VERSION_CHECK_INTERVAL = 1.0
+
+# Decoded records kept per language and game
+RECORD_CACHE_SIZE = 4096
+
+# Facet buckets kept per game
+BUCKET_CACHE_SIZE = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenario_games (
+    game TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    languages TEXT NOT NULL,
+    default_language TEXT,
+    facet_aliases TEXT NOT NULL,
+    data TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    game TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (game, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scenarios_by_id ON scenarios (game, id);
+CREATE TABLE IF NOT EXISTS scenario_records (
+    game TEXT NOT NULL,
+    language TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (game, language, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scenario_facets (
+    game TEXT NOT NULL,
+    category TEXT,
+    difficulty TEXT,
+    language TEXT,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenario_facets_by_category
+    ON scenario_facets (game, category, difficulty, language, position);
+CREATE INDEX IF NOT EXISTS scenario_facets_by_language
+    ON scenario_facets (game, language, difficulty, position);
+"""
+
+
+def sqlite_path(url: str) -> str:
+    """Return the file path of a ``sqlite:///`` database URL.
+
+    Raises:
+        ValueError: If the URL is not a SQLite URL
+    """
+    prefix = "sqlite:///"
+    if not url.startswith(prefix):
+        raise ValueError(f"Not a SQLite database URL: {url}")
+    return url[len(prefix):]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _facet_rows(facets: FacetIndex) -> List[Tuple[Optional[str], ...]]:
+    """Recover the most specific (facets..., position) rows of a facet index.
+
+    The index holds a bucket for every subset of facets; a scenario's own rows
+    are the keys it belongs to that no other of its keys refines.
+    """
+    keys_by_position: Dict[int, set] = {}
+    for key, positions in facets.items():
+        for position in positions:
+            keys_by_position.setdefault(position, set()).add(key)
+
+    rows = []
+    for position, keys in keys_by_position.items():
+        for key in keys:
+            refined = any(
+                other != key and all(a is None or a == b for a, b in zip(key, other))
+                for other in keys
+            )
+            if not refined:
+                rows.append((*key, position))
+    return rows
+
+
+def write_store(snapshots: Dict[str, CatalogSnapshot], path: str) -> Dict[str, int]:
+    """Import catalog snapshots into a scenario store.
+
+    Each game's rows are replaced in one transaction, so readers see either
+    the old or the new scenarios of a game.
+
+    Args:
+        snapshots: Snapshot per game ID (e.g. "quality_quest")
+        path: SQLite database file
+
+    Returns:
+        Number of scenarios written per game
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    connection = sqlite3.connect(path)
+    counts = {}
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        for game, snapshot in snapshots.items():
+            if tuple(snapshot.facets.names) != FACET_COLUMNS:
+                raise ValueError(f"{game}: facets {snapshot.facets.names} are not {FACET_COLUMNS}")
+            scenarios = snapshot.scenarios
+            with connection:
+                row = connection.execute(
+                    "SELECT version FROM scenario_games WHERE game = ?", (game,)
+                ).fetchone()
+                for table in ("scenarios", "scenario_records", "scenario_facets"):
+                    connection.execute(f"DELETE FROM {table} WHERE game = ?", (game,))
+                connection.executemany(
+                    "INSERT INTO scenarios (game, position, id, source) VALUES (?, ?, ?, ?)",
+                    (
+                        (game, i, str(scenario.get("id", "")), _dumps(scenario))
+                        for i, scenario in enumerate(scenarios)
+                    ),
+                )
+                for language in snapshot.languages:
+                    connection.executemany(
+                        "INSERT INTO scenario_records (game, language, position, record) "
+                        "VALUES (?, ?, ?, ?)",
+                        (
+                            (game, language, i, _dumps(record))
+                            for i, record in enumerate(snapshot.localized[language])
+                        ),
+                    )
+                connection.executemany(
+                    "INSERT INTO scenario_facets (game, category, difficulty, language, position) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    ((game, *row) for row in _facet_rows(snapshot.facets)),
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO scenario_games "
+                    "(game, count, languages, default_language, facet_aliases, data, version) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        game,
+                        len(scenarios),
+                        _dumps(snapshot.languages),
+                        snapshot.default_language,
+                        _dumps(snapshot.facets.aliases),
+                        _dumps({k: v for k, v in snapshot.data.items() if k != "scenarios"}),
+                        (row[0] if row else 0) + 1,
+                    ),
+                )
+            counts[game] = len(scenarios)
+        connection.execute("PRAGMA optimize")
+    finally:
+        connection.close()
+    return counts
+
+
+class StoreFacetIndex(FacetIndex):
+    """Facet index answered by the scenario_facets table."""
+
+    def __init__(self, store: "ScenarioStore", game: str, aliases: Dict[str, Dict[str, str]]):
+        super().__init__(FACET_COLUMNS)
+        # Aliases come from the store already normalized
+        self.aliases = aliases
+        self._store = store
+        self._game = game
+        self._lookup = lru_cache(maxsize=BUCKET_CACHE_SIZE)(self._query)
+
+    def _query(self, key: Tuple[Optional[str], ...]) -> Tuple[int, ...]:
+        clauses = ["game = ?"]
+        params: List[Any] = [self._game]
+        for name, value in zip(self.names, key):
+            if value is not None:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        sql = (
+            "SELECT DISTINCT position FROM scenario_facets WHERE "
+            + " AND ".join(clauses)
+            + " ORDER BY position"
+        )
+        with self._store.reader() as connection:
+            return tuple(row[0] for row in connection.execute(sql, params))
+
+    def bucket(self, **filters: Any) -> Sequence[int]:
+        return self._lookup(self.key(**filters))
+
+    def items(self):
+        """Iterate over every (facet key, positions) pair (builds them in memory)."""
+        index = FacetIndex(self.names)
+        with self._store.reader() as connection:
+            rows = connection.execute(
+                "SELECT category, difficulty, language, position FROM scenario_facets "
+                "WHERE game = ?",
+                (self._game,),
+            ).fetchall()
+        for category, difficulty, language, position in rows:
+            index.add(position, category=category, difficulty=difficulty, language=language)
+        return index.seal().items()
+
+
+class StoreSnapshot(CatalogSnapshot):
+    """Catalog snapshot whose records are read from the scenario store."""
+
+    __slots__ = ("_store", "_game", "version")
+
+    def position(self, scenario_id: str) -> Optional[int]:
+        with self._store.reader() as connection:
+            row = connection.execute(
+                "SELECT position FROM scenarios WHERE game = ? AND id = ?",
+                (self._game, scenario_id),
+            ).fetchone()
+        return row[0] if row else None
+
+
+class ScenarioStore:
+    """A scenario store opened read-only with a pool of connections."""
+
+    def __init__(self, path: str, pool_size: int = 8):
+        """Open a store.
+
+        Args:
+            path: SQLite database file
+            pool_size: Idle read connections kept open
+
+        Raises:
+            FileNotFoundError: If the database does not exist
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = f"file:{os.path.abspath(self.path)}?mode=ro"
+        connection = sqlite3.connect(
+            uri, uri=True, check_same_thread=False, cached_statements=256
+        )
+        connection.execute("PRAGMA query_only = 1")
+        return connection
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool."""
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            yield connection
+        finally:
+            try:
+                self._pool.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+
+    def version(self, game: str) -> Optional[int]:
+        """Return the import version of a game, or None if it was never imported."""
+        try:
+            with self.reader() as connection:
+                row = connection.execute(
+                    "SELECT version FROM scenario_games WHERE game = ?", (game,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def snapshot(self, game: str) -> StoreSnapshot:
+        """Build the snapshot of the current version of a game."""
+        with self.reader() as connection:
+            count, languages, default_language, aliases, data, version = connection.execute(
+                "SELECT count, languages, default_language, facet_aliases, data, version "
+                "FROM scenario_games WHERE game = ?",
+                (game,),
+            ).fetchone()
+
+        def fetch(sql: str, *params: Any) -> Any:
+            with self.reader() as connection:
+                row = connection.execute(sql, params).fetchone()
+            if row is None:
+                raise IndexError("scenario index out of range")
+            return freeze(json.loads(row[0]))
+
+        def records(language: str) -> LazySequence:
+            return LazySequence(
+                count,
+                lambda i: fetch(
+                    "SELECT record FROM scenario_records "
+                    "WHERE game = ? AND language = ? AND position = ?",
+                    game, language, i,
+                ),
+                RECORD_CACHE_SIZE,
+            )
+
+        scenarios = LazySequence(
+            count,
+            lambda i: fetch(
+                "SELECT source FROM scenarios WHERE game = ? AND position = ?", game, i
+            ),
+            RECORD_CACHE_SIZE,
+        )
+        data = dict(json.loads(data))
+        data["scenarios"] = scenarios
+        snapshot = StoreSnapshot(
+            freeze(data),
+            {language: records(language) for language in json.loads(languages)},
+            default_language,
+            StoreFacetIndex(self, game, json.loads(aliases)),
+        )
+        snapshot._store = self
+        snapshot._game = game
+        snapshot.version = version
+        return snapshot
+
+
+# Open stores per path, and paths already reported missing
+_stores: Dict[str, ScenarioStore] = {}
+_missing_stores: set = set()
+_stores_lock = threading.Lock()
+
+
+def open_store(path: str) -> Optional[ScenarioStore]:
+    """Return the shared store at ``path``, or None if it does not exist."""
+    store = _stores.get(path)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            try:
+                store = _stores[path] = ScenarioStore(path, settings.SCENARIO_DATABASE_POOL_SIZE)
+                print(f"Opened scenario store {path}")
+            except FileNotFoundError:
+                if path not in _missing_stores:
+                    _missing_stores.add(path)
+                    print(f"WARNING: Scenario store not found at {path}, using scenario sources")
+                return None
+        return store
+
+
+class StoreCatalog:
+    """Serve a game from the SQLite scenario store, or from its fallback.
+
+    The store is used when ``settings.SCENARIO_DATABASE`` is enabled and the
+    game has been imported into ``settings.DATABASE_URL``; a re-import is
+    picked up within VERSION_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, game: str, fallback: Any, url: Optional[str] = None):
+        """Initialize the catalog.
+
+        Args:
+            game: Game ID inside the store (e.g. "requirement_rally")
+            fallback: Catalog used when the store is disabled or lacks the game
+            url: Database URL overriding the setting
+        """
+        self.game = game
+        self.fallback = fallback
+        self.url = url
+        self._lock = threading.Lock()
+        self._snapshot: Optional[StoreSnapshot] = None
+        self._checked = 0.0
+        self._missing = False
+
+    def get(self) -> CatalogSnapshot:
+        """Return the store snapshot of the game, or the fallback snapshot."""
+        if not (self.url or settings.SCENARIO_DATABASE):
+            return self.fallback.get()
+
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked < VERSION_CHECK_INTERVAL:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._checked >= VERSION_CHECK_INTERVAL:
+                self._refresh()
+        return self._snapshot or self.fallback.get()
+
+    def _refresh(self) -> None:
+        """Rebuild the snapshot if the game's version changed."""
+        self._checked = time.monotonic()
+        store = open_store(sqlite_path(self.url or settings.DATABASE_URL))
+        version = store.version(self.game) if store is not None else None
+        if version is None:
+            if store is not None and not self._missing:
+                print(f"WARNING: {self.game} is not in the scenario store, using scenario sources")
+            self._missing = True
+            self._snapshot = None
+            return
+        self._missing = False
+        if self._snapshot is None or self._snapshot.version != version:
+            self._snapshot = store.snapshot(self.game)
+            print(f"Loaded {self.game} from scenario store (version {version})")
@@ -0,0 +1,246 @@
+"""Full-text search over the pre-localized scenario records.
+
+One inverted index is built per language when a catalog is loaded. Text is
+accent-folded, lower-cased, stripped of the language's stopwords and lightly
+stemmed, so "Función" finds "funciones" and "usabilidad" finds "Usabilidad".
+Hits are ranked with BM25 over a weighted sum of the text fields.
+
+Postings are stored twice per term, as compact arrays: by position (for
+intersecting the terms of a query with binary searches) and by score (so a
+one-word query pages through its results without sorting them).
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Searchable record fields and their weight in the term frequency
+TEXT_FIELDS = {
+    "content": 2.0,
+    "description": 2.0,
+    "category": 1.5,
+    "explanation": 1.0,
+    "feedback": 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Up to this many matches are all scored; more use the threshold algorithm
+# over the ranked postings
+EXHAUSTIVE_LIMIT = 2048
+
+STOPWORDS = {
+    "en": frozenset(
+        "a an and are as at be by for from has have in is it its of on or that the "
+        "this to was were which will with should must can could would their they"
+        .split()
+    ),
+    "es": frozenset(
+        "a al como con de del el en es esta este la las lo los o para por que se "
+        "su sus un una y debe deben puede pueden ser sin sobre cuando entre"
+        .split()
+    ),
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_VOWELS = frozenset("aeiou")
+
+
+def fold(text: str) -> str:
+    """Lower-case a text and strip its accents ("Función" -> "funcion")."""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def _stem(token: str, language: str) -> str:
+    """Strip regular plural endings."""
+    if language == "es":
+        if len(token) > 4 and token.endswith("es") and token[-3] not in _VOWELS:
+            return token[:-2]
+        if len(token) > 3 and token.endswith("s"):
+            return token[:-1]
+    elif len(token) > 3:
+        if token.endswith("ies"):
+            return token[:-3] + "y"
+        if token.endswith("s") and not token.endswith("ss"):
+            return token[:-1]
+    return token
+
+
+def tokenize(text: str, language: str) -> List[str]:
+    """Split a text into searchable terms."""
+    stopwords = STOPWORDS.get(language, frozenset())
+    return [
+        _stem(token, language)
+        for token in _TOKEN.findall(fold(text))
+        if len(token) > 1 and token not in stopwords
+    ]
+
+
+class _Postings:
+    """Documents of one term: by position with scores, and ranked by score."""
+
+    __slots__ = ("positions", "scores", "ranked")
+
+    def __init__(self, entries: List[Tuple[int, float]]):
+        entries.sort()
+        self.positions = array("I", (position for position, _ in entries))
+        self.scores = array("f", (score for _, score in entries))
+        self.ranked = array(
+            "I", sorted(range(len(entries)), key=lambda i: -self.scores[i])
+        )
+
+    def score(self, position: int) -> Optional[float]:
+        i = bisect_left(self.positions, position)
+        if i < len(self.positions) and self.positions[i] == position:
+            return self.scores[i]
+        return None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+class _LanguageIndex:
+    """Inverted index of the records of one language."""
+
+    def __init__(self, records: Sequence[dict], language: str, fields: Dict[str, float]):
+        self.language = language
+        frequencies: List[Counter] = []
+        lengths = []
+        for record in records:
+            terms: Counter = Counter()
+            for field, weight in fields.items():
+                value = record.get(field)
+                if isinstance(value, str):
+                    for term in tokenize(value, language):
+                        terms[term] += weight
+            frequencies.append(terms)
+            lengths.append(sum(terms.values()))
+
+        count = len(frequencies)
+        average = (sum(lengths) / count) if count else 0.0
+        document_frequency: Counter = Counter()
+        for terms in frequencies:
+            document_frequency.update(terms.keys())
+
+        entries: Dict[str, List[Tuple[int, float]]] = {}
+        for position, terms in enumerate(frequencies):
+            norm = K1 * (1 - B + B * lengths[position] / average) if average else K1
+            for term, tf in terms.items():
+                df = document_frequency[term]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                entries.setdefault(term, []).append(
+                    (position, idf * tf * (K1 + 1) / (tf + norm))
+                )
+        self.postings = {term: _Postings(items) for term, items in entries.items()}
+
+    def search(self, query: str, limit: int, offset: int) -> Tuple[int, List[Tuple[int, float]]]:
+        terms = list(dict.fromkeys(tokenize(query, self.language)))
+        if not terms:
+            return 0, []
+        postings = [self.postings.get(term) for term in terms]
+        if any(p is None for p in postings):
+            return 0, []
+        postings.sort(key=len)
+
+        if len(postings) == 1:
+            only = postings[0]
+            page = only.ranked[offset:offset + limit]
+            return len(only), [(only.positions[i], only.scores[i]) for i in page]
+
+        # Every term must match; the intersection itself runs in C
+        matches = set(postings[0].positions).intersection(*(p.positions for p in postings[1:]))
+        if len(matches) <= EXHAUSTIVE_LIMIT:
+            scored = [(self._total_score(postings, position), position) for position in matches]
+            top = heapq.nlargest(offset + limit, scored)[offset:]
+            return len(matches), [(position, score) for score, position in top]
+        return len(matches), self._top_k(postings, offset + limit)[offset:]
+
+    @staticmethod
+    def _total_score(postings: List[_Postings], position: int) -> Optional[float]:
+        score = 0.0
+        for p in postings:
+            term_score = p.score(position)
+            if term_score is None:
+                return None
+            score += term_score
+        return score
+
+    def _top_k(self, postings: List[_Postings], k: int) -> List[Tuple[int, float]]:
+        """Best k matches by the threshold algorithm.
+
+        The terms' ranked lists are read in parallel; reading stops once the
+        k-th best score found reaches the best score an unseen document could
+        still have (the sum of the scores at the current depth).
+        """
+        heap: List[Tuple[float, int]] = []
+        seen = set()
+        for depth in range(max(len(p) for p in postings)):
+            threshold = 0.0
+            for p in postings:
+                if depth >= len(p):
+                    # Every document of this term has been seen, and every
+                    # match must contain it
+                    threshold = -math.inf
+                    break
+                i = p.ranked[depth]
+                threshold += p.scores[i]
+                position = p.positions[i]
+                if position in seen:
+                    continue
+                seen.add(position)
+                score = self._total_score(postings, position)
+                if score is None:
+                    continue
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, position))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, position))
+            if threshold == -math.inf or (len(heap) >= k and heap[0][0] >= threshold):
+                break
+        return [(position, score) for score, position in sorted(heap, reverse=True)]
+
+
+class SearchIndex:
+    """Per-language full-text index over a catalog's localized records."""
+
+    def __init__(
+        self,
+        localized: Dict[str, Sequence[dict]],
+        default_language: Optional[str] = None,
+        fields: Optional[Dict[str, float]] = None,
+    ):
+        """Build the index.
+
+        Args:
+            localized: Records per language, aligned with the catalog positions
+            default_language: Language searched for unsupported languages
+            fields: Searchable fields and their weights (TEXT_FIELDS by default)
+        """
+        fields = fields or TEXT_FIELDS
+        self.default_language = default_language
+        self._languages = {
+            language: _LanguageIndex(records, language, fields)
+            for language, records in localized.items()
+        }
+
+    def search(
+        self, query: str, language: str, limit: int = 10, offset: int = 0
+    ) -> Tuple[int, List[Tuple[int, float]]]:
+        """Return the total number of hits and one page of (position, score).
+
+        Every query term must match; hits are sorted by decreasing score.
+        """
+        index = self._languages.get(language) or self._languages.get(self.default_language or "")
+        if index is None:
+            if not self._languages:
+                return 0, []
+            index = next(iter(self._languages.values()))
+        return index.search(query, max(limit, 0), max(offset, 0))
@@ -0,0 +1,1254 @@
+"""Game session storage with time-to-live expiry.
+
+Servers keep their sessions in a ``SessionStore`` instead of a plain dict. The
+store indexes every session by its expiry deadline, so creating a session is
+O(log n) and ``expire()`` only touches the sessions that actually expired,
+however many are active.
+
+A session expires ``ttl`` seconds after it is created or, when the store has an
+``idle_timeout``, once it has not been read for that long. A ``SessionReaper``
+started with the app expires the sessions of every store periodically, so
+memory stays bounded even when no new sessions are created.
+
+Stores behave like a dict of session ID -> session data (``in``, ``[]``,
+``del``, ``len``). ``settings.SESSION_BACKEND`` selects where they live:
+
+    memory  per-process dicts (one server process per game)
+    sqlite  a WAL-mode SQLite file shared by every worker and server process
+    token   nowhere: the session ID is a signed token carrying the session,
+            re-issued on every change
+
+A shared backend returns a copy of the session on every read, so handlers
+save a session again (``session_id = store.save(session_id, data)``) after
+changing it and hand the returned ID back to the client: the same ID, except
+with tokens. Every write is committed before the request returns, so the
+player's next request sees it whichever worker serves it.
+
+Sessions are stored as ``SessionRecord``s: a few integers plus the IDs of the
+session's scenarios, whose bodies are resolved from the game's catalog when
+they are served.
+
+In-memory stores can also be capped by session count and by approximate size.
+When a new session goes over a cap, the least recently used sessions are
+evicted, completed sessions before the ones still in play.
+"""
+
+import asyncio
+import base64
+import gc
+import heapq
+import os
+import hashlib
+import hmac
+import json
+import secrets
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, suppress
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from iso_standards_games.core.config import settings
+
+# Default session lifetime in seconds
+DEFAULT_TTL = 3600.0
+
+# Idle deadlines are only moved when they advance by at least this many
+# seconds, so reading a session repeatedly does not grow the heap
+_TOUCH_GRANULARITY = 1.0
+
+# Approximate bytes of a session's entries in the store's own indexes (the
+# dicts, the expiry heap and the LRU lists), on top of its data
+_ENTRY_OVERHEAD = 280
+
+
+# Resolves (scenario ID, language) to the scenario's record, or None
+ScenarioResolver = Callable[[str, str], Optional[Dict[str, Any]]]
+
+
+class SessionRecord:
+    """Compact state of one game session.
+
+    Scenarios are referenced by ID and resolved from the game's catalog on
+    read, so a session costs a few hundred bytes however large its scenarios
+    are. Only scenarios that are not in the catalog (e.g. generated by the
+    LLM) are kept, by index, in ``generated``. ``correct`` is a bitset: bit i
+    is set when scenario i was answered correctly. ``last_answer`` is the
+    index and idempotency key of the latest answer, so a retried submission
+    can be answered again without being counted twice.
+    """
+
+    __slots__ = (
+        "id", "game", "player", "language", "scenario_ids", "cursor", "answered",
+        "score", "correct", "created", "finished", "seed", "category", "difficulty",
+        "generated", "answers", "last_answer",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        game: str,
+        scenario_ids: Sequence[Optional[str]],
+        language: str,
+        player: Optional[str] = None,
+        seed: Optional[int] = None,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        generated: Optional[Dict[int, Dict[str, Any]]] = None,
+    ):
+        self.id = session_id
+        self.game = game
+        self.player = player
+        self.language = language
+        self.scenario_ids: Tuple[Optional[str], ...] = tuple(scenario_ids)
+        self.cursor = 0
+        self.answered = 0
+        self.score = 0
+        self.correct = 0
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.seed = seed
+        self.category = category
+        self.difficulty = difficulty
+        self.generated = generated or None
+        # Per-answer log, for the servers that report it
+        self.answers: Optional[List[Tuple[str, Optional[float], float]]] = None
+        self.last_answer: Optional[Tuple[int, Optional[str]]] = None
+
+    @classmethod
+    def for_scenarios(
+        cls,
+        session_id: str,
+        game: str,
+        scenarios: Sequence[Dict[str, Any]],
+        language: str,
+        resolve: ScenarioResolver,
+        **fields: Any,
+    ) -> "SessionRecord":
+        """Create the record of a new session playing ``scenarios``.
+
+        Scenarios that ``resolve`` does not return as they are (unknown IDs,
+        or LLM scenarios reusing a catalog ID) are kept in the record itself.
+        """
+        ids = []
+        generated = {}
+        for index, scenario in enumerate(scenarios):
+            scenario_id = scenario.get("id")
+            if scenario_id is None or resolve(scenario_id, language) != scenario:
+                generated[index] = scenario
+            ids.append(scenario_id)
+        return cls(session_id, game, ids, language, generated=generated, **fields)
+
+    def scenario(self, index: int, resolve: ScenarioResolver) -> Dict[str, Any]:
+        """Return the body of the session's scenario at ``index``.
+
+        Raises:
+            LookupError: If the scenario is no longer in the catalog
+        """
+        if self.generated and index in self.generated:
+            return self.generated[index]
+        scenario_id = self.scenario_ids[index]
+        scenario = resolve(scenario_id, self.language)
+        if scenario is None:
+            raise LookupError(f"Scenario {scenario_id} is no longer in the catalog")
+        return scenario
+
+    def current(self, resolve: ScenarioResolver) -> Optional[Dict[str, Any]]:
+        """Return the scenario at the cursor, or None past the last one."""
+        if self.cursor >= len(self.scenario_ids):
+            return None
+        return self.scenario(self.cursor, resolve)
+
+    def answer(self, is_correct: bool, points: int = 10, key: Optional[str] = None) -> None:
+        """Record the answer to the scenario at the cursor (the cursor does not move).
+
+        Args:
+            is_correct: Whether the answer is correct
+            points: Points of a correct answer
+            key: Idempotency key of the submission, if the client sent one
+        """
+        if is_correct:
+            self.correct |= 1 << self.cursor
+            self.score += points
+        self.answered += 1
+        self.last_answer = (self.cursor, key)
+
+    def replayed(self, key: Optional[str] = None, index: Optional[int] = None) -> Optional[int]:
+        """Return the scenario index a retried submission already answered, or None.
+
+        A submission is a retry of the latest answer when it has the same
+        idempotency key, or names the scenario index that was answered.
+        """
+        if self.last_answer is None:
+            return None
+        last_index, last_key = self.last_answer
+        if (key is not None and key == last_key) or index == last_index:
+            return last_index
+        return None
+
+    def is_correct(self, index: int) -> bool:
+        return bool(self.correct >> index & 1)
+
+    def finish(self) -> None:
+        self.finished = time.time()
+
+    @property
+    def status(self) -> str:
+        return "active" if self.finished is None else "completed"
+
+    @property
+    def created_at(self) -> str:
+        return datetime.fromtimestamp(self.created).isoformat()
+
+    @property
+    def finished_at(self) -> Optional[str]:
+        return None if self.finished is None else datetime.fromtimestamp(self.finished).isoformat()
+
+    def __len__(self) -> int:
+        return len(self.scenario_ids)
+
+    def approximate_size(self) -> int:
+        """Approximate bytes owned by the record.
+
+        Catalog scenarios, and their IDs, are shared with the catalog and not
+        counted.
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.id) + sys.getsizeof(self.scenario_ids)
+        if self.player is not None:
+            size += sys.getsizeof(self.player)
+        if self.correct:
+            size += sys.getsizeof(self.correct)
+        if self.generated:
+            size += approximate_size(self.generated)
+        if self.answers:
+            size += approximate_size(self.answers)
+        if self.last_answer is not None:
+            size += approximate_size(self.last_answer)
+        return size
+
+    # state() and from_state() spell the slots out (in __slots__ order):
+    # snapshots convert every session, and this is several times faster
+    # than looping over the slot names
+
+    def state(self) -> Tuple[Any, ...]:
+        """Return the slot values as a flat tuple (the answer log is copied)."""
+        return (
+            self.id, self.game, self.player, self.language, self.scenario_ids, self.cursor,
+            self.answered, self.score, self.correct, self.created, self.finished, self.seed,
+            self.category, self.difficulty, self.generated,
+            None if self.answers is None else list(self.answers), self.last_answer,
+        )
+
+    @classmethod
+    def from_state(cls, values: Tuple[Any, ...]) -> "SessionRecord":
+        """Rebuild a record from ``state()``."""
+        record = cls.__new__(cls)
+        (
+            record.id, record.game, record.player, record.language, record.scenario_ids, record.cursor,
+            record.answered, record.score, record.correct, record.created, record.finished, record.seed,
+            record.category, record.difficulty, record.generated, record.answers,
+            record.last_answer,
+        ) = values
+        return record
+
+    def __reduce__(self):
+        # Pickled as a flat tuple of the slot values (no slot names)
+        return (_restore_record, (self.state(),))
+
+
+def _restore_record(values: Tuple[Any, ...]) -> SessionRecord:
+    return SessionRecord.from_state(values)
+
+
+def approximate_size(value: Any) -> int:
+    """Approximate bytes of a value and of the containers and strings it holds."""
+    if isinstance(value, SessionRecord):
+        return value.approximate_size()
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += approximate_size(key) + approximate_size(item)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += approximate_size(item)
+    return size
+
+
+def _is_finished(data: Any) -> bool:
+    """Whether a session's game is over (records, or dicts with a status)."""
+    if isinstance(data, SessionRecord):
+        return data.finished is not None
+    return isinstance(data, dict) and data.get("status") == "completed"
+
+
+class SessionStore(ABC):
+    """Interface of the session stores."""
+
+    # Whether the sessions outlive the process (no snapshot needed)
+    persistent = False
+    # Whether sessions are carried by their IDs: only catalog scenarios fit
+    stateless = False
+
+    def __init__(self, ttl: float = DEFAULT_TTL, idle_timeout: Optional[float] = None):
+        """Initialize the store.
+
+        Args:
+            ttl: Seconds a session lives after it is created
+            idle_timeout: Seconds a session lives after it was last read (None: no limit)
+        """
+        self.ttl = ttl
+        self.idle_timeout = idle_timeout
+        # Removed sessions by reason ("ttl", "idle" or "capacity")
+        self.evictions: Counter = Counter()
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return a session (marking it active), or None if it does not exist or has expired."""
+
+    @abstractmethod
+    def put(self, session_id: str, data: Any) -> None:
+        """Store a new session, or replace the data of an existing one."""
+
+    @abstractmethod
+    def touch(self, session_id: str) -> bool:
+        """Mark a session active; return whether it exists."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Remove a session; return whether it existed."""
+
+    @abstractmethod
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """Remove the sessions whose deadline has passed and return their IDs."""
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        """Return the IDs of the stored sessions."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored sessions."""
+
+    def save(self, session_id: str, data: Any) -> str:
+        """Store a session and return the ID the client must use from now on."""
+        self.put(session_id, data)
+        return session_id
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the store's size, limits and eviction counts."""
+        return {
+            "active": len(self),
+            "ttl": self.ttl,
+            "idle_timeout": self.idle_timeout,
+            "evictions": dict(self.evictions),
+        }
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and self.get(session_id) is not None
+
+    def __getitem__(self, session_id: str) -> Any:
+        data = self.get(session_id)
+        if data is None:
+            raise KeyError(session_id)
+        return data
+
+    def __setitem__(self, session_id: str, data: Any) -> None:
+        self.put(session_id, data)
+
+    def __delitem__(self, session_id: str) -> None:
+        if not self.delete(session_id):
+            raise KeyError(session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids())
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions of one process, expired through a min-heap of deadlines.
+
+    Replaced deadlines are left in the heap and skipped when they surface; the
+    heap is rebuilt when stale entries outnumber the live ones.
+
+    Sessions are also kept in two LRU lists, completed and in play, holding
+    each session's approximate size. When a cap is exceeded the front of the
+    completed list is evicted first, then the front of the other one, so
+    every eviction is O(1).
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        idle_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+        max_sessions: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """Initialize the store.
+
+        Args:
+            ttl: Seconds a session lives after it is created
+            idle_timeout: Seconds a session lives after it was last read (None: no limit)
+            clock: Source of the current time in seconds
+            max_sessions: Sessions kept at most (None: no limit)
+            max_bytes: Approximate bytes of sessions kept at most (None: no limit)
+        """
+        super().__init__(ttl, idle_timeout)
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sessions: Dict[str, Any] = {}
+        self._created: Dict[str, float] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        # Session ID -> approximate size, least recently used first
+        self._playing: "OrderedDict[str, int]" = OrderedDict()
+        self._completed: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            deadline = self._deadlines.get(session_id)
+            if deadline is None:
+                return None
+            now = self._clock()
+            if deadline <= now:
+                return None
+            if self.idle_timeout is not None:
+                self._schedule(session_id, now)
+            self._mark_used(session_id)
+            return self._sessions[session_id]
+
+    def put(self, session_id: str, data: Any) -> None:
+        size = approximate_size(data) + _ENTRY_OVERHEAD
+        with self._lock:
+            now = self._clock()
+            self._sessions[session_id] = data
+            if session_id not in self._created:
+                self._created[session_id] = now
+            self._schedule(session_id, now)
+            self._bytes -= self._unlist(session_id)
+            (self._completed if _is_finished(data) else self._playing)[session_id] = size
+            self._bytes += size
+            self._enforce_caps(keep=session_id)
+
+    def touch(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._deadlines:
+                return False
+            self._schedule(session_id, self._clock())
+            self._mark_used(session_id)
+            return True
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._remove(session_id)
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        now = self._clock() if now is None else now
+        expired = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                deadline, session_id = heapq.heappop(heap)
+                if self._deadlines.get(session_id) != deadline:
+                    continue
+                created = self._created[session_id]
+                self._remove(session_id)
+                self.evictions["ttl" if created + self.ttl <= now else "idle"] += 1
+                expired.append(session_id)
+        return expired
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._sessions)
+
+    def export(self) -> List[Tuple[str, float, float, Any]]:
+        """Return every session as (session ID, created, deadline, data)."""
+        # Least recently used first, so a restore rebuilds the same LRU order
+        with self._lock:
+            created, deadlines, sessions = self._created, self._deadlines, self._sessions
+            return [
+                (session_id, created[session_id], deadlines[session_id], sessions[session_id])
+                for lru in (self._completed, self._playing)
+                for session_id in lru
+            ]
+
+    def restore(self, entries: Sequence[Tuple[str, float, float, Any]]) -> int:
+        """Add exported sessions that have not expired; return how many were added."""
+        now = self._clock()
+        restored = 0
+        with self._lock:
+            for session_id, created, deadline, data in entries:
+                if deadline <= now:
+                    continue
+                self._bytes -= self._unlist(session_id)
+                size = approximate_size(data) + _ENTRY_OVERHEAD
+                self._sessions[session_id] = data
+                self._created[session_id] = created
+                self._deadlines[session_id] = deadline
+                (self._completed if _is_finished(data) else self._playing)[session_id] = size
+                self._bytes += size
+                restored += 1
+            # One O(n) heapify instead of n pushes
+            self._heap = [(d, s) for s, d in self._deadlines.items()]
+            heapq.heapify(self._heap)
+            restored -= self._enforce_caps()
+        return restored
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def usage(self) -> Dict[str, Any]:
+        """Return the current size of the store against its caps.
+
+        ``utilization`` is the fraction of the tightest cap in use (None
+        without caps).
+        """
+        count, size = len(self._sessions), self._bytes
+        fractions = []
+        if self.max_sessions:
+            fractions.append(count / self.max_sessions)
+        if self.max_bytes:
+            fractions.append(size / self.max_bytes)
+        return {
+            "sessions": count,
+            "completed": len(self._completed),
+            "bytes": size,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "utilization": round(max(fractions), 4) if fractions else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["usage"] = self.usage()
+        return stats
+
+    def _schedule(self, session_id: str, now: float) -> None:
+        deadline = self._created[session_id] + self.ttl
+        if self.idle_timeout is not None:
+            deadline = min(deadline, now + self.idle_timeout)
+        current = self._deadlines.get(session_id)
+        if current is not None and abs(deadline - current) < _TOUCH_GRANULARITY:
+            return
+        self._deadlines[session_id] = deadline
+        heapq.heappush(self._heap, (deadline, session_id))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(d, s) for s, d in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _mark_used(self, session_id: str) -> None:
+        if session_id in self._playing:
+            self._playing.move_to_end(session_id)
+        elif session_id in self._completed:
+            self._completed.move_to_end(session_id)
+
+    def _unlist(self, session_id: str) -> int:
+        """Take a session off the LRU lists; return its size (0 if it was not listed)."""
+        size = self._playing.pop(session_id, None)
+        if size is None:
+            size = self._completed.pop(session_id, 0)
+        return size
+
+    def _remove(self, session_id: str) -> bool:
+        # Its heap entry goes stale and is skipped
+        self._bytes -= self._unlist(session_id)
+        self._deadlines.pop(session_id, None)
+        self._created.pop(session_id, None)
+        return self._sessions.pop(session_id, None) is not None
+
+    def _over_capacity(self) -> bool:
+        return (self.max_sessions is not None and len(self._sessions) > self.max_sessions) or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        )
+
+    def _enforce_caps(self, keep: Optional[str] = None) -> int:
+        """Evict least recently used sessions, completed first, until under the caps.
+
+        Args:
+            keep: Session never evicted (the one being stored)
+
+        Returns:
+            Number of sessions evicted
+        """
+        evicted = 0
+        while self._over_capacity():
+            for lru in (self._completed, self._playing):
+                # ``keep`` was just stored: it is the front of a list only
+                # when it is the only session in it
+                victim = next(iter(lru), None)
+                if victim is not None and victim != keep:
+                    break
+            else:
+                break
+            self._remove(victim)
+            self.evictions["capacity"] += 1
+            evicted += 1
+        return evicted
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS game_sessions (
+    game TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created REAL NOT NULL,
+    deadline REAL NOT NULL,
+    PRIMARY KEY (game, id)
+);
+CREATE INDEX IF NOT EXISTS game_sessions_by_deadline ON game_sessions (game, deadline);
+"""
+
+# Deadline bound standing for "no idle timeout"
+_NEVER = 1e308
+
+
+def _encode_session(data: Any) -> Dict[str, Any]:
+    """JSON-ready form of a session: a record's ``state()``, or a plain JSON value."""
+    if isinstance(data, SessionRecord):
+        return {"record": data.state()}
+    return {"value": data}
+
+
+def _decode_session(value: Any) -> Optional[Any]:
+    """Inverse of ``_encode_session`` after a JSON round trip; None if malformed."""
+    if not isinstance(value, dict):
+        return None
+    if "record" not in value:
+        return value.get("value")
+    try:
+        state = list(value["record"])
+        # JSON turned the tuples into lists and the integer keys into strings
+        generated, answers, last_answer = state[14], state[15], state[16]
+        state[4] = tuple(state[4])
+        if generated is not None:
+            state[14] = {int(index): scenario for index, scenario in generated.items()}
+        if answers is not None:
+            state[15] = [tuple(answer) for answer in answers]
+        if last_answer is not None:
+            state[16] = tuple(last_answer)
+        return SessionRecord.from_state(tuple(state))
+    except (ValueError, TypeError, IndexError, AttributeError):
+        return None
+
+
+def _encode_row(data: Any) -> bytes:
+    """JSON of a stored session."""
+    return json.dumps(_encode_session(data), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _decode_row(data: bytes) -> Optional[Any]:
+    """Inverse of ``_encode_row``; None for rows that are not valid JSON."""
+    try:
+        value = json.loads(data)
+    except (ValueError, TypeError):
+        return None
+    return _decode_session(value)
+
+
+class SqliteSessionStore(SessionStore):
+    """Sessions of one game in a SQLite table shared by several processes.
+
+    Every thread uses its own connection in autocommit mode; the file is in
+    WAL mode, so readers never wait for writers. Sessions are stored as JSON
+    (a record's ``state()``), never pickled: the file is shared with other
+    writers, and a row can at worst fail to load.
+    """
+
+    persistent = True
+
+    def __init__(
+        self,
+        path: str,
+        game: str,
+        ttl: float = DEFAULT_TTL,
+        idle_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the store, creating the table if needed.
+
+        Args:
+            path: SQLite database file
+            game: Game ID the sessions belong to
+            ttl: Seconds a session lives after it is created
+            idle_timeout: Seconds a session lives after it was last read (None: no limit)
+            clock: Source of the current time in seconds
+        """
+        super().__init__(ttl, idle_timeout)
+        self.path = path
+        self.game = game
+        self._clock = clock
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _idle_deadline(self, now: float) -> float:
+        return _NEVER if self.idle_timeout is None else now + self.idle_timeout
+
+    def get(self, session_id: str) -> Optional[Any]:
+        now = self._clock()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT data, created, deadline FROM game_sessions "
+            "WHERE game = ? AND id = ? AND deadline > ?",
+            (self.game, session_id, now),
+        ).fetchone()
+        if row is None:
+            return None
+        data, created, deadline = row
+        if self.idle_timeout is not None:
+            moved = min(created + self.ttl, now + self.idle_timeout)
+            if abs(moved - deadline) >= _TOUCH_GRANULARITY:
+                connection.execute(
+                    "UPDATE game_sessions SET deadline = ? WHERE game = ? AND id = ?",
+                    (moved, self.game, session_id),
+                )
+        return _decode_row(data)
+
+    def put(self, session_id: str, data: Any) -> None:
+        now = self._clock()
+        idle_deadline = self._idle_deadline(now)
+        self._connection().execute(
+            "INSERT INTO game_sessions (game, id, data, created, deadline) "
+            "VALUES (:game, :id, :data, :now, min(:now + :ttl, :idle)) "
+            "ON CONFLICT (game, id) DO UPDATE SET data = excluded.data, "
+            "deadline = min(created + :ttl, :idle)",
+            {
+                "game": self.game,
+                "id": session_id,
+                "data": _encode_row(data),
+                "now": now,
+                "ttl": self.ttl,
+                "idle": idle_deadline,
+            },
+        )
+
+    def touch(self, session_id: str) -> bool:
+        cursor = self._connection().execute(
+            "UPDATE game_sessions SET deadline = min(created + ?, ?) "
+            "WHERE game = ? AND id = ?",
+            (self.ttl, self._idle_deadline(self._clock()), self.game, session_id),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, session_id: str) -> bool:
+        cursor = self._connection().execute(
+            "DELETE FROM game_sessions WHERE game = ? AND id = ?", (self.game, session_id)
+        )
+        return cursor.rowcount > 0
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        now = self._clock() if now is None else now
+        rows = self._connection().execute(
+            "DELETE FROM game_sessions WHERE game = ? AND deadline <= ? RETURNING id, created",
+            (self.game, now),
+        ).fetchall()
+        for _, created in rows:
+            self.evictions["ttl" if created + self.ttl <= now else "idle"] += 1
+        return [session_id for session_id, _ in rows]
+
+    def ids(self) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT id FROM game_sessions WHERE game = ? AND deadline > ?",
+            (self.game, self._clock()),
+        )
+        return [session_id for (session_id,) in rows]
+
+    def __len__(self) -> int:
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM game_sessions WHERE game = ? AND deadline > ?",
+            (self.game, self._clock()),
+        ).fetchone()
+        return count
+
+
+# Layout version of the token payloads
+TOKEN_VERSION = 1
+
+# Bytes of the truncated HMAC-SHA256 of a token
+_TOKEN_MAC_SIZE = 16
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class TokenSessionStore(SessionStore):
+    """Sessions carried by their own IDs as HMAC-signed tokens.
+
+    A token is ``<mac>.<payload>``: the session's record as a compact JSON
+    array (scenario IDs, cursor, score, correctness bits, answer log and
+    expiry deadline) in URL-safe base64, signed together with the game ID.
+    Nothing is stored: ``get()`` verifies and decodes the token, and
+    ``save()`` issues a new one that replaces it, so any worker or node with
+    the same secret serves any session.
+
+    Tokens cannot be revoked, and an older token of a session stays valid
+    until its deadline: a player can replay it. Records with scenarios that
+    are not in the catalog cannot be carried.
+    """
+
+    persistent = True
+    stateless = True
+
+    def __init__(
+        self,
+        secret: bytes,
+        game: str,
+        ttl: float = DEFAULT_TTL,
+        idle_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the store.
+
+        Args:
+            secret: HMAC key, shared by every server of the game
+            game: Game ID the tokens are signed for
+            ttl: Seconds a session lives after it is created
+            idle_timeout: Seconds a session lives after it was last saved (None: no limit)
+            clock: Source of the current time in seconds
+        """
+        super().__init__(ttl, idle_timeout)
+        self.game = game
+        self._secret = secret
+        self._clock = clock
+
+    def _mac(self, payload: bytes) -> bytes:
+        message = self.game.encode("utf-8") + b"\0" + payload
+        return hmac.new(self._secret, message, hashlib.sha256).digest()[:_TOKEN_MAC_SIZE]
+
+    def issue(self, record: SessionRecord) -> str:
+        """Return a token carrying ``record``, valid until its deadline.
+
+        Raises:
+            ValueError: If the record holds scenarios that are not in the catalog
+        """
+        if record.generated:
+            raise ValueError("Sessions with generated scenarios cannot be carried by a token")
+        now = self._clock()
+        deadline = record.created + self.ttl
+        if self.idle_timeout is not None:
+            deadline = min(deadline, now + self.idle_timeout)
+        answers = record.answers
+        if answers:
+            # Whole-second timestamps keep the token short
+            answers = [(selected, taken, int(at)) for selected, taken, at in answers]
+        payload = json.dumps(
+            [
+                TOKEN_VERSION, record.language, record.scenario_ids, record.cursor,
+                record.answered, record.score, record.correct, int(record.created),
+                None if record.finished is None else int(record.finished), record.seed,
+                record.player, record.category, record.difficulty, answers,
+                int(deadline),
+            ],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode("utf-8")
+        return f"{_b64encode(self._mac(payload))}.{_b64encode(payload)}"
+
+    def get(self, session_id: str) -> Optional[Any]:
+        try:
+            mac, _, encoded = session_id.partition(".")
+            payload = _b64decode(encoded)
+            if not hmac.compare_digest(_b64decode(mac), self._mac(payload)):
+                return None
+            values = json.loads(payload)
+            if values[0] != TOKEN_VERSION or values[-1] <= self._clock():
+                return None
+            (
+                _, language, scenario_ids, cursor, answered, score, correct, created,
+                finished, seed, player, category, difficulty, answers, _,
+            ) = values
+        except (ValueError, TypeError):
+            return None
+        record = SessionRecord.__new__(SessionRecord)
+        record.id = session_id
+        record.game = self.game
+        record.player = player
+        record.language = language
+        record.scenario_ids = tuple(scenario_ids)
+        record.cursor = cursor
+        record.answered = answered
+        record.score = score
+        record.correct = correct
+        record.created = created
+        record.finished = finished
+        record.seed = seed
+        record.category = category
+        record.difficulty = difficulty
+        record.generated = None
+        record.answers = None if answers is None else [tuple(answer) for answer in answers]
+        # A retry resubmits the token it was sent with, whose state is
+        # before the answer: tokens need no replay record
+        record.last_answer = None
+        return record
+
+    def put(self, session_id: str, data: Any) -> None:
+        # Nothing to store: the client holds the token that save() returns
+        self.issue(data)
+
+    def save(self, session_id: str, data: Any) -> str:
+        token = self.issue(data)
+        data.id = token
+        return token
+
+    def touch(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def delete(self, session_id: str) -> bool:
+        # Nothing to remove: the session ends when the client drops the token
+        return self.get(session_id) is not None
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        return []
+
+    def ids(self) -> List[str]:
+        return []
+
+    def __len__(self) -> int:
+        return 0
+
+
+_PROCESS_SECRET: Optional[bytes] = None
+
+
+def token_secret() -> bytes:
+    """Return the configured token secret, or a random one for this process only."""
+    if settings.SESSION_TOKEN_SECRET:
+        return settings.SESSION_TOKEN_SECRET.encode("utf-8")
+    global _PROCESS_SECRET
+    if _PROCESS_SECRET is None:
+        print("⚠️ SESSION_TOKEN_SECRET is not set: session tokens are only valid in this process")
+        _PROCESS_SECRET = secrets.token_bytes(32)
+    return _PROCESS_SECRET
+
+SESSION_BACKENDS = ("memory", "sqlite", "token")
+
+
+def game_store(game_id: str, default_ttl: Optional[float] = None) -> SessionStore:
+    """Return a session store with the configured backend, lifetimes and caps of a game.
+
+    Args:
+        game_id: Game ID, e.g. "quality_quest" (reads QUALITY_QUEST_SESSION_TTL,
+            QUALITY_QUEST_SESSION_IDLE_TIMEOUT, QUALITY_QUEST_MAX_SESSIONS and
+            QUALITY_QUEST_SESSION_MAX_BYTES)
+        default_ttl: TTL used instead of the setting's default when the
+            setting is not configured
+    """
+    prefix = game_id.upper()
+    ttl = getattr(settings, f"{prefix}_SESSION_TTL", DEFAULT_TTL)
+    if default_ttl is not None and f"{prefix}_SESSION_TTL" not in settings.model_fields_set:
+        ttl = default_ttl
+    idle_timeout = getattr(settings, f"{prefix}_SESSION_IDLE_TIMEOUT", None)
+    max_sessions = getattr(settings, f"{prefix}_MAX_SESSIONS", None)
+    max_bytes = getattr(settings, f"{prefix}_SESSION_MAX_BYTES", None)
+
+    backend = settings.SESSION_BACKEND
+    if backend not in SESSION_BACKENDS:
+        print(f"⚠️ Unknown SESSION_BACKEND '{backend}', using 'memory'")
+        backend = "memory"
+    if backend == "sqlite":
+        # Imported here: the scenario store pulls in the catalog modules
+        from iso_standards_games.core.scenario_store import sqlite_path
+
+        path = sqlite_path(settings.SESSION_DATABASE_URL or settings.DATABASE_URL)
+        return SqliteSessionStore(path, game_id, ttl=ttl, idle_timeout=idle_timeout)
+    if backend == "token":
+        return TokenSessionStore(token_secret(), game_id, ttl=ttl, idle_timeout=idle_timeout)
+    return MemorySessionStore(
+        ttl=ttl, idle_timeout=idle_timeout, max_sessions=max_sessions, max_bytes=max_bytes
+    )
+
+
+# Session snapshots: a fixed header followed by the UTF-8 JSON of
+# {game ID: [[session ID, created, deadline, session], ...]}, each session
+# encoded like a row of the SQLite store. Never pickled: loading a tampered
+# or stale file must not run code.
+SNAPSHOT_MAGIC = b"ISGSESS\0"
+SNAPSHOT_VERSION = 2
+_SNAPSHOT_HEADER = struct.Struct("<8sHQ")
+
+# Fingerprint of the record layout: snapshots of another layout are skipped
+_RECORD_LAYOUT = int.from_bytes(
+    hashlib.blake2b(",".join(SessionRecord.__slots__).encode(), digest_size=8).digest(), "little"
+)
+
+SnapshotEntries = Dict[str, List[Tuple[str, float, float, Dict[str, Any]]]]
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector.
+
+    Snapshots create or convert hundreds of thousands of tuples in one go, which
+    otherwise triggers repeated full collections (about 3x slower overall).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _memory_stores(stores: Dict[str, SessionStore]) -> Dict[str, MemorySessionStore]:
+    """Select the stores whose sessions live in this process (the ones to snapshot)."""
+    return {game_id: store for game_id, store in stores.items() if isinstance(store, MemorySessionStore)}
+
+
+def snapshot_entries(stores: Dict[str, SessionStore]) -> SnapshotEntries:
+    """Export the sessions of the in-memory stores as plain tuples.
+
+    Records are exported as their ``state()`` tuples, which encode much faster
+    than the objects; any other session data must be a JSON value.
+    """
+    entries: SnapshotEntries = {}
+    with _gc_paused():
+        for game_id, store in _memory_stores(stores).items():
+            entries[game_id] = [
+                (session_id, created, deadline, _encode_session(data))
+                for session_id, created, deadline, data in store.export()
+            ]
+    return entries
+
+
+def snapshot_file(path: str, game_ids: Sequence[str]) -> str:
+    """Snapshot file of a set of games: ``path`` suffixed with their sorted IDs.
+
+    Server processes sharing ``SESSION_SNAPSHOT_PATH`` thus write their own
+    files instead of replacing each other's.
+    """
+    return f"{path}.{'+'.join(sorted(game_ids))}"
+
+
+def write_snapshot(path: str, entries: SnapshotEntries) -> int:
+    """Write exported sessions to a snapshot file atomically; return how many.
+
+    The file is written under a unique temporary name and renamed, so
+    concurrent writers never interleave and readers see a whole snapshot.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    snapshot = tempfile.NamedTemporaryFile(
+        "wb", dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False
+    )
+    try:
+        with snapshot, _gc_paused():
+            snapshot.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _RECORD_LAYOUT))
+            snapshot.write(json.dumps(entries, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        os.replace(snapshot.name, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(snapshot.name)
+        raise
+    return sum(len(sessions) for sessions in entries.values())
+
+
+def read_snapshot(path: str) -> Optional[SnapshotEntries]:
+    """Read a snapshot file, or return None if it is missing or incompatible."""
+    try:
+        with open(path, "rb") as snapshot:
+            header = snapshot.read(_SNAPSHOT_HEADER.size)
+            if len(header) < _SNAPSHOT_HEADER.size:
+                print(f"⚠️ Skipping truncated session snapshot {path}")
+                return None
+            magic, version, layout = _SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or layout != _RECORD_LAYOUT:
+                print(f"⚠️ Skipping incompatible session snapshot {path} (version {version})")
+                return None
+            entries = json.loads(snapshot.read())
+        if not isinstance(entries, dict):
+            print(f"⚠️ Skipping malformed session snapshot {path}")
+            return None
+        return entries
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Could not read session snapshot {path}: {e}")
+        return None
+
+
+def restore_snapshot(stores: Dict[str, SessionStore], path: str) -> int:
+    """Load the sessions of a snapshot file into the in-memory stores.
+
+    Returns:
+        Number of sessions restored (expired ones are skipped)
+    """
+    with _gc_paused():
+        entries = read_snapshot(path)
+        if not entries:
+            return 0
+        memory_stores = _memory_stores(stores)
+        restored = 0
+        for game_id, sessions in entries.items():
+            store = memory_stores.get(game_id)
+            if store is None:
+                continue
+            try:
+                decoded = [
+                    (session_id, created, deadline, _decode_session(session))
+                    for session_id, created, deadline, session in sessions
+                ]
+                restored += store.restore([entry for entry in decoded if entry[3] is not None])
+            except (ValueError, TypeError):
+                print(f"⚠️ Skipping malformed {game_id} sessions in snapshot {path}")
+    return restored
+
+
+class SessionReaper:
+    """Background task expiring (and snapshotting) the sessions of several stores.
+
+    With a snapshot path, ``restore()`` reloads the in-memory stores at startup,
+    the task writes a snapshot every ``snapshot_interval`` seconds and ``stop()``
+    writes a last one, so a restart (uvicorn turns SIGTERM into a graceful
+    shutdown) does not lose the games in progress.
+    """
+
+    def __init__(
+        self,
+        stores: Dict[str, SessionStore],
+        interval: Optional[float] = None,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval: Optional[float] = None,
+    ):
+        """Initialize the reaper.
+
+        Args:
+            stores: Session store per game ID (only the ``MemorySessionStore``
+                ones are snapshotted)
+            interval: Seconds between runs (default: settings.SESSION_REAPER_INTERVAL)
+            snapshot_path: Snapshot file (default: settings.SESSION_SNAPSHOT_PATH
+                suffixed with the game IDs of ``stores``, see ``snapshot_file()``;
+                an empty string or an unset setting disables snapshots)
+            snapshot_interval: Seconds between snapshots (default:
+                settings.SESSION_SNAPSHOT_INTERVAL)
+        """
+        self.stores = stores
+        self.interval = interval if interval is not None else settings.SESSION_REAPER_INTERVAL
+        if snapshot_path is None and settings.SESSION_SNAPSHOT_PATH:
+            snapshot_path = snapshot_file(settings.SESSION_SNAPSHOT_PATH, list(stores))
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = (
+            snapshot_interval if snapshot_interval is not None else settings.SESSION_SNAPSHOT_INTERVAL
+        )
+        self.runs = 0
+        self.last_run_ms = 0.0
+        self.snapshots = 0
+        self.last_snapshot_ms = 0.0
+        self._last_snapshot = time.monotonic()
+        self._task: Optional["asyncio.Task"] = None
+
+    def restore(self) -> int:
+        """Reload the last snapshot into the stores (call before serving)."""
+        if not self.snapshot_path:
+            return 0
+        start = time.perf_counter()
+        restored = restore_snapshot(self.stores, self.snapshot_path)
+        if restored:
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"💾 Restored {restored} session(s) from {self.snapshot_path} in {elapsed:.0f} ms")
+        return restored
+
+    def snapshot(self) -> int:
+        """Write a snapshot of the in-memory stores now; return the sessions written."""
+        if not self.snapshot_path:
+            return 0
+        start = time.perf_counter()
+        with _gc_paused():
+            count = write_snapshot(self.snapshot_path, snapshot_entries(self.stores))
+        self._snapshot_done(start)
+        return count
+
+    def _snapshot_done(self, start: float) -> None:
+        self.snapshots += 1
+        self.last_snapshot_ms = (time.perf_counter() - start) * 1000
+        self._last_snapshot = time.monotonic()
+
+    def reap(self) -> Dict[str, int]:
+        """Expire every store once and return the number of sessions expired per game."""
+        start = time.perf_counter()
+        expired = {}
+        for game_id, store in self.stores.items():
+            try:
+                count = len(store.expire())
+            except Exception as e:
+                print(f"⚠️ Session expiry failed for {game_id}: {e}")
+                continue
+            if count:
+                print(f"🧹 Expired {count} {game_id} session(s), {len(store)} active")
+            expired[game_id] = count
+        self.runs += 1
+        self.last_run_ms = (time.perf_counter() - start) * 1000
+        return expired
+
+    def start(self) -> "asyncio.Task":
+        """Start reaping on the running event loop (call from a startup hook)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            print(f"🧹 Session reaper started (every {self.interval:g}s)")
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the task and wait for it (call from a shutdown hook)."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        print("🧹 Session reaper stopped")
+        if self.snapshot_path:
+            try:
+                count = self.snapshot()
+                print(f"💾 Saved {count} session(s) to {self.snapshot_path}")
+            except Exception as e:
+                print(f"⚠️ Session snapshot failed: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            self.reap()
+            if self.snapshot_path and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+                # Export on the loop (a consistent view), encode and write in a thread
+                start = time.perf_counter()
+                try:
+                    entries = snapshot_entries(self.stores)
+                    await loop.run_in_executor(None, write_snapshot, self.snapshot_path, entries)
+                    self._snapshot_done(start)
+                except Exception as e:
+                    print(f"⚠️ Session snapshot failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the reaper's runs and every store's stats."""
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "last_run_ms": round(self.last_run_ms, 3),
+            "snapshots": self.snapshots,
+            "last_snapshot_ms": round(self.last_snapshot_ms, 3),
+            "games": {game_id: store.stats() for game_id, store in self.stores.items()},
+        }
@@ -0,0 +1,99 @@
+"""Startup cost accounting and scenario catalog warm-up.
+
+Servers wrap their heavy imports in ``budget()`` and print ``report()`` once the
+app is created, so the cost of every module (and of every catalog warm-up) is
+visible in the startup log. Catalogs are warmed up according to
+``settings.SCENARIO_WARMUP``:
+
+    eager       build every catalog before the server accepts requests
+    background  start serving immediately and build the catalogs in a thread
+    lazy        build each catalog on its first request
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from iso_standards_games.core.config import settings
+
+WARMUP_MODES = ("eager", "background", "lazy")
+
+# (label, seconds) in the order the steps finished
+_timings: List[Tuple[str, float]] = []
+_timings_lock = threading.Lock()
+_started = time.perf_counter()
+
+
+@contextmanager
+def budget(label: str) -> Iterator[None]:
+    """Record how long the wrapped block (usually an import) takes."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _timings_lock:
+            _timings.append((label, elapsed))
+
+
+def timings() -> List[Tuple[str, float]]:
+    """Return the recorded (label, seconds) steps."""
+    with _timings_lock:
+        return list(_timings)
+
+
+def report(title: str = "Startup budget") -> str:
+    """Print and return the recorded steps, most expensive first."""
+    steps = sorted(timings(), key=lambda step: step[1], reverse=True)
+    width = max((len(label) for label, _ in steps), default=0)
+    lines = [f"⏱️ {title} ({(time.perf_counter() - _started) * 1000:.1f} ms since import):"]
+    for label, elapsed in steps:
+        lines.append(f"   {label:<{width}}  {elapsed * 1000:8.1f} ms")
+    text = "\n".join(lines)
+    print(text)
+    return text
+
+
+def warm_up(loaders: Dict[str, Callable[[], object]]) -> None:
+    """Build the given catalogs now, recording the cost of each."""
+    for name, load in loaders.items():
+        try:
+            with budget(f"warm-up {name}"):
+                load()
+        except Exception as e:
+            print(f"⚠️ Warm-up of {name} failed: {e}")
+
+
+async def schedule_warm_up(
+    loaders: Dict[str, Callable[[], object]],
+    mode: Optional[str] = None,
+) -> Optional["asyncio.Future"]:
+    """Warm up catalogs from an app startup hook.
+
+    Args:
+        loaders: Loader per catalog name (e.g. the modules' ``load_scenarios``)
+        mode: One of WARMUP_MODES; defaults to ``settings.SCENARIO_WARMUP``
+
+    Returns:
+        The executor future of a background warm-up, otherwise None
+    """
+    mode = mode or settings.SCENARIO_WARMUP
+    if mode not in WARMUP_MODES:
+        print(f"⚠️ Unknown SCENARIO_WARMUP '{mode}', using 'background'")
+        mode = "background"
+    if mode == "lazy":
+        return None
+    if mode == "eager":
+        warm_up(loaders)
+        report("Scenario warm-up")
+        return None
+
+    def run() -> None:
+        warm_up(loaders)
+        report("Scenario warm-up")
+
+    # Catalog builds hold their own lock, so a request arriving first simply
+    # waits for the build in progress instead of starting a second one
+    return asyncio.get_running_loop().run_in_executor(None, run)
@@ -507,6 +507,11 @@ document.addEventListener('DOMContentLoaded', function() {
           const data = await response.json();
           console.log('✅ API response successful:', data);
           
+          // In token mode the session ID changes with every answer
+          if (data.session_id) {
+            gameState.sessionId = data.session_id;
+          }
+          
           // Process API response and update UI
           handleAPIResponse(data);
           return; // Exit if API call succeeds
@@ -0,0 +1,252 @@
+"""Circuit breaker around the LLM provider.
+
+When the model server is down or overloaded every call waits for its timeout.
+``CircuitBreakerLLM`` records the outcome of the last ``window`` calls; a call
+fails when it raises or takes longer than ``slow_call_seconds``. Once at least
+``min_calls`` were made and the failure rate reaches ``failure_rate``, the
+circuit opens: calls raise ``CircuitOpenError`` at once, and callers take
+their fallback path (the scenario database) without waiting. After
+``open_seconds`` the circuit is half-open and lets one probe call through: the
+circuit closes if it succeeds and opens again if it fails.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from iso_standards_games.llm.provider import LLMInterface
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Failure-rate and slow-call circuit breaker with half-open probes."""
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 10,
+        min_calls: int = 3,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a closed circuit.
+
+        Args:
+            name: Name of the protected service, for the logs
+            window: Last calls the failure rate is computed on
+            min_calls: Calls needed in the window before the circuit may open
+            failure_rate: Share of failed calls that opens the circuit
+            slow_call_seconds: Calls slower than this count as failed
+            open_seconds: Seconds the circuit stays open before a probe
+            clock: Source of the current time in seconds
+        """
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=max(window, self.min_calls))
+        self._opened_at = 0.0
+        self._probing = False
+        self.state = CLOSED
+
+        # Metrics
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.transitions: Counter = Counter()
+
+    def _transition(self, state: str, reason: str) -> None:
+        previous, self.state = self.state, state
+        self.transitions[f"{previous}->{state}"] += 1
+        icon = {OPEN: "🔴", HALF_OPEN: "🟡", CLOSED: "🟢"}[state]
+        print(f"{icon} {self.name} circuit {previous} -> {state}: {reason}")
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (as a probe when half-open)."""
+        if self.state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, f"probing after {self.open_seconds:g}s")
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+            return True
+        if self.state == OPEN:
+            self.rejected += 1
+            return False
+        return True
+
+    def check(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go through now."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is {self.state}")
+
+    def record(self, elapsed: float, error: Optional[BaseException] = None) -> None:
+        """Record the outcome of a call that went through."""
+        self.calls += 1
+        slow = elapsed >= self.slow_call_seconds
+        failed = error is not None or slow
+        self.failures += error is not None
+        self.slow_calls += slow
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if failed:
+                self._open(f"probe failed ({self._describe(elapsed, error)})")
+            else:
+                self._outcomes.clear()
+                self._transition(CLOSED, f"probe succeeded in {elapsed:.2f}s")
+            return
+        self._outcomes.append(failed)
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+            rate = self.current_failure_rate()
+            if rate >= self.failure_rate:
+                self._open(f"{rate:.0%} of the last {len(self._outcomes)} calls failed "
+                           f"(last: {self._describe(elapsed, error)})")
+
+    def release(self) -> None:
+        """Forget a call that was abandoned before its outcome was known."""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def _open(self, reason: str) -> None:
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self._transition(OPEN, reason)
+
+    def _describe(self, elapsed: float, error: Optional[BaseException]) -> str:
+        return repr(error) if error is not None else f"slow call, {elapsed:.2f}s"
+
+    def current_failure_rate(self) -> Optional[float]:
+        if not self._outcomes:
+            return None
+        return sum(self._outcomes) / len(self._outcomes)
+
+    async def call(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Await ``call()`` through the breaker."""
+        self.check()
+        start = self._clock()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._abandoned(self._clock() - start)
+            raise
+        except Exception as e:
+            self.record(self._clock() - start, e)
+            raise
+        self.record(self._clock() - start)
+        return result
+
+    async def stream(self, call: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Iterate ``call()`` through the breaker; the latency is the time to the first chunk."""
+        self.check()
+        start = self._clock()
+        first: Optional[float] = None
+        stream = call()
+        try:
+            async for chunk in stream:
+                if first is None:
+                    first = self._clock() - start
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            if first is None:
+                self._abandoned(self._clock() - start)
+            else:
+                self.record(first)
+            raise
+        except Exception as e:
+            self.record(self._clock() - start if first is None else first, e)
+            raise
+        finally:
+            await stream.aclose()
+        self.record(self._clock() - start if first is None else first)
+
+    def _abandoned(self, elapsed: float) -> None:
+        # A caller timing out on a slow model is a failure; otherwise unknown
+        if elapsed >= self.slow_call_seconds:
+            self.record(elapsed)
+        else:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state, the failure rate of the window and the transitions."""
+        rate = self.current_failure_rate()
+        return {
+            "state": self.state,
+            "failure_rate": round(rate, 4) if rate is not None else None,
+            "failure_rate_threshold": self.failure_rate,
+            "slow_call_seconds": self.slow_call_seconds,
+            "open_seconds": self.open_seconds,
+            "calls": self.calls,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
+
+
+class CircuitBreakerLLM(LLMInterface):
+    """LLM provider failing fast while its circuit breaker is open."""
+
+    def __init__(self, provider: LLMInterface, breaker: CircuitBreaker):
+        """Wrap a provider.
+
+        Args:
+            provider: Provider the calls go to while the circuit lets them
+            breaker: Circuit breaker of the provider
+        """
+        self.provider = provider
+        self.breaker = breaker
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> str:
+        """Generate text, or raise ``CircuitOpenError`` at once while the circuit is open."""
+        return await self.breaker.call(
+            lambda: self.provider.generate_text(prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+
+    async def generate_structured_output(
+        self,
+        prompt: str,
+        output_schema: Dict,
+        temperature: float = 0.7
+    ) -> Dict:
+        """Generate structured output, or raise ``CircuitOpenError`` at once while the circuit is open."""
+        return await self.breaker.call(
+            lambda: self.provider.generate_structured_output(prompt, output_schema, temperature=temperature)
+        )
+
+    def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Stream text, or raise ``CircuitOpenError`` at once while the circuit is open."""
+        return self.breaker.stream(
+            lambda: self.provider.stream_text(prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.breaker.stats()
@@ -0,0 +1,313 @@
+"""Persistent cache of LLM responses.
+
+``CachedLLM`` wraps a provider and keeps its responses in a SQLite table,
+keyed by a hash of the provider, model, call parameters and the prompt with
+its whitespace normalized. Up to ``variants`` responses are kept per key:
+until a key has them all, calls go to the model and add one; from then on a
+call returns one of them at random, so a repeated prompt still varies. Entries
+expire after ``ttl`` seconds, and the least recently used ones are evicted
+when the table outgrows ``max_bytes``.
+
+The table may live in the application database and be shared by every worker.
+``CachedLLM`` queries it in the default executor, so a slow disk or a write
+lock held by another worker does not block the event loop.
+
+A caller can tell whether its calls reached the model: the lookups made
+inside ``count_cache_lookups()`` are counted on the object it yields.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from iso_standards_games.llm.provider import LLMInterface
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT NOT NULL,
+    variant INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (key, variant)
+);
+CREATE INDEX IF NOT EXISTS llm_cache_by_use ON llm_cache (used);
+"""
+
+# A hit only records its use when the last one is older than this, so that
+# most lookups do not write
+_USE_GRANULARITY = 60.0
+
+
+class CacheLookups:
+    """Cache hits and misses of the calls made in a ``count_cache_lookups()`` block."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+
+_lookups: ContextVar[Optional[CacheLookups]] = ContextVar("llm_cache_lookups", default=None)
+
+
+@contextmanager
+def count_cache_lookups() -> Iterator[CacheLookups]:
+    """Count the cache lookups of the LLM calls made in the block.
+
+    A generation shared by ``CoalescedLLM`` counts for the call that started it.
+    """
+    lookups = CacheLookups()
+    token = _lookups.set(lookups)
+    try:
+        yield lookups
+    finally:
+        _lookups.reset(token)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse every run of whitespace, so indentation changes share entries."""
+    return " ".join(prompt.split())
+
+
+class LLMCache:
+    """SQLite table of LLM responses with TTL, variants and an LRU size cap."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        max_bytes: int,
+        variants: int = 1,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the cache, creating the table if needed.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds a response is served after it was generated
+            max_bytes: Bytes of responses kept at most
+            variants: Responses kept and sampled from per key
+            clock: Source of the current time in seconds
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.variants = max(1, variants)
+        self._clock = clock
+        self._local = threading.local()
+        self._rng = random.Random()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def key(*parts: Any, prompt: str) -> str:
+        """Hash of the call parameters and the normalized prompt."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(repr(part).encode("utf-8") + b"\0")
+        digest.update(normalize_prompt(prompt).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str, variants: Optional[int] = None) -> Optional[Any]:
+        """Return a cached response, or None until the key has all its variants."""
+        variants = self.variants if variants is None else max(1, variants)
+        now = self._clock()
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT variant, value, used FROM llm_cache WHERE key = ? AND created > ?",
+            (key, now - self.ttl),
+        ).fetchall()
+        if len(rows) < variants:
+            self.misses += 1
+            return None
+        variant, value, used = self._rng.choice(rows)
+        if now - used >= _USE_GRANULARITY:
+            connection.execute(
+                "UPDATE llm_cache SET used = ? WHERE key = ? AND variant = ?", (now, key, variant)
+            )
+        self.hits += 1
+        return json.loads(value)
+
+    def put(self, key: str, value: Any, variants: Optional[int] = None) -> None:
+        """Store a response as a new variant of ``key`` (replacing the oldest when full)."""
+        variants = self.variants if variants is None else max(1, variants)
+        now = self._clock()
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT variant, created FROM llm_cache WHERE key = ? ORDER BY created", (key,)
+        ).fetchall()
+        # Reuse the slot of an expired or the oldest variant once all are taken
+        taken = {variant for variant, _ in rows}
+        free = [variant for variant in range(variants) if variant not in taken]
+        variant = free[0] if free else rows[0][0]
+        connection.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, variant, value, size, created, used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, variant, encoded, len(encoded), now, now),
+        )
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        connection = self._connection()
+        expired = connection.execute(
+            "DELETE FROM llm_cache WHERE created <= ?", (now - self.ttl,)
+        ).rowcount
+        self.evictions += max(expired, 0)
+        (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        while total > self.max_bytes:
+            oldest = connection.execute(
+                "SELECT rowid, size FROM llm_cache ORDER BY used LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+            victims = []
+            for rowid, size in oldest:
+                if total <= self.max_bytes:
+                    break
+                victims.append((rowid,))
+                total -= size
+            connection.executemany("DELETE FROM llm_cache WHERE rowid = ?", victims)
+            self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size of the table and this process's hit rate."""
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "variants": self.variants,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+class CachedLLM(LLMInterface):
+    """LLM provider answering from an ``LLMCache`` before calling the model."""
+
+    def __init__(self, provider: LLMInterface, cache: LLMCache, name: str, model: str):
+        """Wrap a provider.
+
+        Args:
+            provider: Provider the cache misses go to
+            cache: Response cache
+            name: Provider name, part of the cache keys
+            model: Model or deployment name, part of the cache keys
+        """
+        self.provider = provider
+        self.cache = cache
+        self.name = name
+        self.model = model
+
+    def _variants(self, temperature: float) -> int:
+        # Without sampling every call gives the same answer: one is enough
+        return 1 if temperature <= 0 else self.cache.variants
+
+    async def _get(self, key: str, variants: int) -> Optional[Any]:
+        cached = await asyncio.get_running_loop().run_in_executor(None, self.cache.get, key, variants)
+        lookups = _lookups.get()
+        if lookups is not None:
+            if cached is None:
+                lookups.misses += 1
+            else:
+                lookups.hits += 1
+        return cached
+
+    async def _put(self, key: str, value: Any, variants: int) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.cache.put, key, value, variants)
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> str:
+        """Generate text, from the cache when possible."""
+        key = LLMCache.key(self.name, self.model, "text", max_tokens, temperature, prompt=prompt)
+        variants = self._variants(temperature)
+        cached = await self._get(key, variants)
+        if cached is not None:
+            return cached
+        text = await self.provider.generate_text(prompt, max_tokens=max_tokens, temperature=temperature)
+        if text:
+            await self._put(key, text, variants)
+        return text
+
+    async def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Stream text, from the cache when possible (sharing entries with ``generate_text``)."""
+        key = LLMCache.key(self.name, self.model, "text", max_tokens, temperature, prompt=prompt)
+        variants = self._variants(temperature)
+        cached = await self._get(key, variants)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        stream = self.provider.stream_text(prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        # Only reached when the consumer read the whole response
+        text = "".join(chunks)
+        if text:
+            await self._put(key, text, variants)
+
+    async def generate_structured_output(
+        self,
+        prompt: str,
+        output_schema: Dict,
+        temperature: float = 0.7
+    ) -> Dict:
+        """Generate structured output, from the cache when possible."""
+        schema = json.dumps(output_schema, sort_keys=True, default=str)
+        key = LLMCache.key(self.name, self.model, "structured", schema, temperature, prompt=prompt)
+        variants = self._variants(temperature)
+        cached = await self._get(key, variants)
+        if cached is not None:
+            return cached
+        output = await self.provider.generate_structured_output(prompt, output_schema, temperature=temperature)
+        # Unparsable answers are not worth serving again
+        if not (isinstance(output, dict) and "error" in output):
+            await self._put(key, output, variants)
+        return output
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
@@ -0,0 +1,233 @@
+"""Background pool of pre-generated LLM scenarios.
+
+Generating scenarios with the LLM takes seconds, so session creation does not
+wait for it. A ``ScenarioPool`` keeps a bounded queue of validated scenarios
+per (quality attribute, language), and a background task refills the emptiest
+queue with one LLM batch every ``refill_interval`` seconds. A batch is
+streamed: each scenario joins the queue as soon as the model has written it,
+so a queue is usable again after one scenario's worth of tokens rather than a
+whole batch. ``take()`` pops scenarios in O(1) and never waits: when a queue
+is empty the caller falls back to the scenario database, and that queue is
+refilled first.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from iso_standards_games.core.config import settings
+from iso_standards_games.llm.breaker import CircuitOpenError
+
+# (quality attribute or None for mixed, language)
+PoolKey = Tuple[Optional[str], str]
+
+# Streams one batch of validated scenarios for (quality attribute, language)
+BatchGenerator = Callable[[Optional[str], str], AsyncIterator[Dict[str, Any]]]
+
+# Queues kept at most: quality attributes are free text in the requests
+MAX_KEYS = 32
+
+# Longest pause after consecutive failed batches, in seconds
+MAX_BACKOFF = 300.0
+
+
+class ScenarioPool:
+    """Bounded queues of LLM scenarios, refilled by a background task."""
+
+    def __init__(
+        self,
+        generate: BatchGenerator,
+        depth: Optional[int] = None,
+        refill_interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        warm: Sequence[PoolKey] = (),
+        max_keys: int = MAX_KEYS,
+    ):
+        """Initialize the pool.
+
+        Args:
+            generate: Async generator function streaming a batch of scenarios
+            depth: Scenarios kept per queue (default: settings.LLM_POOL_DEPTH)
+            refill_interval: Seconds between two batches (default:
+                settings.LLM_POOL_REFILL_INTERVAL)
+            timeout: Seconds a batch may take (default: settings.LLM_POOL_TIMEOUT)
+            warm: Queues filled from the start, before anyone asks for them
+            max_keys: Queues kept at most; other keys are never pooled
+        """
+        self.generate = generate
+        self.depth = depth if depth is not None else settings.LLM_POOL_DEPTH
+        self.refill_interval = (
+            refill_interval if refill_interval is not None else settings.LLM_POOL_REFILL_INTERVAL
+        )
+        self.timeout = timeout if timeout is not None else settings.LLM_POOL_TIMEOUT
+        self.max_keys = max_keys
+        self._queues: Dict[PoolKey, Deque[Dict[str, Any]]] = {}
+        for attribute, language in warm:
+            self._queue(attribute, language)
+        self._wanted = asyncio.Event()
+        self._task: Optional["asyncio.Task"] = None
+
+        # Metrics
+        self.requests = 0
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.batches = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_refill_ms = 0.0
+        self.average_refill_ms = 0.0
+        self.last_first_scenario_ms = 0.0
+        self.average_first_scenario_ms = 0.0
+        self._failures_in_row = 0
+
+    @staticmethod
+    def key(attribute: Optional[str], language: str) -> PoolKey:
+        return ((attribute or "").strip() or None, language)
+
+    def _queue(self, attribute: Optional[str], language: str) -> Optional[Deque[Dict[str, Any]]]:
+        key = self.key(attribute, language)
+        queue = self._queues.get(key)
+        if queue is None and len(self._queues) < self.max_keys:
+            queue = self._queues[key] = deque()
+        return queue
+
+    def take(self, attribute: Optional[str], language: str, count: int) -> List[Dict[str, Any]]:
+        """Pop up to ``count`` scenarios for (attribute, language), without waiting.
+
+        Returns:
+            The scenarios available, possibly none; the caller completes them
+        """
+        self.requests += 1
+        queue = self._queue(attribute, language) if self.depth > 0 else None
+        if not queue:
+            self.misses += 1
+            scenarios = []
+        else:
+            scenarios = [queue.popleft() for _ in range(min(count, len(queue)))]
+            if len(scenarios) == count:
+                self.hits += 1
+            else:
+                self.partial_hits += 1
+        if queue is not None and len(queue) < self.depth:
+            self._wanted.set()
+        return scenarios
+
+    def _emptiest(self) -> Optional[PoolKey]:
+        """Key of the queue that is the furthest from full, or None if all are full."""
+        best = None
+        best_size = self.depth
+        for key, queue in self._queues.items():
+            if len(queue) < best_size:
+                best, best_size = key, len(queue)
+        return best
+
+    async def refill(self, key: PoolKey) -> int:
+        """Stream one batch into the queue of ``key``; return the scenarios added.
+
+        Scenarios streamed before a failure or the timeout are kept.
+        """
+        queue = self._queues[key]
+        start = time.perf_counter()
+        added = 0
+
+        async def stream() -> None:
+            nonlocal added
+            async for scenario in self.generate(*key):
+                if added == 0:
+                    self._record_first_scenario((time.perf_counter() - start) * 1000)
+                if len(queue) < self.depth:
+                    queue.append(scenario)
+                    added += 1
+
+        try:
+            await asyncio.wait_for(stream(), timeout=self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except CircuitOpenError:
+            # The LLM is known to be down: no backoff, so the next batch can
+            # probe it as soon as the circuit allows
+            self.rejected += 1
+            return added
+        except Exception as e:
+            self.failures += 1
+            self._failures_in_row += 1
+            self.generated += added
+            print(f"⚠️ LLM scenario batch for {key} failed after {added} scenarios: {e!r}")
+            return added
+        elapsed = (time.perf_counter() - start) * 1000
+        self.batches += 1
+        self._failures_in_row = 0
+        self.last_refill_ms = elapsed
+        # Moving average over about the last ten batches
+        self.average_refill_ms = (
+            elapsed if self.batches == 1 else self.average_refill_ms * 0.9 + elapsed * 0.1
+        )
+        self.generated += added
+        return added
+
+    def _record_first_scenario(self, elapsed: float) -> None:
+        first = self.last_first_scenario_ms == 0.0
+        self.last_first_scenario_ms = elapsed
+        self.average_first_scenario_ms = (
+            elapsed if first else self.average_first_scenario_ms * 0.9 + elapsed * 0.1
+        )
+
+    def start(self) -> "asyncio.Task":
+        """Start refilling on the running event loop (call from a startup hook)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            print(f"🤖 LLM scenario pool started ({self.depth} per queue, every {self.refill_interval:g}s)")
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the task and wait for it (call from a shutdown hook)."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        print("🤖 LLM scenario pool stopped")
+
+    async def _run(self) -> None:
+        while True:
+            key = self._emptiest()
+            if key is None:
+                self._wanted.clear()
+                await self._wanted.wait()
+                continue
+            await self.refill(key)
+            delay = self.refill_interval
+            if self._failures_in_row:
+                delay = min(delay * 2 ** self._failures_in_row, MAX_BACKOFF)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the depth of every queue, the hit rate and the refill latency."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "depth": self.depth,
+            "refill_interval": self.refill_interval,
+            "queues": {
+                f"{attribute or 'mixed'}/{language}": len(queue)
+                for (attribute, language), queue in self._queues.items()
+            },
+            "requests": self.requests,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / self.requests, 4) if self.requests else None,
+            "generated": self.generated,
+            "batches": self.batches,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "last_refill_ms": round(self.last_refill_ms, 1),
+            "average_refill_ms": round(self.average_refill_ms, 1),
+            "last_first_scenario_ms": round(self.last_first_scenario_ms, 1),
+            "average_first_scenario_ms": round(self.average_first_scenario_ms, 1),
+        }
@@ -1,7 +1,9 @@
 """LLM provider abstraction."""
 
+import sqlite3
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 from iso_standards_games.core.config import LLMProvider, settings
 
@@ -29,16 +31,50 @@ class LLMInterface(ABC):
         """Generate structured output based on a prompt and schema."""
         pass
 
+    async def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Generate text as a stream of chunks (one chunk unless the provider streams)."""
+        yield await self.generate_text(prompt, max_tokens=max_tokens, temperature=temperature)
+
+    async def aclose(self) -> None:
+        """Close the provider's connections."""
+        pass
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def llm_http_client(base_url: str = ""):
+    """Create a pooled HTTP client for an LLM API, with the configured limits."""
+    import httpx
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=settings.LLM_HTTP2 and _http2_available(),
+    )
+
 
 class OllamaProvider(LLMInterface):
     """Ollama LLM provider implementation."""
     
     def __init__(self):
         """Initialize the Ollama provider."""
-        import httpx
-        # Use longer timeout for batch generation (5 minutes)
-        timeout = httpx.Timeout(300.0)
-        self.client = httpx.AsyncClient(base_url=settings.OLLAMA_BASE_URL, timeout=timeout)
+        # Long timeout for batch generation (LLM_HTTP_TIMEOUT, 5 minutes by default)
+        self.client = llm_http_client(settings.OLLAMA_BASE_URL)
         self.model = settings.OLLAMA_MODEL
     
     async def generate_text(
@@ -63,6 +99,38 @@ class OllamaProvider(LLMInterface):
         data = response.json()
         return data.get("response", "")
     
+    async def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Stream text from the Ollama API, one chunk per JSON line."""
+        import json
+        async with self.client.stream(
+            "POST",
+            "/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": temperature,
+                }
+            }
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+    
     async def generate_structured_output(
         self,
         prompt: str,
@@ -99,6 +167,10 @@ class OllamaProvider(LLMInterface):
             # Return error if JSON parsing fails
             return {"error": "Failed to parse JSON response", "text": response}
 
+    async def aclose(self) -> None:
+        """Close the HTTP client."""
+        await self.client.aclose()
+
 
 class AzureOpenAIProvider(LLMInterface):
     """Azure OpenAI provider implementation."""
@@ -111,6 +183,7 @@ class AzureOpenAIProvider(LLMInterface):
             api_key=settings.AZURE_OPENAI_API_KEY,
             api_version=settings.AZURE_OPENAI_API_VERSION,
             azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+            http_client=llm_http_client(),
         )
         self.deployment_name = settings.AZURE_OPENAI_DEPLOYMENT_NAME
     
@@ -129,6 +202,24 @@ class AzureOpenAIProvider(LLMInterface):
         )
         return response.choices[0].message.content
     
+    async def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Stream text from the Azure OpenAI API."""
+        stream = await self.client.chat.completions.create(
+            model=self.deployment_name,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
     async def generate_structured_output(
         self,
         prompt: str,
@@ -149,12 +240,96 @@ class AzureOpenAIProvider(LLMInterface):
         except json.JSONDecodeError:
             return {"error": "Failed to parse JSON response", "text": response.choices[0].message.content}
 
+    async def aclose(self) -> None:
+        """Close the HTTP client."""
+        await self.client.close()
+
+
+# One provider (and HTTP connection pool) per process, shared by every caller
+_providers: Dict[LLMProvider, LLMInterface] = {}
+_providers_lock = threading.Lock()
+
 
 def get_llm_provider() -> LLMInterface:
-    """Get the configured LLM provider instance."""
+    """Get the configured LLM provider, created once per process.
+
+    Concurrent identical calls share one generation, and responses are served
+    from the response cache when it is enabled. Close it with
+    ``close_llm_providers()`` on shutdown.
+    """
+    with _providers_lock:
+        provider = _providers.get(settings.LLM_PROVIDER)
+        if provider is None:
+            provider = _providers[settings.LLM_PROVIDER] = _create_llm_provider()
+        return provider
+
+
+async def close_llm_providers() -> None:
+    """Close the providers created by ``get_llm_provider()`` (call from a shutdown hook)."""
+    with _providers_lock:
+        providers = list(_providers.values())
+        _providers.clear()
+    for provider in providers:
+        await provider.aclose()
+
+
+def llm_model_name() -> str:
+    """Name of the configured provider and model, such as "ollama/qwen3"."""
+    if settings.LLM_PROVIDER == LLMProvider.AZURE:
+        return f"{settings.LLM_PROVIDER.value}/{settings.AZURE_OPENAI_DEPLOYMENT_NAME}"
+    return f"{settings.LLM_PROVIDER.value}/{settings.OLLAMA_MODEL}"
+
+
+def _create_llm_provider() -> LLMInterface:
     if settings.LLM_PROVIDER == LLMProvider.OLLAMA:
-        return OllamaProvider()
+        provider: LLMInterface = OllamaProvider()
+        model = settings.OLLAMA_MODEL
     elif settings.LLM_PROVIDER == LLMProvider.AZURE:
-        return AzureOpenAIProvider()
+        provider = AzureOpenAIProvider()
+        model = settings.AZURE_OPENAI_DEPLOYMENT_NAME
     else:
-        raise ValueError(f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
\ No newline at end of file
+        raise ValueError(f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
+
+    from iso_standards_games.llm.breaker import CircuitBreaker, CircuitBreakerLLM
+    from iso_standards_games.llm.cache import CachedLLM, LLMCache
+    from iso_standards_games.llm.singleflight import CoalescedLLM
+
+    # Inside the cache, so that cached responses are still served while it is open
+    if settings.LLM_BREAKER_ENABLED:
+        provider = CircuitBreakerLLM(provider, CircuitBreaker(
+            f"LLM ({settings.LLM_PROVIDER.value})",
+            window=settings.LLM_BREAKER_WINDOW,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+        ))
+
+    if settings.LLM_CACHE_ENABLED:
+        from iso_standards_games.core.scenario_store import sqlite_path
+
+        try:
+            cache = LLMCache(
+                sqlite_path(settings.LLM_CACHE_DATABASE_URL or settings.DATABASE_URL),
+                ttl=settings.LLM_CACHE_TTL,
+                max_bytes=settings.LLM_CACHE_MAX_BYTES,
+                variants=settings.LLM_CACHE_VARIANTS,
+            )
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f"⚠️ LLM response cache unavailable, calling the model directly: {e}")
+        else:
+            provider = CachedLLM(provider, cache, settings.LLM_PROVIDER.value, model)
+
+    # Outside the cache, so that calls sharing a generation store it once
+    if settings.LLM_SINGLE_FLIGHT_MAX_FAN_IN > 1:
+        provider = CoalescedLLM(provider, settings.LLM_SINGLE_FLIGHT_MAX_FAN_IN)
+    return provider
+
+
+def provider_layer(provider: Optional[LLMInterface], layer_type: type) -> Optional[LLMInterface]:
+    """Return the wrapper of type ``layer_type`` in a provider chain, or None."""
+    while provider is not None:
+        if isinstance(provider, layer_type):
+            return provider
+        provider = getattr(provider, "provider", None)
+    return None
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""Choice of the scenario source of a new session within a latency budget.
+
+A session can get its scenarios from the pre-generated pool, from a live LLM
+generation, or from the scenario database. ``SourceScheduler`` keeps a model
+of the recent LLM latency per provider/model (an EWMA and a quantile over a
+window of batches, both for the first scenario and for the whole batch) and
+decides up front: the pool when it has enough scenarios, a live generation
+only when the predicted latency fits the request's budget, and the database
+otherwise. The database answers in milliseconds, so a session is created
+within its budget whatever the speed of the model.
+"""
+
+import math
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+POOL = "pool"
+LLM = "llm"
+DATABASE = "database"
+
+
+class LatencyModel:
+    """EWMA and windowed quantiles of a latency, in milliseconds."""
+
+    def __init__(self, window: int = 50, alpha: float = 0.2):
+        """Initialize an empty model.
+
+        Args:
+            window: Observations the quantiles are computed on
+            alpha: Weight of the newest observation in the EWMA
+        """
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self._window: Deque[float] = deque(maxlen=window)
+
+    def observe(self, ms: float) -> None:
+        self._window.append(ms)
+        self.ewma = ms if self.ewma is None else self.ewma + self.alpha * (ms - self.ewma)
+
+    @property
+    def count(self) -> int:
+        return len(self._window)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile of the window, or None without observations."""
+        if not self._window:
+            return None
+        ordered = sorted(self._window)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def stats(self) -> Dict[str, Any]:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 1) if value is not None else None
+
+        return {
+            "count": self.count,
+            "ewma_ms": rounded(self.ewma),
+            "p50_ms": rounded(self.quantile(0.5)),
+            "p95_ms": rounded(self.quantile(0.95)),
+        }
+
+
+class SourceScheduler:
+    """Pick the pool, a live LLM generation or the database for a new session."""
+
+    def __init__(
+        self,
+        budget_ms: float,
+        batch_size: int = 5,
+        quantile: float = 0.95,
+        min_observations: int = 3,
+        window: int = 50,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            budget_ms: Default latency budget of a session creation
+            batch_size: Scenarios in one LLM batch
+            quantile: Latency quantile that must fit in the budget
+            min_observations: Batches observed before a live generation is tried
+            window: Batches the latency quantiles are computed on
+        """
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.quantile = quantile
+        self.min_observations = min_observations
+        self.window = window
+        self._first: Dict[str, LatencyModel] = {}
+        self._batch: Dict[str, LatencyModel] = {}
+        self.selection = LatencyModel(window=1000)
+        self.decisions: Counter = Counter()
+
+    def _models(self, model: str) -> Tuple[LatencyModel, LatencyModel]:
+        if model not in self._batch:
+            self._first[model] = LatencyModel(self.window)
+            self._batch[model] = LatencyModel(self.window)
+        return self._first[model], self._batch[model]
+
+    def observe(self, model: str, first_ms: Optional[float], batch_ms: float) -> None:
+        """Record an LLM batch: time to its first scenario and to its end."""
+        first, batch = self._models(model)
+        if first_ms is not None:
+            first.observe(first_ms)
+        batch.observe(batch_ms)
+
+    def predict(self, model: str, count: int) -> Optional[float]:
+        """Predicted latency (at the quantile) to stream ``count`` scenarios, or None if unknown."""
+        first, batch = self._models(model)
+        if batch.count < self.min_observations:
+            return None
+        whole = batch.quantile(self.quantile)
+        head = first.quantile(self.quantile) if first.count else whole
+        # Scenarios after the first arrive at a steady pace
+        per_scenario = max(whole - head, 0.0) / max(self.batch_size - 1, 1)
+        return head + per_scenario * (min(count, self.batch_size) - 1)
+
+    def choose(
+        self,
+        model: str,
+        pooled: int,
+        needed: int,
+        budget_ms: Optional[float] = None,
+        llm_ready: bool = True,
+    ) -> str:
+        """Decide where the scenarios missing from the pool come from.
+
+        Args:
+            model: Provider/model the live generation would use
+            pooled: Scenarios available in the pool
+            needed: Scenarios the session needs
+            budget_ms: Latency budget of this request (default: the scheduler's)
+            llm_ready: Whether a live generation is possible at all
+        """
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        if pooled >= needed:
+            source = POOL
+        else:
+            predicted = self.predict(model, needed - pooled) if llm_ready else None
+            source = LLM if predicted is not None and predicted <= budget_ms else DATABASE
+        self.decisions[source] += 1
+        return source
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the latency models, the decisions and the scenario selection latency."""
+        return {
+            "budget_ms": self.budget_ms,
+            "quantile": self.quantile,
+            "decisions": dict(self.decisions),
+            "scenario_selection": self.selection.stats(),
+            "models": {
+                model: {
+                    "first_scenario": self._first[model].stats(),
+                    "batch": self._batch[model].stats(),
+                }
+                for model in self._batch
+            },
+        }
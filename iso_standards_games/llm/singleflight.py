@@ -0,0 +1,196 @@
+"""Coalescing of concurrent identical LLM calls.
+
+A local model serves one generation at a time, so identical prompts sent at
+once (a whole class starting the same game) queue behind each other. With
+``CoalescedLLM`` the first call of a prompt starts a generation and concurrent
+calls with the same prompt and parameters join it: they all get its result,
+or replay its stream from the start. At most ``max_fan_in`` calls share one
+generation; the next one starts another, so a large crowd still gets some
+variety.
+
+The generation runs in its own task: a caller that gives up does not cancel it
+for the others, and it is cancelled only when every caller has left.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from iso_standards_games.llm.cache import LLMCache
+from iso_standards_games.llm.provider import LLMInterface
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One generation in progress and the callers sharing it."""
+
+    def __init__(self):
+        self.task: Optional["asyncio.Task"] = None
+        self.callers = 0  # Callers that joined, in total
+        self.waiting = 0  # Callers still waiting for it
+        # Streams only
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        # Wake the current readers; later ones wait on a fresh event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def leave(self) -> None:
+        self.waiting -= 1
+        if self.waiting == 0 and self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key."""
+
+    def __init__(self, max_fan_in: int):
+        """Initialize the registry.
+
+        Args:
+            max_fan_in: Callers sharing one call at most (1 = no sharing)
+        """
+        self.max_fan_in = max(1, max_fan_in)
+        self._flights: Dict[str, _Flight] = {}
+
+        # Metrics
+        self.calls = 0
+        self.flights = 0
+        self.joined = 0
+
+    def _join(self, key: str) -> Tuple[_Flight, bool]:
+        """Return the flight of ``key`` to join, and whether it is a new one."""
+        self.calls += 1
+        flight = self._flights.get(key)
+        new = flight is None or flight.callers >= self.max_fan_in
+        if new:
+            flight = self._flights[key] = _Flight()
+            self.flights += 1
+        else:
+            self.joined += 1
+        flight.callers += 1
+        flight.waiting += 1
+        return flight, new
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        # A full flight may already have been replaced by a newer one
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def run(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Await ``call()``, or the call already in flight for ``key``."""
+        flight, new = self._join(key)
+        if new:
+            flight.task = asyncio.ensure_future(call())
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.leave()
+
+    async def stream(self, key: str, call: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Iterate ``call()``, or replay and follow the stream already in flight for ``key``."""
+        flight, new = self._join(key)
+        if new:
+            flight.task = asyncio.ensure_future(self._pump(key, flight, call))
+        try:
+            position = 0
+            while True:
+                changed = flight.changed
+                while position < len(flight.chunks):
+                    position += 1
+                    yield flight.chunks[position - 1]
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await changed.wait()
+        finally:
+            flight.leave()
+
+    async def _pump(self, key: str, flight: _Flight, call: Callable[[], AsyncIterator[str]]) -> None:
+        try:
+            async for chunk in call():
+                flight.chunks.append(chunk)
+                flight.notify()
+        except asyncio.CancelledError:
+            flight.error = RuntimeError("LLM generation cancelled")
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            flight.notify()
+            self._forget(key, flight)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the calls made, the generations started and the calls that joined one."""
+        return {
+            "max_fan_in": self.max_fan_in,
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "generations": self.flights,
+            "joined": self.joined,
+            "coalesced_rate": round(self.joined / self.calls, 4) if self.calls else None,
+        }
+
+
+class CoalescedLLM(LLMInterface):
+    """LLM provider sharing one generation among concurrent identical calls."""
+
+    def __init__(self, provider: LLMInterface, max_fan_in: int):
+        """Wrap a provider.
+
+        Args:
+            provider: Provider the generations go to
+            max_fan_in: Calls sharing one generation at most
+        """
+        self.provider = provider
+        self.flights = SingleFlight(max_fan_in)
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> str:
+        """Generate text, sharing a generation in flight with the same prompt."""
+        key = LLMCache.key("text", max_tokens, temperature, prompt=prompt)
+        return await self.flights.run(
+            key, lambda: self.provider.generate_text(prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+
+    async def generate_structured_output(
+        self,
+        prompt: str,
+        output_schema: Dict,
+        temperature: float = 0.7
+    ) -> Dict:
+        """Generate structured output, sharing a generation in flight with the same prompt."""
+        key = LLMCache.key("structured", repr(output_schema), temperature, prompt=prompt)
+        return await self.flights.run(
+            key, lambda: self.provider.generate_structured_output(prompt, output_schema, temperature=temperature)
+        )
+
+    def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Stream text, following a stream in flight with the same prompt from its start."""
+        # A stream cannot join a complete text in flight (or the reverse)
+        key = LLMCache.key("stream", max_tokens, temperature, prompt=prompt)
+        return self.flights.stream(
+            key, lambda: self.provider.stream_text(prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.flights.stats()
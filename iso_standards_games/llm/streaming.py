@@ -0,0 +1,107 @@
+"""Incremental parsing of JSON arrays streamed by an LLM.
+
+A model asked for a JSON array of objects writes it token by token. Instead of
+waiting for the whole response, ``JSONArrayParser`` yields each element of the
+first array of objects as soon as its closing brace arrives. Text around the
+array, such as a markdown fence, a ``{"scenarios": [...]}`` wrapper or prose
+with brackets of its own, is skipped.
+"""
+
+import json
+from typing import Any, AsyncIterator, List
+
+
+class JSONArrayParser:
+    """Feed text chunks, get back the objects of the first JSON array of objects as they complete."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0      # Next character to scan
+        self._started = False   # Inside the array
+        self._finished = False  # Past its closing bracket
+        self._depth = 0         # Nesting inside the current element
+        self._element_start = -1
+        self._in_string = False
+        self._escaped = False
+        self.skipped = 0        # Elements that were not valid JSON
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, text: str) -> List[Any]:
+        """Add a chunk; return the elements it completed.
+
+        Each character is scanned once, whatever the chunk boundaries (except
+        the whitespace after a ``[`` that ends a chunk).
+        """
+        if self._finished:
+            return []
+        self._buffer += text
+        elements = []
+        buffer = self._buffer
+        i = self._position
+        end = len(buffer)
+        while i < end:
+            char = buffer[i]
+            if not self._started:
+                if char == "[":
+                    # The array starts at a "[" followed by "{": brackets in
+                    # the prose before it are skipped
+                    following = i + 1
+                    while following < end and buffer[following].isspace():
+                        following += 1
+                    if following == end:
+                        # Undecided until the next chunk
+                        break
+                    self._started = buffer[following] == "{"
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._element_start = i
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # Closing bracket of the array itself
+                    self._finished = True
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        elements.append(json.loads(buffer[self._element_start:i + 1]))
+                    except json.JSONDecodeError:
+                        self.skipped += 1
+                    self._element_start = -1
+            i += 1
+
+        # Only the element being written needs to be kept
+        keep = self._element_start if self._element_start >= 0 else i
+        self._buffer = buffer[keep:]
+        self._position = i - keep
+        if self._element_start >= 0:
+            self._element_start = 0
+        return elements
+
+
+async def iter_json_array(chunks: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """Yield the elements of the first JSON array in a stream of text chunks."""
+    parser = JSONArrayParser()
+    try:
+        # The rest of the response is read (and ignored) so that a caching
+        # provider sees it complete
+        async for chunk in chunks:
+            for element in parser.feed(chunk):
+                yield element
+    finally:
+        # Stop the generation if the consumer gives up early
+        close = getattr(chunks, "aclose", None)
+        if close is not None:
+            await close()
@@ -7,7 +7,9 @@ import traceback
 import uuid
 import json
 import asyncio
-from typing import Dict, Any, Optional, List
+import random
+import time
+from typing import AsyncIterator, Dict, Any, Optional, List, Set
 from datetime import datetime
 
 try:
@@ -17,23 +19,47 @@ try:
     print("Importing required modules...")
     
     # FastAPI and related imports
-    from fastapi import FastAPI, HTTPException
+    from fastapi import FastAPI, Header, HTTPException, Query
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.staticfiles import StaticFiles
     from pydantic import BaseModel
     
+    # Startup cost accounting (printed once the app is created)
+    from iso_standards_games.core.startup import budget, report as startup_report, schedule_warm_up
+    from iso_standards_games.core.sampling import session_rng
+    from iso_standards_games.core.sessions import SessionReaper, SessionRecord, SessionStore, game_store
+    
     # Import LLM components
-    from iso_standards_games.llm.provider import get_llm_provider
-    from iso_standards_games.core.config import settings
+    with budget("import iso_standards_games.llm.provider"):
+        from iso_standards_games.llm.provider import close_llm_providers, get_llm_provider, llm_model_name, provider_layer
+        from iso_standards_games.llm.breaker import CLOSED, CircuitBreakerLLM
+        from iso_standards_games.llm.cache import CachedLLM, count_cache_lookups
+        from iso_standards_games.llm.singleflight import CoalescedLLM
+        from iso_standards_games.llm.pool import ScenarioPool
+        from iso_standards_games.llm.scheduler import LLM, SourceScheduler
+        from iso_standards_games.llm.streaming import iter_json_array
+        from iso_standards_games.core.config import settings
     
-    # Import the scenarios database
-    from quality_scenarios_db import get_random_scenarios, get_database_stats
+    # Import the scenarios database (the scenarios are loaded at warm-up)
+    with budget("import quality_scenarios_db"):
+        from quality_scenarios_db import get_random_scenarios, get_database_stats
+        from quality_scenarios_db import load_scenarios as load_quality_scenarios
+        from quality_scenarios_db import search_scenarios as search_quality_scenarios
+        from quality_scenarios_db import get_scenario as get_quality_scenario
     
     # Import RequirementRally database
-    from requirements_scenarios_db import get_random_scenarios as get_rally_scenarios, get_database_stats, validate_scenarios
+    with budget("import requirements_scenarios_db"):
+        from requirements_scenarios_db import get_random_scenarios as get_rally_scenarios, get_database_stats, validate_scenarios
+        from requirements_scenarios_db import load_scenarios as load_rally_scenarios
+        from requirements_scenarios_db import search_scenarios as search_rally_scenarios
+        from requirements_scenarios_db import get_scenario as get_rally_scenario
     
     # Import UsabilityUniverse database
-    from usability_scenarios_db import get_random_scenarios as get_usability_scenarios, get_database_stats as get_usability_stats, validate_scenarios as validate_usability_scenarios
+    with budget("import usability_scenarios_db"):
+        from usability_scenarios_db import get_random_scenarios as get_usability_scenarios, get_database_stats as get_usability_stats, validate_scenarios as validate_usability_scenarios
+        from usability_scenarios_db import load_scenarios as load_usability_scenarios
+        from usability_scenarios_db import search_scenarios as search_usability_scenarios
+        from usability_scenarios_db import get_scenario as get_usability_scenario
     
     print("All modules imported successfully")
     
@@ -42,6 +68,9 @@ try:
         name: str
         quality_attribute: str
         language: str = 'es'
+        player_token: Optional[str] = None  # Device token; the player's name is used if missing
+        seed: Optional[int] = None  # Replays a session: same seed and filters, same scenarios
+        latency_budget_ms: Optional[float] = None  # Time the scenarios may take (default: SESSION_LATENCY_BUDGET_MS)
     
     class GameSession(BaseModel):
         id: str
@@ -54,6 +83,7 @@ try:
     
     class ResponseSubmission(BaseModel):
         selected_option: str
+        scenario_index: Optional[int] = None  # Scenario answered; a retry of the last answer is replayed
     
     # RequirementRally models
     class RallySessionCreateRequest(BaseModel):
@@ -61,6 +91,8 @@ try:
         category: Optional[str] = None  # 'Functional', 'Non-Functional', 'Constraint', or None for mixed
         difficulty: Optional[str] = None  # 'easy', 'medium', 'hard', or None for mixed
         language: str = 'es'
+        player_token: Optional[str] = None  # Device token; the player's name is used if missing
+        seed: Optional[int] = None  # Replays a session: same seed and filters, same scenarios
     
     class RallyGameSession(BaseModel):
         id: str
@@ -75,6 +107,7 @@ try:
     
     class RallyResponseSubmission(BaseModel):
         selected_option: str
+        scenario_index: Optional[int] = None  # Scenario answered; a retry of the last answer is replayed
     
     class RallyGameResponse(BaseModel):
         is_correct: bool
@@ -83,6 +116,7 @@ try:
         score: int
         next_scenario: Optional[Dict[str, Any]] = None
         game_completed: bool = False
+        session_id: Optional[str] = None  # Changes with every answer in token mode
     
     # UsabilityUniverse models
     class UniverseSessionCreateRequest(BaseModel):
@@ -90,6 +124,8 @@ try:
         category: Optional[str] = None  # 'Learnability', 'Efficiency', 'Memorability', 'Error_Prevention', 'User_Satisfaction', or None for mixed
         difficulty: Optional[str] = None  # 'easy', 'medium', 'hard', or None for mixed
         language: str = 'en'  # Default to English
+        player_token: Optional[str] = None  # Device token; the player's name is used if missing
+        seed: Optional[int] = None  # Replays a session: same seed and filters, same scenarios
     
     class UniverseGameSession(BaseModel):
         id: str
@@ -101,9 +137,11 @@ try:
         created_at: str
         category_filter: Optional[str] = None
         difficulty_filter: Optional[str] = None
+        seed: Optional[int] = None
     
     class UniverseResponseSubmission(BaseModel):
         selected_option: str
+        scenario_index: Optional[int] = None  # Scenario answered; a retry of the last answer is replayed
     
     class UniverseGameResponse(BaseModel):
         is_correct: bool
@@ -112,6 +150,7 @@ try:
         score: int
         next_scenario: Optional[Dict[str, Any]] = None
         game_completed: bool = False
+        session_id: Optional[str] = None  # Changes with every answer in token mode
     
     class GameResponse(BaseModel):
         is_correct: bool
@@ -120,6 +159,7 @@ try:
         score: int
         next_scenario: Optional[Dict[str, Any]] = None
         game_completed: bool = False
+        session_id: Optional[str] = None  # Changes with every answer in token mode
     
     print("Creating app...")
     
@@ -143,6 +183,17 @@ try:
     @app.on_event("startup")
     async def startup_event():
         global llm_provider
+        # Build the scenario catalogs once (in the background by default, so
+        # the port opens without waiting for them)
+        await schedule_warm_up({
+            "quality_quest": load_quality_scenarios,
+            "requirement_rally": load_rally_scenarios,
+            "usability_universe": load_usability_scenarios,
+        })
+        # Reload the sessions of the last snapshot before serving
+        session_reaper.restore()
+        session_reaper.start()
+        
         try:
             print("Initializing LLM provider...")
             llm_provider = get_llm_provider()
@@ -150,88 +201,124 @@ try:
         except Exception as e:
             print(f"⚠️ LLM provider initialization failed: {e}")
             llm_provider = None
+        
+        # Pre-generate LLM scenarios in the background (sessions never wait for the LLM)
+        if llm_provider and scenario_pool.depth > 0 and not sessions.stateless:
+            scenario_pool.start()
+    
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await scenario_pool.stop()
+        for task in list(draining_generations):
+            task.cancel()
+        await session_reaper.stop()
+        await close_llm_providers()
+    
+    # Session storage, expired after the game's configured TTL / idle timeout
+    sessions: SessionStore = game_store("quality_quest")
     
-    # In-memory storage for sessions with cleanup
-    sessions: Dict[str, GameSession] = {}
+    # RequirementRally sessions
+    rally_sessions: SessionStore = game_store("requirement_rally")
     
-    # In-memory storage for RequirementRally sessions
-    rally_sessions: Dict[str, Dict[str, Any]] = {}
+    # UsabilityUniverse sessions
+    universe_sessions: SessionStore = game_store("usability_universe")
     
-    # In-memory storage for UsabilityUniverse sessions
-    universe_sessions: Dict[str, Dict[str, Any]] = {}
+    # Expires sessions in the background, even when none are being created
+    session_reaper = SessionReaper({
+        "quality_quest": sessions,
+        "requirement_rally": rally_sessions,
+        "usability_universe": universe_sessions,
+    })
     
     def cleanup_old_sessions():
-        """Remove sessions older than 1 hour"""
-        current_time = datetime.now()
-        expired_sessions = []
-        
-        for session_id, session_data in sessions.items():
-            session_created = datetime.fromisoformat(session_data["session"].created_at)
-            if (current_time - session_created).total_seconds() > 3600:  # 1 hour
-                expired_sessions.append(session_id)
-        
+        """Remove expired sessions"""
+        expired_sessions = sessions.expire()
         for session_id in expired_sessions:
-            del sessions[session_id]
             print(f"🧹 Cleaned up expired session: {session_id}")
-        
         return len(expired_sessions)
     
     def cleanup_old_rally_sessions():
-        """Remove RequirementRally sessions older than 1 hour"""
-        current_time = datetime.now()
-        expired_sessions = []
-        
-        for session_id, session_data in rally_sessions.items():
-            session_created = datetime.fromisoformat(session_data["session"].created_at)
-            if (current_time - session_created).total_seconds() > 3600:  # 1 hour
-                expired_sessions.append(session_id)
-        
+        """Remove expired RequirementRally sessions"""
+        expired_sessions = rally_sessions.expire()
         for session_id in expired_sessions:
-            del rally_sessions[session_id]
             print(f"🧹 Cleaned up expired RequirementRally session: {session_id}")
-        
         return len(expired_sessions)
     
     def cleanup_old_universe_sessions():
-        """Remove UsabilityUniverse sessions older than 1 hour"""
-        current_time = datetime.now()
-        expired_sessions = []
-        
-        for session_id, session_data in universe_sessions.items():
-            session_created = datetime.fromisoformat(session_data["session"].created_at)
-            if (current_time - session_created).total_seconds() > 3600:  # 1 hour
-                expired_sessions.append(session_id)
-        
+        """Remove expired UsabilityUniverse sessions"""
+        expired_sessions = universe_sessions.expire()
         for session_id in expired_sessions:
-            del universe_sessions[session_id]
             print(f"🧹 Cleaned up expired UsabilityUniverse session: {session_id}")
-        
         return len(expired_sessions)
     
-    async def generate_all_scenarios(quality_attribute: str = None, language: str = 'es') -> List[Dict[str, Any]]:
-        """Generate all 5 scenarios at once using LLM or database fallback"""
-        if not llm_provider:
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")
-            print(f"⚠️ [{timestamp}] LLM not available, using database fallback")
-            print(f"� [{timestamp}] CALLING get_random_scenarios() - should get NEW scenarios")
-            
-            scenarios = get_random_scenarios(5, quality_attribute, language, force_new_selection=True)
-            
-            print(f"🎲 [{timestamp}] RECEIVED from database:")
-            for i, s in enumerate(scenarios):
-                preview = s['content'][:40] + "..."
-                print(f"   {i+1}. {s['id'][:8]}... - {preview}")
-            
-            return scenarios
+    # Standard quality attributes for options generation
+    QUALITY_ATTRIBUTES = {
+        "es": ["Aptitud Funcional", "Eficiencia de desempeño", "Compatibilidad", "Usabilidad", "Fiabilidad", "Seguridad", "Mantenibilidad", "Portabilidad"],
+        "en": ["Functional Suitability", "Performance Efficiency", "Compatibility", "Usability", "Reliability", "Security", "Maintainability", "Portability"]
+    }
+    
+    def llm_scenario(scenario_data: Any, language: str, rng: random.Random) -> Optional[Dict[str, Any]]:
+        """Turn a scenario written by the LLM into a game scenario (None unless it is complete)"""
+        if not (isinstance(scenario_data, dict) and scenario_data.get('content')):
+            return None
+        # Get quality attribute and normalize it
+        quality_attr = str(scenario_data.get('qualityAttribute', 'Unknown'))
+        correct_option = str(scenario_data.get('correctOption', 'A')).strip().upper()[:1]
+        if correct_option not in ('A', 'B', 'C', 'D'):
+            correct_option = 'A'
+        
+        # Generate options with the correct answer in the right position
+        attributes_list = QUALITY_ATTRIBUTES[language]
+        
+        # Try to find the quality attribute in our standard list
+        correct_attr = quality_attr
+        for std_attr in attributes_list:
+            if quality_attr.lower().replace(' ', '') in std_attr.lower().replace(' ', ''):
+                correct_attr = std_attr
+                break
+        
+        # Create options with correct answer in specified position
+        other_attrs = [attr for attr in attributes_list if attr != correct_attr]
+        rng.shuffle(other_attrs)
+        
+        options = {}
+        option_keys = ['A', 'B', 'C', 'D']
+        
+        # Place correct answer in the specified position
+        correct_index = ord(correct_option) - ord('A')
+        
+        # Fill options
+        for j, key in enumerate(option_keys):
+            if j == correct_index:
+                options[key] = correct_attr
+            else:
+                # Use other attributes, cycling if needed
+                attr_index = (j - (1 if j > correct_index else 0)) % len(other_attrs)
+                options[key] = other_attrs[attr_index]
+        
+        scenario = {
+            "id": str(uuid.uuid4()),
+            "content": scenario_data['content'],
+            "options": options,
+            "correctOption": correct_option,
+            "explanation": scenario_data.get('explanation', 'LLM-generated explanation'),
+            "category": correct_attr
+        }
+        return scenario
+    
+    async def generate_llm_scenarios(quality_attribute: Optional[str] = None, language: str = 'es') -> AsyncIterator[Dict[str, Any]]:
+        """Stream a batch of validated scenarios from the LLM (run in the background by the scenario pool)
+        
+        The response is parsed as it streams in, so each scenario is yielded as
+        soon as the model has finished writing it.
+        """
+        rng = random.Random()
+        print(f"🤖 Generating 5 scenarios with LLM for quality attribute: {quality_attribute or 'mixed'}...")
+        
+        # Create a prompt for generating all scenarios at once
+        attribute_focus = f"with emphasis on {quality_attribute}" if quality_attribute else "covering different quality attributes"
+        prompt = f"""Generate 5 different software quality scenarios for the ISO/IEC 25010 quality model learning game {attribute_focus}.
         
-        try:
-            print(f"🤖 Generating all 5 scenarios with LLM for quality attribute: {quality_attribute or 'mixed'}...")
-            
-            # Create a prompt for generating all scenarios at once
-            attribute_focus = f"with emphasis on {quality_attribute}" if quality_attribute else "covering different quality attributes"
-            prompt = f"""Generate 5 different software quality scenarios for the ISO/IEC 25010 quality model learning game {attribute_focus}.
-            
 Each scenario should test understanding of one of these quality characteristics:
 1. Functional Suitability - Does the software provide functions that meet stated needs?
 2. Performance Efficiency - How well does the software perform relative to resources used?
@@ -253,126 +340,140 @@ Format your response as a JSON array with objects containing:
 - explanation: why this quality characteristic applies
 - qualityAttribute: the specific quality characteristic name
 
-Return exactly 5 scenarios in JSON format."""
-            
-            # Add timeout to LLM call to prevent hanging
-            response = await asyncio.wait_for(
-                llm_provider.generate_structured_output(prompt, {}),
-                timeout=15.0  # 15 seconds timeout
-            )
-            
-            # Handle LLM response parsing
-            scenarios_data = None
-            
-            if isinstance(response, dict) and 'scenarios' in response:
-                scenarios_data = response['scenarios']
-            elif isinstance(response, list):
-                scenarios_data = response
-            elif isinstance(response, dict) and 'error' in response and 'text' in response:
-                # Handle JSON wrapped in markdown code blocks
-                text = response['text']
-                print(f"🔧 Attempting to parse JSON from markdown-wrapped response")
-                
-                # Extract JSON from markdown code blocks
-                import re
-                json_match = re.search(r'```json\s*\n(.*?)\n```', text, re.DOTALL)
-                if json_match:
-                    try:
-                        import json
-                        json_text = json_match.group(1)
-                        scenarios_data = json.loads(json_text)
-                        print(f"✅ Successfully parsed {len(scenarios_data)} scenarios from markdown JSON")
-                    except json.JSONDecodeError as e:
-                        print(f"❌ Failed to parse extracted JSON: {e}")
-                        scenarios_data = None
-                else:
-                    print(f"❌ No JSON block found in response")
-            
-            if scenarios_data is None:
-                print(f"⚠️ Unexpected response format: {response}")
-                return get_random_scenarios(5, quality_attribute, language)
-            
-            # Standard quality attributes for options generation
-            QUALITY_ATTRIBUTES = {
-                "es": ["Aptitud Funcional", "Eficiencia de desempeño", "Compatibilidad", "Usabilidad", "Fiabilidad", "Seguridad", "Mantenibilidad", "Portabilidad"],
-                "en": ["Functional Suitability", "Performance Efficiency", "Compatibility", "Usability", "Reliability", "Security", "Maintainability", "Portability"]
-            }
-            
-            scenarios = []
-            for i, scenario_data in enumerate(scenarios_data[:5]):
-                if isinstance(scenario_data, dict):
-                    # Get quality attribute and normalize it
-                    quality_attr = scenario_data.get('qualityAttribute', 'Unknown')
-                    correct_option = scenario_data.get('correctOption', 'A')
-                    
-                    # Generate options with the correct answer in the right position
-                    attributes_list = QUALITY_ATTRIBUTES[language]
-                    
-                    # Try to find the quality attribute in our standard list
-                    correct_attr = quality_attr
-                    for std_attr in attributes_list:
-                        if quality_attr.lower().replace(' ', '') in std_attr.lower().replace(' ', ''):
-                            correct_attr = std_attr
-                            break
-                    
-                    # Create options with correct answer in specified position
-                    import random
-                    other_attrs = [attr for attr in attributes_list if attr != correct_attr]
-                    random.shuffle(other_attrs)
-                    
-                    options = {}
-                    option_keys = ['A', 'B', 'C', 'D']
-                    
-                    # Place correct answer in the specified position
-                    correct_index = ord(correct_option) - ord('A')
-                    if correct_index < 0 or correct_index >= 4:
-                        correct_index = 0  # Default to A if invalid
-                    
-                    # Fill options
-                    for j, key in enumerate(option_keys):
-                        if j == correct_index:
-                            options[key] = correct_attr
-                        else:
-                            # Use other attributes, cycling if needed
-                            attr_index = (j - (1 if j > correct_index else 0)) % len(other_attrs)
-                            options[key] = other_attrs[attr_index]
-                    
-                    scenario = {
-                        "id": str(uuid.uuid4()),
-                        "content": scenario_data.get('content', f'Generated scenario {i+1}'),
-                        "options": options,
-                        "correctOption": correct_option,
-                        "explanation": scenario_data.get('explanation', 'LLM-generated explanation'),
-                        "category": correct_attr
-                    }
-                    scenarios.append(scenario)
-            
-            print(f"✅ Generated {len(scenarios)} scenarios with LLM")
+Return exactly 5 scenarios in JSON format.
+
+Response (JSON array only):"""
+        
+        # The caller bounds the call (LLM_POOL_TIMEOUT or the session's latency budget)
+        count = 0
+        start = time.perf_counter()
+        first_ms = None
+        with count_cache_lookups() as lookups:
+            async for scenario_data in iter_json_array(llm_provider.stream_text(prompt, max_tokens=2000)):
+                scenario = llm_scenario(scenario_data, language, rng)
+                # Extra scenarios are ignored; the response is still read to the
+                # end, for the response cache and the latency model
+                if scenario is not None and count < 5:
+                    if first_ms is None:
+                        first_ms = (time.perf_counter() - start) * 1000
+                    count += 1
+                    yield scenario
+        
+        if not count:
+            raise ValueError("No valid scenario in the LLM response")
+        # Only complete batches generated by the model (not served by the
+        # response cache) feed the latency model of the scheduler
+        if not lookups.hits:
+            scenario_scheduler.observe(llm_model_name(), first_ms, (time.perf_counter() - start) * 1000)
+        print(f"✅ Generated {count} scenarios with LLM")
+    
+    # Live generations (reading the rest of their response after the session went on)
+    draining_generations: Set[asyncio.Task] = set()
+    
+    def generation_drained(task: asyncio.Task):
+        draining_generations.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ Live LLM generation failed: {task.exception()!r}")
+    
+    async def live_llm_scenarios(quality_attribute: Optional[str], language: str, count: int, timeout: float) -> List[Dict[str, Any]]:
+        """Generate up to ``count`` scenarios with the LLM while the session waits, within ``timeout`` seconds
+        
+        Once ``count`` scenarios are in, the session goes on and the rest of the
+        response is read in the background (within LLM_POOL_TIMEOUT), so that the
+        batch still feeds the scheduler's latency model and the response cache.
+        """
+        scenarios = []
+        enough = asyncio.Event()
+        
+        async def stream():
+            try:
+                async for scenario in generate_llm_scenarios(quality_attribute, language):
+                    if len(scenarios) < count:
+                        scenarios.append(scenario)
+                        if len(scenarios) == count:
+                            enough.set()
+            finally:
+                enough.set()
+        
+        task = asyncio.ensure_future(asyncio.wait_for(stream(), timeout=settings.LLM_POOL_TIMEOUT))
+        draining_generations.add(task)
+        task.add_done_callback(generation_drained)
+        try:
+            await asyncio.wait_for(enough.wait(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            task.cancel()
+            raise
+        if len(scenarios) < count:
+            # Failure or deadline: the scenarios streamed so far are kept
+            task.cancel()
+            print(f"⚠️ Live LLM generation stopped after {len(scenarios)} scenarios")
+        return list(scenarios)
+    
+    def llm_ready() -> bool:
+        """Whether a live LLM generation may be tried (a provider, and its circuit closed)"""
+        if llm_provider is None:
+            return False
+        breaker = provider_layer(llm_provider, CircuitBreakerLLM)
+        return breaker is None or breaker.breaker.state == CLOSED
+
+    async def generate_all_scenarios(quality_attribute: str = None, language: str = 'es', player: Optional[str] = None, session_id: Optional[str] = None, seed: Optional[int] = None, latency_budget_ms: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Deal the 5 scenarios of a session: pre-generated LLM scenarios from the pool, completed from the database (dealt from the player's deck)
+        
+        The pool is refilled in the background. When it runs short, the
+        scheduler only waits for a live LLM generation if the recent LLM
+        latency fits the latency budget (SESSION_LATENCY_BUDGET_MS by default);
+        otherwise the database completes the session in milliseconds.
+        Selection uses the session's own RNG. With an explicit seed the scenarios
+        come from the database without the player's deck, so the same seed
+        always replays the same session.
+        """
+        start = time.perf_counter()
+        rng = session_rng(session_id or str(uuid.uuid4()), seed)
+        if seed is not None:
+            player = None
+        budget_ms = settings.SESSION_LATENCY_BUDGET_MS if latency_budget_ms is None else max(latency_budget_ms, 0.0)
+        scenarios = []
+        # Session tokens only carry catalog scenario IDs, not LLM scenarios
+        use_llm = llm_provider is not None and seed is None and not sessions.stateless
+        if use_llm:
+            scenarios = scenario_pool.take(quality_attribute, language, 5)
+            if scenarios:
+                print(f"🤖 Took {len(scenarios)} pre-generated LLM scenarios from the pool")
+        
+        source = scenario_scheduler.choose(llm_model_name(), len(scenarios), 5, budget_ms, llm_ready=use_llm and llm_ready())
+        if source == LLM:
+            remaining = budget_ms - (time.perf_counter() - start) * 1000
+            live = await live_llm_scenarios(quality_attribute, language, 5 - len(scenarios), remaining / 1000)
+            print(f"🤖 Generated {len(live)} LLM scenarios within the {budget_ms:g} ms budget")
+            scenarios.extend(live)
+        
+        if len(scenarios) < 5:
+            import datetime
+            timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")
+            print(f"⚠️ [{timestamp}] No pre-generated LLM scenarios available, using database fallback")
+            print(f"� [{timestamp}] CALLING get_random_scenarios() - should get NEW scenarios")
             
-            # Fill with database scenarios if we don't have enough
-            while len(scenarios) < 5:
-                needed = 5 - len(scenarios)
-                fallback_scenarios = get_random_scenarios(needed, quality_attribute, language)
-                print(f"🎲 Adding {len(fallback_scenarios)} database scenarios: {[s['id'][:8] + '...' for s in fallback_scenarios]}")
-                scenarios.extend(fallback_scenarios)
+            fallback_scenarios = get_random_scenarios(5 - len(scenarios), quality_attribute, language, force_new_selection=seed is None, player=player, rng=rng)
             
-            return scenarios[:5]
-                
-        except asyncio.TimeoutError:
-            print("⏰ LLM timeout (15s) - using database fallback for faster response")
-            fallback_scenarios = get_random_scenarios(5, quality_attribute, language)
-            print(f"🎲 Using database fallback: {[s['id'][:8] + '...' for s in fallback_scenarios]}")
-            print(f"🔍 First fallback scenario: {fallback_scenarios[0]['content'][:50]}...")
-            return fallback_scenarios
-        except Exception as e:
-            print(f"❌ Error generating scenarios with LLM: {e}")
-            fallback_scenarios = get_random_scenarios(5, quality_attribute, language)
-            print(f"🎲 Using database fallback: {[s['id'][:8] + '...' for s in fallback_scenarios]}")
-            print(f"🔍 First fallback scenario: {fallback_scenarios[0]['content'][:50]}...")
-            return fallback_scenarios
+            print(f"🎲 [{timestamp}] RECEIVED from database:")
+            for i, s in enumerate(fallback_scenarios):
+                preview = s['content'][:40] + "..."
+                print(f"   {i+1}. {s['id'][:8]}... - {preview}")
+            scenarios.extend(fallback_scenarios)
+        
+        scenario_scheduler.selection.observe((time.perf_counter() - start) * 1000)
+        return scenarios
+    
+    # LLM scenarios are generated ahead of time, per (quality attribute, language)
+    scenario_pool = ScenarioPool(generate_llm_scenarios, warm=[(None, "es"), (None, "en")])
+    
+    # Chooses the pool, a live LLM generation or the database within the session's latency budget
+    scenario_scheduler = SourceScheduler(settings.SESSION_LATENCY_BUDGET_MS)
     
     # RequirementRally helper functions
-    async def generate_rally_scenarios(category: Optional[str] = None, difficulty: Optional[str] = None, count: int = 5, language: str = 'es') -> List[Dict[str, Any]]:
+    async def generate_rally_scenarios(category: Optional[str] = None, difficulty: Optional[str] = None, count: int = 5, language: str = 'es', player: Optional[str] = None, rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
         """Generate scenarios for RequirementRally"""
         print(f"🎯 Generating {count} RequirementRally scenarios...")
         print(f"   Category filter: {category or 'mixed'}")
@@ -380,7 +481,7 @@ Return exactly 5 scenarios in JSON format."""
         print(f"   Language: {language}")
         
         try:
-            scenarios = get_rally_scenarios(count, category, difficulty, language)
+            scenarios = get_rally_scenarios(count, category, difficulty, language, player=player, rng=rng)
             if scenarios and len(scenarios) >= count:
                 print(f"✅ Successfully loaded {len(scenarios)} scenarios from RequirementRally database")
                 return scenarios
@@ -433,9 +534,93 @@ Return exactly 5 scenarios in JSON format."""
             ]
         }
     
+    @app.get("/api/v1/sessions/stats")
+    async def session_stats():
+        """Active sessions, limits and evictions per game"""
+        return session_reaper.stats()
+    
+    @app.get("/api/v1/llm/pool/stats")
+    async def llm_pool_stats():
+        """Pre-generated LLM scenarios: queue depths, hit rate and refill latency"""
+        return scenario_pool.stats()
+    
+    @app.get("/api/v1/llm/cache/stats")
+    async def llm_cache_stats():
+        """LLM response cache: entries, size and hit rate"""
+        cached = provider_layer(llm_provider, CachedLLM)
+        if cached is None:
+            return {"enabled": False}
+        # The stats query SQLite: off the event loop like the lookups
+        stats = await asyncio.get_running_loop().run_in_executor(None, cached.stats)
+        return {"enabled": True, **stats}
+    
+    @app.get("/api/v1/llm/flights/stats")
+    async def llm_flight_stats():
+        """Coalescing of concurrent identical LLM calls: generations started and calls that joined one"""
+        coalesced = provider_layer(llm_provider, CoalescedLLM)
+        if coalesced is None:
+            return {"enabled": False}
+        return {"enabled": True, **coalesced.stats()}
+    
+    @app.get("/api/v1/llm/scheduler/stats")
+    async def llm_scheduler_stats():
+        """Scenario source choices: LLM latency per model, decisions and scenario selection latency"""
+        return scenario_scheduler.stats()
+    
+    @app.get("/api/v1/llm/breaker/stats")
+    async def llm_breaker_stats():
+        """LLM circuit breaker: state, failure rate and state transitions"""
+        breaker = provider_layer(llm_provider, CircuitBreakerLLM)
+        if breaker is None:
+            return {"enabled": False}
+        return {"enabled": True, **breaker.stats()}
+    
+    # Full-text search per game
+    SCENARIO_SEARCH = {
+        "quality_quest": search_quality_scenarios,
+        "requirement_rally": search_rally_scenarios,
+        "usability_universe": search_usability_scenarios,
+    }
+    
+    @app.get("/api/v1/scenarios/search")
+    async def search_scenarios(
+        q: str = Query(..., min_length=1, max_length=200),
+        language: str = "es",
+        game: Optional[str] = None,
+        page: int = Query(1, ge=1),
+        page_size: int = Query(10, ge=1, le=100)
+    ):
+        """Search the scenario bank of one or every game, best matches first"""
+        if game is not None and game not in SCENARIO_SEARCH:
+            raise HTTPException(status_code=404, detail=f"Unknown game: {game}")
+        games = [game] if game else list(SCENARIO_SEARCH)
+        offset = (page - 1) * page_size
+        
+        # Each game returns its own best offset + page_size hits; merging them
+        # by score gives the requested page of the combined ranking
+        total = 0
+        hits = []
+        for game_id in games:
+            game_total, game_hits = SCENARIO_SEARCH[game_id](q, language, limit=offset + page_size)
+            total += game_total
+            hits.extend((score, game_id, scenario) for score, scenario in game_hits)
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        
+        return {
+            "query": q,
+            "language": language,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "results": [
+                {"game": game_id, "score": round(score, 4), "scenario": scenario}
+                for score, game_id, scenario in hits[offset:offset + page_size]
+            ]
+        }
+    
     @app.post("/api/v1/games/{game_id}/sessions")
-    async def create_game_session(game_id: str, language: str = 'es'):
-        """Create a new game session with all scenarios pre-generated"""
+    async def create_game_session(game_id: str, language: str = 'es', seed: Optional[int] = None, latency_budget_ms: Optional[float] = Query(None, ge=0)):
+        """Create a new game session with all scenarios pre-generated (replayable with seed)"""
         # Clean up old sessions first
         cleanup_old_sessions()
         
@@ -444,22 +629,14 @@ Return exactly 5 scenarios in JSON format."""
         print(f"📝 Creating new session for {game_id} (Session ID: {session_id[:8]})")
         
         # Generate ALL scenarios at once using LLM or database - FRESH for each session
-        all_scenarios = await generate_all_scenarios(language=language)
+        all_scenarios = await generate_all_scenarios(language=language, session_id=session_id, seed=seed, latency_budget_ms=latency_budget_ms)
         print(f"🎲 Generated {len(all_scenarios)} fresh scenarios for session {session_id[:8]}")
         
-        session = GameSession(
-            id=session_id,
-            game_id=game_id,
-            current_scenario=all_scenarios[0],  # First scenario
-            created_at=datetime.now().isoformat()
+        # Store the scenario IDs (LLM-generated scenarios are kept whole)
+        record = SessionRecord.for_scenarios(
+            session_id, game_id, all_scenarios, language, get_quality_scenario, seed=seed
         )
-        
-        # Store all scenarios in session
-        sessions[session_id] = {
-            "session": session,
-            "all_scenarios": all_scenarios,
-            "current_index": 0
-        }
+        session_id = sessions.save(session_id, record)
         
         print(f"✅ Session created with ID: {session_id}")
         
@@ -468,22 +645,55 @@ Return exactly 5 scenarios in JSON format."""
             "session_id": session_id,  # Keep both for compatibility
             "current_scenario": all_scenarios[0],  # Frontend expects 'current_scenario'
             "scenario": all_scenarios[0],  # Keep both for compatibility
+            "seed": seed,
             "message": "Session created successfully with pre-generated scenarios"
         }
     
+    def check_scenario_index(record: SessionRecord, scenario_index: Optional[int]) -> None:
+        """Reject an answer to another scenario than the current one"""
+        if scenario_index is not None and scenario_index != record.cursor:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid scenario index. Expected {record.cursor}, got {scenario_index}"
+            )
+    
+    def quality_answer_response(record: SessionRecord, index: int, session_id: str) -> GameResponse:
+        """Response to the answer of the scenario at index (also sent again to retries)"""
+        scenario = record.scenario(index, get_quality_scenario)
+        next_index = index + 1
+        return GameResponse(
+            is_correct=record.is_correct(index),
+            correct_answer=scenario.get("correctOption", "A"),
+            explanation=scenario.get("explanation", "Demo explanation"),
+            score=record.score,
+            next_scenario=record.scenario(next_index, get_quality_scenario) if next_index < len(record) else None,
+            game_completed=next_index >= len(record),
+            session_id=session_id
+        )
+    
     @app.post("/api/v1/games/{game_id}/sessions/{session_id}/response")
-    async def submit_response(game_id: str, session_id: str, response: ResponseSubmission):
-        """Submit a response and get next pre-generated scenario"""
+    async def submit_response(
+        game_id: str,
+        session_id: str,
+        response: ResponseSubmission,
+        idempotency_key: Optional[str] = Header(None, max_length=128)
+    ):
+        """Submit a response and get next pre-generated scenario (retries get the same result)"""
         
-        if session_id not in sessions:
+        record = sessions.get(session_id)
+        if record is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session_data = sessions[session_id]
-        session = session_data["session"]
-        all_scenarios = session_data["all_scenarios"]
-        current_index = session_data["current_index"]
+        replayed = record.replayed(idempotency_key, response.scenario_index)
+        if replayed is not None:
+            print(f"🔁 Replaying answer to scenario {replayed + 1} for session {session_id[:8]}")
+            return quality_answer_response(record, replayed, session_id)
+        if record.status != "active":
+            raise HTTPException(status_code=400, detail="Session is not active")
+        check_scenario_index(record, response.scenario_index)
         
-        current_scenario = all_scenarios[current_index]
+        current_index = record.cursor
+        current_scenario = record.scenario(current_index, get_quality_scenario)
         
         print(f"📥 Processing response for session {session_id} (scenario {current_index + 1}/5)")
         
@@ -491,46 +701,41 @@ Return exactly 5 scenarios in JSON format."""
         is_correct = response.selected_option == current_scenario.get("correctOption", "A")
         
         # Update score
+        record.answer(is_correct, key=idempotency_key)
         if is_correct:
-            session.score += 10
-            print(f"✅ Correct answer! Score: {session.score}")
+            print(f"✅ Correct answer! Score: {record.score}")
         else:
-            print(f"❌ Incorrect answer. Score remains: {session.score}")
-        
-        session.scenarios_completed += 1
+            print(f"❌ Incorrect answer. Score remains: {record.score}")
         
         # Determine next scenario
         next_index = current_index + 1
-        next_scenario = None
-        game_completed = False
         
-        if next_index < len(all_scenarios):
-            next_scenario = all_scenarios[next_index]
-            session.current_scenario = next_scenario
-            sessions[session_id]["current_index"] = next_index
+        if next_index < len(record):
+            record.cursor = next_index
             print(f"📋 Moving to scenario {next_index + 1}/5")
         else:
-            game_completed = True
-            session.status = "completed"
-            print(f"🎉 Game completed! Final score: {session.score}")
+            record.finish()
+            print(f"🎉 Game completed! Final score: {record.score}")
+        session_id = sessions.save(session_id, record)
         
-        return GameResponse(
-            is_correct=is_correct,
-            correct_answer=current_scenario.get("correctOption", "A"),
-            explanation=current_scenario.get("explanation", "Demo explanation"),
-            score=session.score,
-            next_scenario=next_scenario,
-            game_completed=game_completed
-        )
+        return quality_answer_response(record, current_index, session_id)
     
     @app.get("/api/v1/games/{game_id}/sessions/{session_id}")
     async def get_session(game_id: str, session_id: str):
         """Get session details"""
-        if session_id not in sessions:
+        record = sessions.get(session_id)
+        if record is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session_data = sessions[session_id]
-        return session_data["session"]
+        return GameSession(
+            id=session_id,
+            game_id=record.game,
+            current_scenario=record.scenario(record.cursor, get_quality_scenario),
+            status=record.status,
+            score=record.score,
+            scenarios_completed=record.answered,
+            created_at=record.created_at
+        )
     
     # Endpoint compatible with frontend
     @app.post("/api/create-session")
@@ -546,21 +751,14 @@ Return exactly 5 scenarios in JSON format."""
         print(f"📝 Creating new session for user: {request.name}, quality: {request.quality_attribute} (Session ID: {session_id[:8]})")
         
         # Generate ALL scenarios at once using LLM with focus on quality attribute 
-        all_scenarios = await generate_all_scenarios(request.quality_attribute, request.language)
+        all_scenarios = await generate_all_scenarios(request.quality_attribute, request.language, request.player_token or request.name, session_id, request.seed, request.latency_budget_ms)
         
-        session = GameSession(
-            id=session_id,
-            game_id="quality_quest",
-            current_scenario=all_scenarios[0],  # First scenario
-            created_at=datetime.now().isoformat()
+        # Store the scenario IDs (LLM-generated scenarios are kept whole)
+        record = SessionRecord.for_scenarios(
+            session_id, "quality_quest", all_scenarios, request.language, get_quality_scenario,
+            player=request.name, seed=request.seed, category=request.quality_attribute
         )
-        
-        # Store all scenarios in session
-        sessions[session_id] = {
-            "session": session,
-            "all_scenarios": all_scenarios,
-            "current_index": 0
-        }
+        session_id = sessions.save(session_id, record)
         
         print(f"✅ Session created with ID: {session_id}")
         
@@ -570,6 +768,7 @@ Return exactly 5 scenarios in JSON format."""
             "game_id": "quality_quest", 
             "current_scenario": all_scenarios[0],  # Frontend expects 'current_scenario'
             "scenario": all_scenarios[0],
+            "seed": request.seed,
             "message": f"Welcome {request.name}! Starting with scenario 1 of 5 from quality database."
         }
     
@@ -604,29 +803,22 @@ Return exactly 5 scenarios in JSON format."""
             # Cleanup old sessions first
             cleanup_old_rally_sessions()
             
-            # Generate scenarios
-            scenarios = await generate_rally_scenarios(request.category, request.difficulty, 5, request.language)
+            session_id = str(uuid.uuid4())
+            
+            # Generate scenarios (an explicit seed replays them, bypassing the player's deck)
+            player = request.player_token or request.name if request.seed is None else None
+            scenarios = await generate_rally_scenarios(request.category, request.difficulty, 5, request.language, player, session_rng(session_id, request.seed))
             
             if not scenarios:
                 raise HTTPException(status_code=500, detail="Failed to generate scenarios")
             
-            # Create session
-            session_id = str(uuid.uuid4())
-            session = RallyGameSession(
-                id=session_id,
-                current_scenario=scenarios[0],
-                created_at=datetime.now().isoformat(),
-                category_filter=request.category,
-                difficulty_filter=request.difficulty
+            # Store the session with its scenario IDs
+            record = SessionRecord.for_scenarios(
+                session_id, "requirement_rally", scenarios, request.language, get_rally_scenario,
+                player=request.name, seed=request.seed,
+                category=request.category, difficulty=request.difficulty
             )
-            
-            # Store session data
-            rally_sessions[session_id] = {
-                "session": session,
-                "scenarios": scenarios,
-                "current_index": 0,
-                "player_name": request.name
-            }
+            session_id = rally_sessions.save(session_id, record)
             
             print(f"✅ Created RequirementRally session: {session_id[:8]}...")
             
@@ -634,6 +826,7 @@ Return exactly 5 scenarios in JSON format."""
                 "session_id": session_id,
                 "current_scenario": scenarios[0],
                 "total_scenarios": len(scenarios),
+                "seed": request.seed,
                 "game_info": {
                     "name": "RequirementRally",
                     "description": "Practice identifying requirement types",
@@ -647,52 +840,58 @@ Return exactly 5 scenarios in JSON format."""
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"Failed to create session: {str(e)}")
     
+    def rally_answer_response(record: SessionRecord, index: int, session_id: str) -> RallyGameResponse:
+        """Response to the answer of the scenario at index (also sent again to retries)"""
+        scenario = record.scenario(index, get_rally_scenario)
+        next_index = index + 1
+        return RallyGameResponse(
+            is_correct=record.is_correct(index),
+            correct_answer=scenario["options"][ord(scenario["correctOption"]) - ord('A')],
+            explanation=scenario["explanation"],
+            score=record.score,
+            next_scenario=record.scenario(next_index, get_rally_scenario) if next_index < len(record) else None,
+            game_completed=next_index >= len(record),
+            session_id=session_id
+        )
+    
     @app.post("/rally/session/{session_id}/submit")
-    async def submit_rally_answer(session_id: str, submission: RallyResponseSubmission):
-        """Submit an answer for RequirementRally"""
+    async def submit_rally_answer(
+        session_id: str,
+        submission: RallyResponseSubmission,
+        idempotency_key: Optional[str] = Header(None, max_length=128)
+    ):
+        """Submit an answer for RequirementRally (retries get the same result)"""
         try:
-            if session_id not in rally_sessions:
+            record = rally_sessions.get(session_id)
+            if record is None:
                 raise HTTPException(status_code=404, detail="Session not found")
             
-            session_data = rally_sessions[session_id]
-            session = session_data["session"]
-            scenarios = session_data["scenarios"]
-            current_index = session_data["current_index"]
-            
-            if session.status != "active":
+            replayed = record.replayed(idempotency_key, submission.scenario_index)
+            if replayed is not None:
+                print(f"🔁 Replaying RequirementRally answer to scenario {replayed + 1}")
+                return rally_answer_response(record, replayed, session_id)
+            if record.status != "active":
                 raise HTTPException(status_code=400, detail="Session is not active")
+            check_scenario_index(record, submission.scenario_index)
             
-            current_scenario = scenarios[current_index]
+            current_index = record.cursor
+            current_scenario = record.scenario(current_index, get_rally_scenario)
             correct_option = current_scenario["correctOption"]
             is_correct = submission.selected_option.upper() == correct_option.upper()
             
-            # Update score and progress
-            if is_correct:
-                session.score += 10  # 10 points per correct answer
-            
-            session.scenarios_completed += 1
+            # Update score (10 points per correct answer) and progress
+            record.answer(is_correct, key=idempotency_key)
             
             # Check if game is completed
-            game_completed = current_index >= len(scenarios) - 1
-            next_scenario = None
-            
-            if not game_completed:
-                session_data["current_index"] += 1
-                next_scenario = scenarios[session_data["current_index"]]
-                session.current_scenario = next_scenario
+            if current_index < len(record) - 1:
+                record.cursor += 1
             else:
-                session.status = "completed"
+                record.finish()
             
             print(f"🎯 RequirementRally answer submitted: {submission.selected_option} ({'✅' if is_correct else '❌'})")
+            session_id = rally_sessions.save(session_id, record)
             
-            return RallyGameResponse(
-                is_correct=is_correct,
-                correct_answer=current_scenario["options"][ord(correct_option) - ord('A')],
-                explanation=current_scenario["explanation"],
-                score=session.score,
-                next_scenario=next_scenario,
-                game_completed=game_completed
-            )
+            return rally_answer_response(record, current_index, session_id)
             
         except HTTPException:
             raise
@@ -705,18 +904,27 @@ Return exactly 5 scenarios in JSON format."""
     async def get_rally_session(session_id: str):
         """Get RequirementRally session information"""
         try:
-            if session_id not in rally_sessions:
+            record = rally_sessions.get(session_id)
+            if record is None:
                 raise HTTPException(status_code=404, detail="Session not found")
             
-            session_data = rally_sessions[session_id]
-            session = session_data["session"]
+            session = RallyGameSession(
+                id=session_id,
+                current_scenario=record.scenario(record.cursor, get_rally_scenario),
+                status=record.status,
+                score=record.score,
+                scenarios_completed=record.answered,
+                created_at=record.created_at,
+                category_filter=record.category,
+                difficulty_filter=record.difficulty
+            )
             
             return {
                 "session": session.dict(),
-                "player_name": session_data["player_name"],
+                "player_name": record.player,
                 "progress": {
-                    "current": session_data["current_index"] + 1,
-                    "total": len(session_data["scenarios"])
+                    "current": record.cursor + 1,
+                    "total": len(record)
                 }
             }
             
@@ -755,6 +963,22 @@ Return exactly 5 scenarios in JSON format."""
     
     # ========== USABILITYUNIVERSE ENDPOINTS ==========
     
+    def universe_session_view(record: SessionRecord) -> UniverseGameSession:
+        """UsabilityUniverse session model of a session record"""
+        # The cursor moves past the last scenario once it is answered
+        current_index = min(record.cursor, len(record) - 1)
+        return UniverseGameSession(
+            id=record.id,
+            current_scenario=record.scenario(current_index, get_usability_scenario),
+            status=record.status,
+            score=record.score,
+            scenarios_completed=record.answered,
+            created_at=record.created_at,
+            category_filter=record.category,
+            difficulty_filter=record.difficulty,
+            seed=record.seed
+        )
+    
     @app.post("/universe/session")
     async def create_universe_session(request: UniverseSessionCreateRequest):
         """Create a new UsabilityUniverse game session"""
@@ -774,7 +998,9 @@ Return exactly 5 scenarios in JSON format."""
                 category=request.category,
                 difficulty=request.difficulty,
                 language=request.language,
-                force_new_selection=True
+                force_new_selection=request.seed is None,
+                player=request.player_token or request.name if request.seed is None else None,
+                rng=session_rng(session_id, request.seed)
             )
             
             if not scenarios:
@@ -783,26 +1009,16 @@ Return exactly 5 scenarios in JSON format."""
                     detail=f"No scenarios found for category: {request.category}, difficulty: {request.difficulty}"
                 )
             
-            # Create session object
-            session = UniverseGameSession(
-                id=session_id,
-                current_scenario=scenarios[0],
-                created_at=datetime.now().isoformat(),
-                category_filter=request.category,
-                difficulty_filter=request.difficulty
+            # Store the session with its scenario IDs
+            record = SessionRecord.for_scenarios(
+                session_id, "usability_universe", scenarios, request.language, get_usability_scenario,
+                player=request.name, seed=request.seed,
+                category=request.category, difficulty=request.difficulty
             )
-            
-            # Store session data
-            universe_sessions[session_id] = {
-                "session": session,
-                "scenarios": scenarios,
-                "current_index": 0,
-                "player_name": request.name,
-                "language": request.language
-            }
+            session_id = universe_sessions.save(session_id, record)
             
             print(f"✅ UsabilityUniverse session created: {session_id} with {len(scenarios)} scenarios")
-            return session
+            return universe_session_view(record)
             
         except HTTPException:
             raise
@@ -811,58 +1027,64 @@ Return exactly 5 scenarios in JSON format."""
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"Failed to create session: {str(e)}")
     
+    def universe_answer_response(record: SessionRecord, index: int, session_id: str) -> UniverseGameResponse:
+        """Response to the answer of the scenario at index (also sent again to retries)"""
+        scenario = record.scenario(index, get_usability_scenario)
+        next_index = index + 1
+        return UniverseGameResponse(
+            is_correct=record.is_correct(index),
+            correct_answer=scenario["correct_answer"],
+            explanation=scenario.get("feedback", "No explanation available"),
+            score=record.score,
+            next_scenario=record.scenario(next_index, get_usability_scenario) if next_index < len(record) else None,
+            game_completed=next_index >= len(record),
+            session_id=session_id
+        )
+    
     @app.post("/universe/session/{session_id}/submit")
-    async def submit_universe_answer(session_id: str, submission: UniverseResponseSubmission):
-        """Submit an answer for a UsabilityUniverse scenario"""
+    async def submit_universe_answer(
+        session_id: str,
+        submission: UniverseResponseSubmission,
+        idempotency_key: Optional[str] = Header(None, max_length=128)
+    ):
+        """Submit an answer for a UsabilityUniverse scenario (retries get the same result)"""
         try:
             print(f"📝 UsabilityUniverse answer submitted for session: {session_id}")
             print(f"   Selected option: {submission.selected_option}")
             
-            if session_id not in universe_sessions:
+            record = universe_sessions.get(session_id)
+            if record is None:
                 raise HTTPException(status_code=404, detail="Session not found")
             
-            session_data = universe_sessions[session_id]
-            session = session_data["session"]
-            scenarios = session_data["scenarios"]
-            current_index = session_data["current_index"]
+            replayed = record.replayed(idempotency_key, submission.scenario_index)
+            if replayed is not None:
+                print(f"🔁 Replaying UsabilityUniverse answer to scenario {replayed + 1}")
+                return universe_answer_response(record, replayed, session_id)
             
-            if current_index >= len(scenarios):
+            current_scenario = record.current(get_usability_scenario)
+            if current_scenario is None:
                 raise HTTPException(status_code=400, detail="No more scenarios available")
+            check_scenario_index(record, submission.scenario_index)
             
-            current_scenario = scenarios[current_index]
             correct_answer = current_scenario["correct_answer"]
             
             # Evaluate answer
             is_correct = submission.selected_option.lower() == correct_answer.lower()
             
             # Update score
-            if is_correct:
-                session.score += 10
-            
-            session.scenarios_completed += 1
+            record.answer(is_correct, key=idempotency_key)
             
             # Move to next scenario
-            session_data["current_index"] += 1
-            next_scenario = None
-            game_completed = session_data["current_index"] >= len(scenarios)
-            
-            if not game_completed:
-                next_scenario = scenarios[session_data["current_index"]]
-                session.current_scenario = next_scenario
-            else:
-                session.status = "completed"
+            current_index = record.cursor
+            record.cursor += 1
+            if record.cursor >= len(record):
+                record.finish()
             
             print(f"✅ Answer evaluated: {'Correct' if is_correct else 'Incorrect'}")
-            print(f"   Score: {session.score}, Completed: {session.scenarios_completed}/{len(scenarios)}")
-            
-            return UniverseGameResponse(
-                is_correct=is_correct,
-                correct_answer=correct_answer,
-                explanation=current_scenario.get("feedback", "No explanation available"),
-                score=session.score,
-                next_scenario=next_scenario,
-                game_completed=game_completed
-            )
+            print(f"   Score: {record.score}, Completed: {record.answered}/{len(record)}")
+            session_id = universe_sessions.save(session_id, record)
+            
+            return universe_answer_response(record, current_index, session_id)
             
         except HTTPException:
             raise
@@ -875,18 +1097,16 @@ Return exactly 5 scenarios in JSON format."""
     async def get_universe_session(session_id: str):
         """Get UsabilityUniverse session information"""
         try:
-            if session_id not in universe_sessions:
+            record = universe_sessions.get(session_id)
+            if record is None:
                 raise HTTPException(status_code=404, detail="Session not found")
             
-            session_data = universe_sessions[session_id]
-            session = session_data["session"]
-            
             return {
-                "session": session.dict(),
-                "player_name": session_data["player_name"],
+                "session": universe_session_view(record).dict(),
+                "player_name": record.player,
                 "progress": {
-                    "current": session_data["current_index"] + 1,
-                    "total": len(session_data["scenarios"])
+                    "current": record.cursor + 1,
+                    "total": len(record)
                 }
             }
             
@@ -956,6 +1176,7 @@ Return exactly 5 scenarios in JSON format."""
             return {"error": "Configuration file not found"}
     
     print("App created successfully with LLM integration and scenarios database")
+    startup_report()
     
     # Only run server if this script is executed directly
     if __name__ == "__main__":
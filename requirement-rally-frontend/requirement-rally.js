@@ -544,6 +544,10 @@ class RequirementRallyGame {
             }
 
             const result = await response.json();
+            // In token mode the session ID changes with every answer
+            if (result.session_id) {
+                this.sessionId = result.session_id;
+            }
             this.handleAnswerResult(result);
 
         } catch (error) {
@@ -10,6 +10,7 @@ import traceback
 import uuid
 import json
 import asyncio
+import random
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
@@ -20,18 +21,21 @@ try:
     print("Importing required modules...")
     
     # FastAPI and related imports
-    from fastapi import FastAPI, HTTPException, Request
+    from fastapi import FastAPI, Header, HTTPException, Request
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.staticfiles import StaticFiles
     from fastapi.responses import FileResponse
     from pydantic import BaseModel
     
     # Import LLM components
-    from iso_standards_games.llm.provider import get_llm_provider
+    from iso_standards_games.llm.provider import close_llm_providers, get_llm_provider
     from iso_standards_games.core.config import settings
+    from iso_standards_games.core.sampling import session_rng
+    from iso_standards_games.core.sessions import SessionReaper, SessionRecord, SessionStore, game_store
     
     # Import the requirements scenarios database
-    from requirements_scenarios_db import get_random_scenarios, get_database_stats, validate_scenarios
+    from requirements_scenarios_db import get_random_scenarios, get_database_stats, validate_scenarios, load_scenarios
+    from requirements_scenarios_db import get_scenario as get_rally_scenario
     
     print("All modules imported successfully")
     
@@ -41,6 +45,8 @@ try:
         category: Optional[str] = None  # 'Functional', 'Non-Functional', 'Constraint', or None for mixed
         difficulty: Optional[str] = None  # 'easy', 'medium', 'hard', or None for mixed
         language: str = 'es'
+        player_token: Optional[str] = None  # Device token; the player's name is used if missing
+        seed: Optional[int] = None  # Replays a session: same seed and filters, same scenarios
     
     class RallyGameSession(BaseModel):
         id: str
@@ -55,6 +61,7 @@ try:
     
     class RallyResponseSubmission(BaseModel):
         selected_option: str
+        scenario_index: Optional[int] = None  # Scenario answered; a retry of the last answer is replayed
     
     class RallyGameResponse(BaseModel):
         is_correct: bool
@@ -63,6 +70,7 @@ try:
         score: int
         next_scenario: Optional[Dict[str, Any]] = None
         game_completed: bool = False
+        session_id: Optional[str] = None  # Changes with every answer in token mode
     
     print("Creating RequirementRally app...")
     
@@ -108,6 +116,12 @@ try:
     @app.on_event("startup")
     async def startup_event():
         global llm_provider
+        # Load the scenario catalog once so no request pays for parsing it
+        load_scenarios()
+        # Reload the sessions of the last snapshot before serving
+        session_reaper.restore()
+        session_reaper.start()
+        
         try:
             print("Initializing LLM provider for RequirementRally...")
             llm_provider = get_llm_provider()
@@ -117,26 +131,23 @@ try:
             print("📋 Will use JSON database only (recommended for RequirementRally)")
             llm_provider = None
     
-    # In-memory storage for RequirementRally sessions
-    rally_sessions: Dict[str, Dict[str, Any]] = {}
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await session_reaper.stop()
+        await close_llm_providers()
+    
+    # RequirementRally sessions, expired after the configured TTL / idle timeout
+    rally_sessions: SessionStore = game_store("requirement_rally")
+    session_reaper = SessionReaper({"requirement_rally": rally_sessions})
     
     def cleanup_old_rally_sessions():
-        """Remove sessions older than 1 hour"""
-        current_time = datetime.now()
-        expired_sessions = []
-        
-        for session_id, session_data in rally_sessions.items():
-            session_created = datetime.fromisoformat(session_data["session"].created_at)
-            if (current_time - session_created).total_seconds() > 3600:  # 1 hour
-                expired_sessions.append(session_id)
-        
+        """Remove expired sessions"""
+        expired_sessions = rally_sessions.expire()
         for session_id in expired_sessions:
-            del rally_sessions[session_id]
             print(f"🧹 Cleaned up expired RequirementRally session: {session_id}")
-        
         return len(expired_sessions)
     
-    async def generate_rally_scenarios(category: Optional[str] = None, difficulty: Optional[str] = None, count: int = 5, language: str = 'es') -> List[Dict[str, Any]]:
+    async def generate_rally_scenarios(category: Optional[str] = None, difficulty: Optional[str] = None, count: int = 5, language: str = 'es', player: Optional[str] = None, rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
         """
         Generate scenarios for RequirementRally
         Primary: Use JSON database (reliable, fast)
@@ -149,7 +160,7 @@ try:
         
         # Primary approach: Use JSON database
         try:
-            scenarios = get_random_scenarios(count, category, difficulty, language)
+            scenarios = get_random_scenarios(count, category, difficulty, language, player=player, rng=rng)
             if scenarios and len(scenarios) >= count:
                 print(f"✅ Successfully loaded {len(scenarios)} scenarios from JSON database")
                 return scenarios
@@ -286,6 +297,7 @@ Return exactly {count} scenarios in valid JSON format."""
                 "validation": validation,
                 "server_info": {
                     "active_sessions": len(rally_sessions),
+                    "sessions": session_reaper.stats(),
                     "llm_available": llm_provider is not None
                 }
             }
@@ -304,29 +316,22 @@ Return exactly {count} scenarios in valid JSON format."""
             # Cleanup old sessions first
             cleanup_old_rally_sessions()
             
-            # Generate scenarios
-            scenarios = await generate_rally_scenarios(request.category, request.difficulty, 5, request.language)
+            session_id = str(uuid.uuid4())
+            
+            # Generate scenarios (an explicit seed replays them, bypassing the player's deck)
+            player = request.player_token or request.name if request.seed is None else None
+            scenarios = await generate_rally_scenarios(request.category, request.difficulty, 5, request.language, player, session_rng(session_id, request.seed))
             
             if not scenarios:
                 raise HTTPException(status_code=500, detail="Failed to generate scenarios")
             
-            # Create session
-            session_id = str(uuid.uuid4())
-            session = RallyGameSession(
-                id=session_id,
-                current_scenario=scenarios[0],
-                created_at=datetime.now().isoformat(),
-                category_filter=request.category,
-                difficulty_filter=request.difficulty
+            # Store the session with its scenario IDs
+            record = SessionRecord.for_scenarios(
+                session_id, "requirement_rally", scenarios, request.language, get_rally_scenario,
+                player=request.name, seed=request.seed,
+                category=request.category, difficulty=request.difficulty
             )
-            
-            # Store session data
-            rally_sessions[session_id] = {
-                "session": session,
-                "scenarios": scenarios,
-                "current_index": 0,
-                "player_name": request.name
-            }
+            session_id = rally_sessions.save(session_id, record)
             
             print(f"✅ Created RequirementRally session: {session_id[:8]}...")
             
@@ -334,6 +339,7 @@ Return exactly {count} scenarios in valid JSON format."""
                 "session_id": session_id,
                 "current_scenario": scenarios[0],
                 "total_scenarios": len(scenarios),
+                "seed": request.seed,
                 "game_info": {
                     "name": "RequirementRally",
                     "description": "Practice identifying requirement types",
@@ -347,52 +353,64 @@ Return exactly {count} scenarios in valid JSON format."""
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"Failed to create session: {str(e)}")
     
+    def rally_answer_response(record: SessionRecord, index: int, session_id: str) -> RallyGameResponse:
+        """Response to the answer of the scenario at index (also sent again to retries)"""
+        scenario = record.scenario(index, get_rally_scenario)
+        next_index = index + 1
+        return RallyGameResponse(
+            is_correct=record.is_correct(index),
+            correct_answer=scenario["options"][ord(scenario["correctOption"]) - ord('A')],
+            explanation=scenario["explanation"],
+            score=record.score,
+            next_scenario=record.scenario(next_index, get_rally_scenario) if next_index < len(record) else None,
+            game_completed=next_index >= len(record),
+            session_id=session_id
+        )
+    
     @app.post("/rally/session/{session_id}/submit")
-    async def submit_rally_answer(session_id: str, submission: RallyResponseSubmission):
-        """Submit an answer for RequirementRally"""
+    async def submit_rally_answer(
+        session_id: str,
+        submission: RallyResponseSubmission,
+        idempotency_key: Optional[str] = Header(None, max_length=128)
+    ):
+        """Submit an answer for RequirementRally (retries get the same result)"""
         try:
-            if session_id not in rally_sessions:
+            record = rally_sessions.get(session_id)
+            if record is None:
                 raise HTTPException(status_code=404, detail="Session not found")
             
-            session_data = rally_sessions[session_id]
-            session = session_data["session"]
-            scenarios = session_data["scenarios"]
-            current_index = session_data["current_index"]
+            replayed = record.replayed(idempotency_key, submission.scenario_index)
+            if replayed is not None:
+                print(f"🔁 Replaying RequirementRally answer to scenario {replayed + 1}")
+                return rally_answer_response(record, replayed, session_id)
             
-            if session.status != "active":
+            if record.status != "active":
                 raise HTTPException(status_code=400, detail="Session is not active")
             
-            current_scenario = scenarios[current_index]
+            if submission.scenario_index is not None and submission.scenario_index != record.cursor:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid scenario index. Expected {record.cursor}, got {submission.scenario_index}"
+                )
+            
+            current_index = record.cursor
+            current_scenario = record.scenario(current_index, get_rally_scenario)
             correct_option = current_scenario["correctOption"]
             is_correct = submission.selected_option.upper() == correct_option.upper()
             
-            # Update score and progress
-            if is_correct:
-                session.score += 10  # 10 points per correct answer
-            
-            session.scenarios_completed += 1
+            # Update score (10 points per correct answer) and progress
+            record.answer(is_correct, key=idempotency_key)
             
             # Check if game is completed
-            game_completed = current_index >= len(scenarios) - 1
-            next_scenario = None
-            
-            if not game_completed:
-                session_data["current_index"] += 1
-                next_scenario = scenarios[session_data["current_index"]]
-                session.current_scenario = next_scenario
+            if current_index < len(record) - 1:
+                record.cursor += 1
             else:
-                session.status = "completed"
+                record.finish()
             
             print(f"🎯 RequirementRally answer submitted: {submission.selected_option} ({'✅' if is_correct else '❌'})")
+            session_id = rally_sessions.save(session_id, record)
             
-            return RallyGameResponse(
-                is_correct=is_correct,
-                correct_answer=current_scenario["options"][ord(correct_option) - ord('A')],
-                explanation=current_scenario["explanation"],
-                score=session.score,
-                next_scenario=next_scenario,
-                game_completed=game_completed
-            )
+            return rally_answer_response(record, current_index, session_id)
             
         except HTTPException:
             raise
@@ -405,18 +423,27 @@ Return exactly {count} scenarios in valid JSON format."""
     async def get_rally_session(session_id: str):
         """Get RequirementRally session information"""
         try:
-            if session_id not in rally_sessions:
+            record = rally_sessions.get(session_id)
+            if record is None:
                 raise HTTPException(status_code=404, detail="Session not found")
             
-            session_data = rally_sessions[session_id]
-            session = session_data["session"]
+            session = RallyGameSession(
+                id=session_id,
+                current_scenario=record.scenario(record.cursor, get_rally_scenario),
+                status=record.status,
+                score=record.score,
+                scenarios_completed=record.answered,
+                created_at=record.created_at,
+                category_filter=record.category,
+                difficulty_filter=record.difficulty
+            )
             
             return {
                 "session": session.dict(),
-                "player_name": session_data["player_name"],
+                "player_name": record.player,
                 "progress": {
-                    "current": session_data["current_index"] + 1,
-                    "total": len(session_data["scenarios"])
+                    "current": record.cursor + 1,
+                    "total": len(record)
                 }
             }
             
@@ -4,81 +4,130 @@ Requirements scenarios database for RequirementRally game
 Handles loading and selection of requirement type scenarios from JSON file
 """
 
-import json
 import random
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from iso_standards_games.core.catalog import DIFFICULTY_ALIASES, ScenarioCatalog, build_snapshot
+from iso_standards_games.core.deck import DeckRegistry
+from iso_standards_games.core.scenario_pack import PackCatalog
+from iso_standards_games.core.scenario_store import StoreCatalog
+
+# Game ID of these scenarios in a compiled scenario pack
+GAME_ID = 'requirement_rally'
 
 # Path to the JSON file
 SCENARIOS_FILE = os.path.join(os.path.dirname(__file__), 'requirements_scenarios.json')
 
+# Fields stored as {language: value} dicts in the JSON file
+LOCALIZED_FIELDS = ('content', 'options', 'explanation')
+
+# Language used when a field has no translation for the requested language
+DEFAULT_LANGUAGE = 'es'
+
+# Alternative spellings accepted for the category filter (normalized at index build)
+CATEGORY_ALIASES = {
+    'Funcional': 'Functional',
+    'FR': 'Functional',
+    'No-Funcional': 'Non-Functional',
+    'NFR': 'Non-Functional',
+    'Restricción': 'Constraint',
+    'Restricciones': 'Constraint',
+    'Constraints': 'Constraint',
+}
+
+def localize_scenario(scenario: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """Resolve the per-language fields of a scenario, falling back to Spanish"""
+    localized = dict(scenario)
+    for field in LOCALIZED_FIELDS:
+        value = scenario.get(field)
+        if isinstance(value, dict):
+            empty = [] if field == 'options' else ''
+            localized[field] = value.get(language, value.get(DEFAULT_LANGUAGE, empty))
+    return localized
+
+def _facet_values(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Facets a scenario is indexed under (languages it is actually written in)"""
+    content = scenario.get('content')
+    return {
+        'category': scenario.get('category'),
+        'difficulty': scenario.get('difficulty'),
+        'language': list(content) if isinstance(content, dict) else [DEFAULT_LANGUAGE],
+    }
+
+def _build_snapshot(data: Dict[str, Any]):
+    """Pre-localize and index every scenario once per available language"""
+    languages = {DEFAULT_LANGUAGE}
+    for scenario in data.get('scenarios', []):
+        for field in LOCALIZED_FIELDS:
+            if isinstance(scenario.get(field), dict):
+                languages.update(scenario[field].keys())
+    return build_snapshot(
+        data, localize_scenario, sorted(languages), DEFAULT_LANGUAGE,
+        facet_values=_facet_values,
+        aliases={'category': CATEGORY_ALIASES, 'difficulty': DIFFICULTY_ALIASES},
+    )
+
+# Parsed and localized once per process and shared by every request
+source_catalog = ScenarioCatalog(SCENARIOS_FILE, build=_build_snapshot)
+
+# Served from the scenario database or the compiled scenario pack when configured
+_catalog = StoreCatalog(GAME_ID, fallback=PackCatalog(GAME_ID, fallback=source_catalog))
+
+# Per-player decks dealing each scenario once before repeating any
+_decks = DeckRegistry()
+
 def load_scenarios() -> Dict[str, Any]:
-    """Load scenarios from JSON file"""
-    try:
-        with open(SCENARIOS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"ERROR: Could not find scenarios file at {SCENARIOS_FILE}")
-        return {"scenarios": [], "game_info": {}}
-    except json.JSONDecodeError as e:
-        print(f"ERROR: Invalid JSON in scenarios file: {e}")
-        return {"scenarios": [], "game_info": {}}
-
-def get_random_scenarios(count: int = 5, category: Optional[str] = None, difficulty: Optional[str] = None, language: str = 'es') -> List[Dict[str, Any]]:
+    """Return the cached, read-only scenarios data (reloaded only if the file changed)"""
+    return _catalog.get().data
+
+def get_random_scenarios(count: int = 5, category: Optional[str] = None, difficulty: Optional[str] = None, language: str = 'es', player: Optional[str] = None, rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
     """
     Get random scenarios from the database
     
     Args:
         count: Number of scenarios to return (default 5)
-        category: Filter by category ('Functional', 'Non-Functional', 'Constraint')
+        category: Filter by category ('Functional', 'Non-Functional', 'Constraint');
+            case, separators and Spanish names are accepted
         difficulty: Filter by difficulty ('easy', 'medium', 'hard')
         language: Language for content ('en' or 'es')
+        player: Player name or device token; if given, scenarios are dealt
+            from the player's deck and do not repeat until the pool is exhausted
+        rng: Random generator of the session (the random module if None)
         
     Returns:
         List of scenario dictionaries with content localized to specified language
     """
-    data = load_scenarios()
-    scenarios = data.get('scenarios', [])
+    snapshot = _catalog.get()
+    scenarios = snapshot.scenarios
     
     if not scenarios:
         print("WARNING: No scenarios found in database")
         return []
     
-    # Filter by category if specified
-    if category:
-        scenarios = [s for s in scenarios if s.get('category', '').lower() == category.lower()]
-        print(f"Filtered to {len(scenarios)} scenarios for category: {category}")
-    
-    # Filter by difficulty if specified  
-    if difficulty:
-        scenarios = [s for s in scenarios if s.get('difficulty', '').lower() == difficulty.lower()]
-        print(f"Filtered to {len(scenarios)} scenarios for difficulty: {difficulty}")
+    # Precomputed facet bucket: prefer scenarios written in the requested
+    # language, falling back to translated ones if there are not enough
+    filters = {'category': category, 'difficulty': difficulty, 'language': language}
+    positions = snapshot.facets.bucket(**filters)
+    if len(positions) < count:
+        filters['language'] = None
+        positions = snapshot.facets.bucket(**filters)
+    if category or difficulty:
+        print(f"Filtered to {len(positions)} scenarios for category: {category}, difficulty: {difficulty}")
         
-    if len(scenarios) < count:
-        print(f"WARNING: Only {len(scenarios)} scenarios available, requested {count}")
-        count = len(scenarios)
-    
-    # Randomly select scenarios without replacement
-    selected = random.sample(scenarios, count)
+    if len(positions) < count:
+        print(f"WARNING: Only {len(positions)} scenarios available, requested {count}")
+        count = len(positions)
     
-    # Localize content to specified language
-    localized_scenarios = []
-    for scenario in selected:
-        localized = scenario.copy()
-        
-        # Localize content
-        if isinstance(scenario.get('content'), dict):
-            localized['content'] = scenario['content'].get(language, scenario['content'].get('es', ''))
-        
-        # Localize options
-        if isinstance(scenario.get('options'), dict):
-            localized['options'] = scenario['options'].get(language, scenario['options'].get('es', []))
-        
-        # Localize explanation
-        if isinstance(scenario.get('explanation'), dict):
-            localized['explanation'] = scenario['explanation'].get(language, scenario['explanation'].get('es', ''))
-        
-        localized_scenarios.append(localized)
+    # Randomly select scenarios without replacement (from the player's deck
+    # when there is one) and return the shared, pre-localized records
+    # (read-only, never copied per request)
+    if player is not None:
+        selected_positions = _decks.deal(player, snapshot.facets.key(**filters), positions, count, rng)
+    else:
+        selected_positions = (rng or random).sample(positions, count)
+    records = snapshot.records(language)
+    localized_scenarios = [records[i] for i in selected_positions]
     
     print(f"Selected {len(localized_scenarios)} random scenarios in {language}")
     for i, scenario in enumerate(localized_scenarios):
@@ -88,14 +137,37 @@ def get_random_scenarios(count: int = 5, category: Optional[str] = None, difficu
 
 def get_scenarios_by_category(category: str) -> List[Dict[str, Any]]:
     """Get all scenarios for a specific category"""
-    data = load_scenarios()
-    scenarios = data.get('scenarios', [])
-    
-    filtered = [s for s in scenarios if s.get('category') == category]
+    snapshot = _catalog.get()
+    filtered = [snapshot.scenarios[i] for i in snapshot.facets.bucket(category=category)]
     print(f"📂 Found {len(filtered)} scenarios for category: {category}")
     
     return filtered
 
+def get_scenario(scenario_id: str, language: str = 'es') -> Optional[Dict[str, Any]]:
+    """
+    Get the pre-localized record of a scenario by ID
+    
+    Returns:
+        The scenario, or None if it is not in the catalog
+    """
+    snapshot = _catalog.get()
+    position = snapshot.position(scenario_id)
+    if position is None:
+        return None
+    return snapshot.records(language)[position]
+
+def search_scenarios(query: str, language: str = 'es', limit: int = 10, offset: int = 0) -> Tuple[int, List[Tuple[float, Dict[str, Any]]]]:
+    """
+    Full-text search over the scenarios (accent-insensitive, every word must match)
+    
+    Returns:
+        Total number of hits and one page of (score, scenario) pairs, best first
+    """
+    snapshot = _catalog.get()
+    total, hits = snapshot.search_index().search(query, language, limit, offset)
+    records = snapshot.records(language)
+    return total, [(score, records[i]) for i, score in hits]
+
 def get_database_stats() -> Dict[str, Any]:
     """Get statistics about the scenarios database"""
     data = load_scenarios()
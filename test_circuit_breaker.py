@@ -0,0 +1,190 @@
+"""Tests of the circuit breaker around the LLM provider."""
+
+import asyncio
+
+from iso_standards_games.llm.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: Clock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "test", window=4, min_calls=2, failure_rate=0.5, slow_call_seconds=5, open_seconds=30, clock=clock
+    )
+
+
+def open_circuit(breaker: CircuitBreaker) -> None:
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(0.1, RuntimeError("down"))
+    assert breaker.state == OPEN
+
+
+def test_opens_at_the_failure_rate():
+    breaker = make_breaker(Clock())
+    breaker.record(0.1)
+    breaker.record(0.1, RuntimeError("down"))
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_needs_min_calls_before_opening():
+    breaker = make_breaker(Clock())
+    breaker.record(0.1, RuntimeError("down"))
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_count_as_failures():
+    breaker = make_breaker(Clock())
+    breaker.record(6.0)
+    breaker.record(7.0)
+    assert breaker.state == OPEN
+    assert breaker.slow_calls == 2
+    assert breaker.failures == 0
+
+
+def test_half_open_lets_a_single_probe_through():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    open_circuit(breaker)
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # A second call while the probe is in flight is rejected
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_the_circuit():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    open_circuit(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(0.2)
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_opens_the_circuit_again():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    open_circuit(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(0.2, RuntimeError("still down"))
+    assert breaker.state == OPEN
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_released_probe_lets_the_next_probe_through():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    open_circuit(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_cancelled_probe_is_released():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    open_circuit(breaker)
+    clock.now += 30
+
+    async def probe():
+        call = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        call.cancel()
+        try:
+            await call
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(probe())
+    # Abandoned before its outcome was known: neither success nor failure
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_abandoned_stream_probe_is_released():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    open_circuit(breaker)
+    clock.now += 30
+
+    async def chunks():
+        await asyncio.sleep(10)
+        yield "never"
+
+    async def probe():
+        stream = breaker.stream(chunks)
+        reader = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        reader.cancel()
+        try:
+            await reader
+        except asyncio.CancelledError:
+            pass
+        await stream.aclose()
+
+    asyncio.run(probe())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_open_circuit_fails_fast():
+    breaker = make_breaker(Clock())
+    open_circuit(breaker)
+    called = []
+
+    async def call():
+        called.append(True)
+        return "text"
+
+    async def scenario():
+        try:
+            await breaker.call(call)
+        except CircuitOpenError:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
+    assert not called
+
+
+def test_stream_records_its_outcome():
+    clock = Clock()
+    breaker = make_breaker(clock)
+
+    async def chunks():
+        yield "a"
+        yield "b"
+
+    async def read():
+        return [chunk async for chunk in breaker.stream(chunks)]
+
+    assert asyncio.run(read()) == ["a", "b"]
+    assert breaker.calls == 1
+    assert breaker.failures == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,100 @@
+"""Tests of the per-player non-repeating scenario decks."""
+
+import random
+
+from iso_standards_games.core.deck import Deck, DeckRegistry, Permutation
+
+
+def test_permutation_is_a_bijection():
+    # Powers of two, their neighbours and sizes with an odd bit length
+    for size in (1, 2, 3, 5, 7, 8, 9, 31, 32, 33, 100, 127, 128, 129, 1000, 4097):
+        for key in (0, 1, 0xDEADBEEF):
+            permutation = Permutation(size, key)
+            assert sorted(permutation[i] for i in range(size)) == list(range(size)), (size, key)
+
+
+def test_permutation_depends_on_the_key():
+    orders = {tuple(Permutation(50, key)[i] for i in range(50)) for key in range(5)}
+    assert len(orders) == 5
+
+
+def test_permutation_rejects_out_of_range_indexes():
+    permutation = Permutation(10, 1)
+    for index in (-1, 10):
+        try:
+            permutation[index]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError(f"index {index} was accepted")
+
+
+def test_deck_deals_every_card_before_repeating():
+    deck = Deck(seed=42, size=13)
+    dealt = []
+    for _ in range(4):
+        dealt.extend(deck.deal(3))
+    dealt.extend(deck.deal(1))
+    assert sorted(dealt) == list(range(13))
+
+
+def test_hand_across_a_reshuffle_has_no_duplicates():
+    deck = Deck(seed=7, size=5)
+    deck.deal(4)
+    for _ in range(20):
+        hand = deck.deal(3)
+        assert len(hand) == len(set(hand)) == 3
+
+
+def test_skipped_cards_are_passed_over():
+    excluded = {0, 1, 2}
+    for seed in range(20):
+        deck = Deck(seed=seed, size=10)
+        deck.deal(seed % 10)
+        # A full hand, even when the deck has to be reshuffled to complete it
+        hand = deck.deal(7, skip=lambda card: card in excluded)
+        assert sorted(hand) == list(range(3, 10)), seed
+
+
+def test_deal_stops_when_every_card_is_skipped():
+    deck = Deck(seed=3, size=4)
+    assert deck.deal(2, skip=lambda card: True) == []
+    assert len(Deck(seed=3, size=4).deal(10)) == 4
+
+
+def test_registry_excludes_positions_the_player_holds():
+    registry = DeckRegistry()
+    positions = list(range(100, 120))
+    rng = random.Random(1)
+    held = registry.deal("ana", "pool", positions, 5, rng)
+    topped_up = registry.deal("ana", "other pool", positions, 10, rng, exclude=set(held))
+    assert not set(held) & set(topped_up)
+    assert len(topped_up) == 10
+
+
+def test_registry_deals_the_whole_pool_per_player():
+    registry = DeckRegistry()
+    positions = list(range(0, 70, 7))
+    rng = random.Random(2)
+    seen = []
+    for _ in range(5):
+        seen.extend(registry.deal("ana", "pool", positions, 2, rng))
+    assert sorted(seen) == positions
+    # Another player has a deck of their own
+    assert len(registry.deal("bob", "pool", positions, 10, rng)) == 10
+
+
+def test_registry_forgets_the_least_recently_active_player():
+    registry = DeckRegistry(max_players=2)
+    positions = list(range(10))
+    for player in ("ana", "bob", "ana", "eve"):
+        registry.deal(player, "pool", positions, 1)
+    assert len(registry) == 2
+    assert set(registry._players) == {"ana", "eve"}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
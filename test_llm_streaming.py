@@ -0,0 +1,117 @@
+"""Tests of the incremental JSON array parser of streamed LLM responses."""
+
+import asyncio
+import json
+
+from iso_standards_games.llm.streaming import JSONArrayParser, iter_json_array
+
+ELEMENTS = [
+    {"content": "A \"quoted\" word, a [bracket] and a {brace}", "correctOption": "A"},
+    {"content": "Back\\slash at the end\\", "nested": {"list": [1, 2, {"x": "]}"}]}},
+    {"content": "Unicode éñ and an escaped \\u0041 and \\n", "correctOption": "D"},
+]
+TEXT = "```json\n{\"scenarios\": " + json.dumps(ELEMENTS) + "}\n```"
+
+
+def parse(chunks):
+    parser = JSONArrayParser()
+    elements = []
+    for chunk in chunks:
+        elements.extend(parser.feed(chunk))
+    return parser, elements
+
+
+def test_whole_text():
+    parser, elements = parse([TEXT])
+    assert elements == ELEMENTS
+    assert parser.finished
+
+
+def test_every_split_point():
+    # A chunk boundary anywhere: inside a string, after a backslash, inside \\u escapes
+    for cut in range(len(TEXT) + 1):
+        parser, elements = parse([TEXT[:cut], TEXT[cut:]])
+        assert elements == ELEMENTS, cut
+        assert parser.finished
+
+
+def test_one_character_chunks():
+    parser, elements = parse(list(TEXT))
+    assert elements == ELEMENTS
+    assert parser.finished
+
+
+def test_split_after_escaped_quote():
+    text = '[{"a": "x\\"}, {\\"y"}]'
+    for cut in range(len(text) + 1):
+        assert parse([text[:cut], text[cut:]])[1] == [{"a": 'x"}, {"y'}], cut
+
+
+def test_brackets_in_prose_before_the_array_are_skipped():
+    text = 'Here are the items [see below]:\n[{"a":1},{"a":2}]'
+    for cut in range(len(text) + 1):
+        parser, elements = parse([text[:cut], text[cut:]])
+        assert elements == [{"a": 1}, {"a": 2}], cut
+        assert parser.finished
+    parser, elements = parse(list("Options [ ] and [1, 2] first, then [\n  {\"b\": 3}\n]"))
+    assert elements == [{"b": 3}]
+    assert parser.finished
+
+
+def test_elements_are_returned_as_they_complete():
+    parser = JSONArrayParser()
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(': 2}') == [{"b": 2}]
+    assert not parser.finished
+    assert parser.feed("]") == []
+    assert parser.finished
+    # Text after the array is ignored
+    assert parser.feed('[{"c": 3}]') == []
+
+
+def test_invalid_element_is_skipped():
+    parser, elements = parse(['[{"a": 1}, {"b": oops}, {"c": 3}]'])
+    assert elements == [{"a": 1}, {"c": 3}]
+    assert parser.skipped == 1
+
+
+def test_iter_json_array_reads_the_stream_to_the_end():
+    read = []
+
+    async def chunks():
+        for chunk in (TEXT[:10], TEXT[10:80], TEXT[80:], "\ntrailing text"):
+            read.append(chunk)
+            yield chunk
+
+    async def collect():
+        return [element async for element in iter_json_array(chunks())]
+
+    assert asyncio.run(collect()) == ELEMENTS
+    assert len(read) == 4
+
+
+def test_iter_json_array_closes_an_abandoned_stream():
+    closed = []
+
+    async def chunks():
+        try:
+            for element in ELEMENTS:
+                yield json.dumps([element])[:-1] + ","
+        finally:
+            closed.append(True)
+
+    async def first():
+        elements = iter_json_array(chunks())
+        element = await elements.__anext__()
+        await elements.aclose()
+        return element
+
+    assert asyncio.run(first()) == ELEMENTS[0]
+    assert closed == [True]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
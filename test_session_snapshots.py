@@ -0,0 +1,126 @@
+"""Tests of the session snapshots of the in-memory stores (SessionReaper)."""
+
+import os
+import pickle
+import tempfile
+
+from iso_standards_games.core.config import settings
+from iso_standards_games.core.sessions import (
+    SNAPSHOT_MAGIC,
+    MemorySessionStore,
+    SessionReaper,
+    SessionRecord,
+    read_snapshot,
+)
+
+
+def make_record(session_id: str, game: str) -> SessionRecord:
+    record = SessionRecord(session_id, game, ["s-1", None, "s-3"], "en", player="ana", seed=7)
+    record.generated = {1: {"id": "llm-1", "content": "Generated"}}
+    record.answers = [("A", 1.5, 1000.0)]
+    record.last_answer = (0, "key-1")
+    record.cursor, record.score, record.correct = 1, 10, 0b1
+    return record
+
+
+def with_snapshot_setting(path, test):
+    configured = settings.SESSION_SNAPSHOT_PATH
+    settings.SESSION_SNAPSHOT_PATH = path
+    try:
+        test()
+    finally:
+        settings.SESSION_SNAPSHOT_PATH = configured
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.snapshot")
+        store = MemorySessionStore()
+        store["r"] = make_record("r", "quality_quest")
+        store["d"] = {"status": "playing", "score": 3}
+        assert SessionReaper({"quality_quest": store}, snapshot_path=path).snapshot() == 2
+
+        restored = MemorySessionStore()
+        assert SessionReaper({"quality_quest": restored}, snapshot_path=path).restore() == 2
+        assert restored["r"].state() == store["r"].state()
+        assert restored["d"] == {"status": "playing", "score": 3}
+
+
+def test_reapers_sharing_the_setting_keep_their_own_files():
+    with tempfile.TemporaryDirectory() as directory:
+        def test():
+            rally, universe = MemorySessionStore(), MemorySessionStore()
+            rally["r"] = make_record("r", "requirement_rally")
+            universe["u"] = make_record("u", "usability_universe")
+            rally_reaper = SessionReaper({"requirement_rally": rally})
+            universe_reaper = SessionReaper({"usability_universe": universe})
+            assert rally_reaper.snapshot_path != universe_reaper.snapshot_path
+            rally_reaper.snapshot()
+            universe_reaper.snapshot()
+
+            # Both games come back after a restart
+            rally, universe = MemorySessionStore(), MemorySessionStore()
+            assert SessionReaper({"requirement_rally": rally}).restore() == 1
+            assert SessionReaper({"usability_universe": universe}).restore() == 1
+            assert rally["r"].game == "requirement_rally"
+            assert universe["u"].game == "usability_universe"
+            # Only the snapshots are left, no temporary file
+            assert sorted(os.listdir(directory)) == [
+                "sessions.snapshot.requirement_rally",
+                "sessions.snapshot.usability_universe",
+            ]
+
+        with_snapshot_setting(os.path.join(directory, "sessions.snapshot"), test)
+
+
+def test_unset_setting_disables_snapshots():
+    def test():
+        reaper = SessionReaper({"quality_quest": MemorySessionStore()})
+        assert not reaper.snapshot_path
+        assert reaper.snapshot() == 0
+        assert reaper.restore() == 0
+
+    with_snapshot_setting(None, test)
+
+
+def test_pickle_snapshot_is_never_loaded():
+    executed = []
+
+    class Payload:
+        def __reduce__(self):
+            return (executed.append, ("pickle ran",))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.snapshot")
+        reaper = SessionReaper({"quality_quest": MemorySessionStore()}, snapshot_path=path)
+        reaper.snapshot()
+        with open(path, "rb") as snapshot:
+            header = snapshot.read(len(SNAPSHOT_MAGIC) + 10)
+        with open(path, "wb") as snapshot:
+            snapshot.write(header + pickle.dumps({"quality_quest": [Payload()]}))
+        assert read_snapshot(path) is None
+        assert reaper.restore() == 0
+        assert executed == []
+
+
+def test_malformed_sessions_are_skipped():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.snapshot")
+        store = MemorySessionStore()
+        store["r"] = make_record("r", "quality_quest")
+        SessionReaper({"quality_quest": store}, snapshot_path=path).snapshot()
+        with open(path, "rb") as snapshot:
+            data = snapshot.read()
+        # A record with missing fields
+        with open(path, "wb") as snapshot:
+            snapshot.write(data.replace(b'{"record":["r",', b'{"record":["r"],"x":[', 1))
+        restored = MemorySessionStore()
+        assert SessionReaper({"quality_quest": restored}, snapshot_path=path).restore() == 0
+        assert len(restored) == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,106 @@
+"""Tests of the signed session tokens (TokenSessionStore)."""
+
+from iso_standards_games.core.sessions import SessionRecord, TokenSessionStore
+
+SECRET = b"0123456789abcdef0123456789abcdef"
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_store(clock: Clock, secret: bytes = SECRET, game: str = "quality_quest") -> TokenSessionStore:
+    return TokenSessionStore(secret, game, ttl=60, clock=clock)
+
+
+def make_record(clock: Clock) -> SessionRecord:
+    record = SessionRecord("new", "quality_quest", ["qq-1", "qq-2", "qq-3"], "en", player="ana")
+    record.created = clock.now
+    return record
+
+
+def test_round_trip():
+    clock = Clock()
+    store = make_store(clock)
+    record = make_record(clock)
+    record.cursor, record.answered, record.score, record.correct = 1, 1, 10, 0b1
+    token = store.save(record.id, record)
+    restored = store.get(token)
+    assert restored is not None
+    assert restored.id == token
+    assert restored.scenario_ids == ("qq-1", "qq-2", "qq-3")
+    assert (restored.cursor, restored.score, restored.correct, restored.player) == (1, 10, 0b1, "ana")
+
+
+def test_forged_payload_is_rejected():
+    clock = Clock()
+    store = make_store(clock)
+    token = store.issue(make_record(clock))
+    mac, _, payload = token.partition(".")
+    other = store.issue(SessionRecord("x", "quality_quest", ["qq-9"], "es"))
+    # A valid payload under the signature of another token
+    assert store.get(f"{mac}.{other.partition('.')[2]}") is None
+    # A payload with one character changed
+    tampered = payload[:-2] + ("A" if payload[-2] != "A" else "B") + payload[-1]
+    assert store.get(f"{mac}.{tampered}") is None
+
+
+def test_token_of_another_secret_or_game_is_rejected():
+    clock = Clock()
+    token = make_store(clock).issue(make_record(clock))
+    assert make_store(clock, secret=b"another secret of thirty-two b!!").get(token) is None
+    assert make_store(clock, game="requirement_rally").get(token) is None
+
+
+def test_malformed_tokens_are_rejected():
+    store = make_store(Clock())
+    for token in ("", ".", "abc", "abc.def", "!!!.???", "a" * 500):
+        assert store.get(token) is None
+
+
+def test_expired_token_is_rejected():
+    clock = Clock()
+    store = make_store(clock)
+    token = store.issue(make_record(clock))
+    clock.now += 59
+    assert store.get(token) is not None
+    clock.now += 1
+    assert store.get(token) is None
+    assert not store.touch(token)
+
+
+def test_idle_timeout_bounds_the_deadline():
+    clock = Clock()
+    store = TokenSessionStore(SECRET, "quality_quest", ttl=60, idle_timeout=10, clock=clock)
+    record = make_record(clock)
+    token = store.issue(record)
+    clock.now += 9
+    # Saving again moves the idle deadline, never past the TTL
+    token = store.issue(store.get(token))
+    clock.now += 9
+    assert store.get(token) is not None
+    clock.now += 2
+    assert store.get(token) is None
+
+
+def test_generated_scenarios_cannot_be_carried():
+    clock = Clock()
+    record = make_record(clock)
+    record.generated = {0: {"id": "llm-1", "content": "..."}}
+    try:
+        make_store(clock).issue(record)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a record with generated scenarios was issued a token")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
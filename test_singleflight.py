@@ -0,0 +1,181 @@
+"""Tests of the coalescing of concurrent identical LLM calls (SingleFlight)."""
+
+import asyncio
+
+from iso_standards_games.llm.singleflight import SingleFlight
+
+
+class Generation:
+    """A call that counts its starts and waits until it is released."""
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"result {self.started}"
+
+    async def stream(self):
+        self.started += 1
+        try:
+            yield "a"
+            await self.release.wait()
+            yield "b"
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def test_concurrent_calls_share_one_generation():
+    async def scenario():
+        flights = SingleFlight(max_fan_in=8)
+        call = Generation()
+        callers = [asyncio.ensure_future(flights.run("k", call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        call.release.set()
+        results = await asyncio.gather(*callers)
+        return flights, call, results
+
+    flights, call, results = asyncio.run(scenario())
+    assert call.started == 1
+    assert results == ["result 1"] * 5
+    assert (flights.calls, flights.flights, flights.joined) == (5, 1, 4)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_fan_in_overflow_starts_another_generation():
+    async def scenario():
+        flights = SingleFlight(max_fan_in=2)
+        call = Generation()
+        callers = [asyncio.ensure_future(flights.run("k", call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        call.release.set()
+        return flights, call, await asyncio.gather(*callers)
+
+    flights, call, results = asyncio.run(scenario())
+    # 2 + 2 + 1 callers
+    assert call.started == 3
+    assert sorted(set(results)) == ["result 1", "result 2", "result 3"]
+    assert (flights.flights, flights.joined) == (3, 2)
+
+
+def test_different_keys_do_not_share():
+    async def scenario():
+        flights = SingleFlight(max_fan_in=8)
+        call = Generation()
+        callers = [asyncio.ensure_future(flights.run(key, call)) for key in ("a", "b")]
+        await asyncio.sleep(0)
+        call.release.set()
+        await asyncio.gather(*callers)
+        return call
+
+    assert asyncio.run(scenario()).started == 2
+
+
+def test_one_caller_leaving_does_not_cancel_the_others():
+    async def scenario():
+        flights = SingleFlight(max_fan_in=8)
+        call = Generation()
+        first = asyncio.ensure_future(flights.run("k", call))
+        second = asyncio.ensure_future(flights.run("k", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        call.release.set()
+        return call, first, await second
+
+    call, first, result = asyncio.run(scenario())
+    assert first.cancelled()
+    assert result == "result 1"
+    assert call.cancelled == 0
+
+
+def test_last_caller_leaving_cancels_the_generation():
+    async def scenario():
+        flights = SingleFlight(max_fan_in=8)
+        call = Generation()
+        callers = [asyncio.ensure_future(flights.run("k", call)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        # The next call starts a new generation
+        retry = asyncio.ensure_future(flights.run("k", call))
+        await asyncio.sleep(0)
+        call.release.set()
+        return flights, call, await retry
+
+    flights, call, result = asyncio.run(scenario())
+    assert call.cancelled == 1
+    assert call.started == 2
+    assert result == "result 2"
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_caller():
+    async def scenario():
+        flights = SingleFlight(max_fan_in=8)
+
+        async def failing():
+            await asyncio.sleep(0)
+            raise RuntimeError("model down")
+
+        callers = [asyncio.ensure_future(flights.run("k", failing)) for _ in range(3)]
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_late_stream_caller_replays_from_the_start():
+    async def read(flights, call):
+        return [chunk async for chunk in flights.stream("k", call.stream)]
+
+    async def scenario():
+        flights = SingleFlight(max_fan_in=8)
+        call = Generation()
+        first = asyncio.ensure_future(read(flights, call))
+        await asyncio.sleep(0.01)
+        # Joins after "a" was streamed
+        late = asyncio.ensure_future(read(flights, call))
+        await asyncio.sleep(0.01)
+        call.release.set()
+        return call, await first, await late
+
+    call, first, late = asyncio.run(scenario())
+    assert call.started == 1
+    assert first == late == ["a", "b"]
+
+
+def test_last_stream_caller_leaving_cancels_the_generation():
+    async def scenario():
+        flights = SingleFlight(max_fan_in=8)
+        call = Generation()
+        streams = [flights.stream("k", call.stream) for _ in range(2)]
+        for stream in streams:
+            assert await stream.__anext__() == "a"
+        await streams[0].aclose()
+        await asyncio.sleep(0)
+        assert call.cancelled == 0
+        await streams[1].aclose()
+        await asyncio.sleep(0.01)
+        return flights, call
+
+    flights, call = asyncio.run(scenario())
+    assert call.cancelled == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
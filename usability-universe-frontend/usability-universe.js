@@ -360,6 +360,11 @@ async function submitAnswer() {
         const result = await response.json();
         console.log('Answer result:', result);
         
+        // In token mode the session ID changes with every answer
+        if (result.session_id) {
+            currentSession.id = result.session_id;
+        }
+        
         // Update game state
         gameState.score = result.score;
         scoreDisplay.textContent = gameState.score;
@@ -4,102 +4,101 @@ Usability scenarios database for UsabilityUniverse game
 Handles loading and selection of usability principle scenarios from JSON file
 """
 
-import json
 import random
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from iso_standards_games.core.catalog import DIFFICULTY_ALIASES, ScenarioCatalog, build_snapshot
+from iso_standards_games.core.deck import DeckRegistry
+from iso_standards_games.core.scenario_pack import PackCatalog
+from iso_standards_games.core.scenario_store import StoreCatalog
+
+# Game ID of these scenarios in a compiled scenario pack
+GAME_ID = 'usability_universe'
 
 # Path to the JSON file
 SCENARIOS_FILE = os.path.join(os.path.dirname(__file__), 'usability_scenarios.json')
 
-# Global tracker for recently used scenarios to avoid repetition
-_recently_used_scenarios = []
-_max_recent_scenarios = 10  # Keep track of last 10 used scenarios
+# Language of the unsuffixed 'content'/'feedback' fields
+DEFAULT_LANGUAGE = 'en'
+
+# Alternative spellings accepted for the category filter (normalized at index build)
+CATEGORY_ALIASES = {
+    'Aprendibilidad': 'Learnability',
+    'Facilidad de aprendizaje': 'Learnability',
+    'Eficiencia': 'Efficiency',
+    'Memorabilidad': 'Memorability',
+    'Prevención de errores': 'Error_Prevention',
+    'Error Tolerance': 'Error_Prevention',
+    'Satisfacción': 'User_Satisfaction',
+    'Satisfacción del usuario': 'User_Satisfaction',
+    'Satisfaction': 'User_Satisfaction',
+}
+
+# Per-player decks dealing each scenario once before repeating any
+_decks = DeckRegistry()
+
+# Deck shared by callers asking for new scenarios without naming a player
+ANONYMOUS_PLAYER = '*'
 
 def load_scenarios() -> Dict[str, Any]:
-    """Load scenarios from JSON file"""
-    try:
-        with open(SCENARIOS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"ERROR: Could not find scenarios file at {SCENARIOS_FILE}")
-        return {"scenarios": [], "game_info": {}}
-    except json.JSONDecodeError as e:
-        print(f"ERROR: Invalid JSON in scenarios file: {e}")
-        return {"scenarios": [], "game_info": {}}
-
-def get_random_scenarios(count: int = 5, category: Optional[str] = None, difficulty: Optional[str] = None, language: str = 'en', force_new_selection: bool = False) -> List[Dict[str, Any]]:
+    """Return the cached, read-only scenarios data (reloaded only if the file changed)"""
+    return _catalog.get().data
+
+def get_random_scenarios(count: int = 5, category: Optional[str] = None, difficulty: Optional[str] = None, language: str = 'en', force_new_selection: bool = False, player: Optional[str] = None, rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
     """
     Get random scenarios from the database with improved variety to avoid repetition
     
     Args:
         count: Number of scenarios to return (default 5)
-        category: Filter by category ('Learnability', 'Efficiency', 'Memorability', 'Error_Prevention', 'User_Satisfaction')
+        category: Filter by category ('Learnability', 'Efficiency', 'Memorability', 'Error_Prevention', 'User_Satisfaction');
+            case, separators and Spanish names are accepted
         difficulty: Filter by difficulty ('easy', 'medium', 'hard')
         language: Language for content ('en' or 'es', default 'en')
-        force_new_selection: If True, prioritize scenarios not used recently
+        force_new_selection: If True, deal from a deck so scenarios do not
+            repeat until the pool is exhausted (shared deck if no player)
+        player: Player name or device token whose own deck is dealt from
+        rng: Random generator of the session (the random module if None)
         
     Returns:
         List of scenario dictionaries with content localized to specified language
     """
-    global _recently_used_scenarios
-    
-    data = load_scenarios()
-    scenarios = data.get('scenarios', [])
+    snapshot = _catalog.get()
+    scenarios = snapshot.scenarios
     
     if not scenarios:
         print("WARNING: No scenarios found in database")
         return []
     
-    # Filter by category if specified
-    if category:
-        scenarios = [s for s in scenarios if s.get('category', '').lower() == category.lower()]
-        print(f"Filtered to {len(scenarios)} scenarios for category: {category}")
-    
-    # Filter by difficulty if specified
-    if difficulty:
-        scenarios = [s for s in scenarios if s.get('difficulty', '').lower() == difficulty.lower()]
-        print(f"Filtered to {len(scenarios)} scenarios for difficulty: {difficulty}")
+    # Precomputed facet bucket: prefer scenarios written in the requested
+    # language, falling back to translated ones if there are not enough
+    filters = {'category': category, 'difficulty': difficulty, 'language': language}
+    positions = snapshot.facets.bucket(**filters)
+    if len(positions) < count:
+        filters['language'] = None
+        positions = snapshot.facets.bucket(**filters)
+    if category or difficulty:
+        print(f"Filtered to {len(positions)} scenarios for category: {category}, difficulty: {difficulty}")
 
-    if not scenarios:
+    if not positions:
         print("WARNING: No scenarios match the specified filters")
         return []
 
-    # Prioritize scenarios not used recently if force_new_selection is True
-    if force_new_selection and _recently_used_scenarios:
-        unused_scenarios = [s for s in scenarios if s.get('id') not in _recently_used_scenarios]
-        if unused_scenarios:
-            scenarios = unused_scenarios
-            print(f"Prioritizing {len(scenarios)} unused scenarios to avoid repetition")
-        else:
-            print("All scenarios have been used recently, selecting from full pool")
-    
-    # Select random scenarios
-    selected_count = min(count, len(scenarios))
-    selected_scenarios = random.sample(scenarios, selected_count)
-    
-    # Update recently used tracker
-    for scenario in selected_scenarios:
-        scenario_id = scenario.get('id')
-        if scenario_id:
-            if scenario_id in _recently_used_scenarios:
-                _recently_used_scenarios.remove(scenario_id)  # Remove if already present
-            _recently_used_scenarios.append(scenario_id)  # Add to end
-    
-    # Keep only the most recent scenarios in tracker
-    if len(_recently_used_scenarios) > _max_recent_scenarios:
-        _recently_used_scenarios = _recently_used_scenarios[-_max_recent_scenarios:]
-    
-    print(f"Selected {selected_count} scenarios in language: {language}")
-    print(f"Recently used scenarios tracker: {len(_recently_used_scenarios)} scenarios")
-    
-    # Localize content to specified language
-    localized_scenarios = []
-    for scenario in selected_scenarios:
-        localized_scenario = localize_scenario(scenario, language)
-        localized_scenarios.append(localized_scenario)
-
-    return localized_scenarios
+    records = snapshot.records(language)
+    
+    # Deal from the player's deck (O(1) per scenario, no repeats until the
+    # pool is exhausted), or sample freely
+    if player is None and force_new_selection:
+        player = ANONYMOUS_PLAYER
+    if player is not None:
+        selected_positions = _decks.deal(player, snapshot.facets.key(**filters), positions, count, rng)
+    else:
+        selected_positions = (rng or random).sample(positions, min(count, len(positions)))
+    
+    print(f"Selected {len(selected_positions)} scenarios in language: {language}")
+    
+    # Return the shared, pre-localized records (read-only, never copied per request)
+    return [records[i] for i in selected_positions]
 
 def localize_scenario(scenario: Dict[str, Any], language: str) -> Dict[str, Any]:
     """
@@ -140,6 +139,67 @@ def localize_scenario(scenario: Dict[str, Any], language: str) -> Dict[str, Any]
     
     return localized
 
+def detect_languages(scenarios: List[Dict[str, Any]]) -> List[str]:
+    """Detect the languages available through content_<lang>/feedback_<lang> keys"""
+    languages = set([DEFAULT_LANGUAGE])  # English is always assumed to be available
+    for scenario in scenarios:
+        for key in scenario.keys():
+            if key.startswith('content_') and key != 'content':
+                lang = key.replace('content_', '')
+                languages.add(lang)
+            elif key.startswith('feedback_') and key != 'feedback':
+                lang = key.replace('feedback_', '')
+                languages.add(lang)
+    return sorted(languages)
+
+def _facet_values(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Facets a scenario is indexed under (languages it is actually written in)"""
+    return {
+        'category': scenario.get('category'),
+        'difficulty': scenario.get('difficulty'),
+        'language': detect_languages([scenario]),
+    }
+
+def _build_snapshot(data: Dict[str, Any]):
+    """Pre-localize and index every scenario once per available language"""
+    languages = detect_languages(data.get('scenarios', []))
+    return build_snapshot(
+        data, localize_scenario, languages, DEFAULT_LANGUAGE,
+        facet_values=_facet_values,
+        aliases={'category': CATEGORY_ALIASES, 'difficulty': DIFFICULTY_ALIASES},
+    )
+
+# Parsed and localized once per process and shared by every request
+source_catalog = ScenarioCatalog(SCENARIOS_FILE, build=_build_snapshot)
+
+# Served from the scenario database or the compiled scenario pack when configured
+_catalog = StoreCatalog(GAME_ID, fallback=PackCatalog(GAME_ID, fallback=source_catalog))
+
+def get_scenario(scenario_id: str, language: str = 'en') -> Optional[Dict[str, Any]]:
+    """
+    Get the pre-localized record of a scenario by ID
+    
+    Returns:
+        The scenario, or None if it is not in the catalog
+    """
+    snapshot = _catalog.get()
+    position = snapshot.position(scenario_id)
+    if position is None:
+        return None
+    return snapshot.records(language)[position]
+
+def search_scenarios(query: str, language: str = 'en', limit: int = 10, offset: int = 0) -> Tuple[int, List[Tuple[float, Dict[str, Any]]]]:
+    """
+    Full-text search over the scenarios (accent-insensitive, every word must match)
+    
+    Returns:
+        Total number of hits and one page of (score, scenario) pairs, best first
+    """
+    snapshot = _catalog.get()
+    total, hits = snapshot.search_index().search(query, language, limit, offset)
+    records = snapshot.records(language)
+    return total, [(score, records[i]) for i, score in hits]
+
 def get_database_stats() -> Dict[str, Any]:
     """Get statistics about the scenarios database"""
     data = load_scenarios()
@@ -166,15 +226,7 @@ def get_database_stats() -> Dict[str, Any]:
         difficulties[diff] = difficulties.get(diff, 0) + 1
     
     # Detect available languages
-    languages = set(['en'])  # English is always assumed to be available
-    for scenario in scenarios:
-        for key in scenario.keys():
-            if key.startswith('content_') and key != 'content':
-                lang = key.replace('content_', '')
-                languages.add(lang)
-            elif key.startswith('feedback_') and key != 'feedback':
-                lang = key.replace('feedback_', '')
-                languages.add(lang)
+    languages = _catalog.get().languages
     
     return {
         'total_scenarios': len(scenarios),
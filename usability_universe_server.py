@@ -8,6 +8,7 @@ import sys
 import os
 import traceback
 import uuid
+import time
 import json
 import asyncio
 from typing import Dict, Any, Optional, List
@@ -20,14 +21,16 @@ try:
     print("Importing required modules...")
     
     # FastAPI and related imports
-    from fastapi import FastAPI, HTTPException, Request
+    from fastapi import FastAPI, Header, HTTPException, Request
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.staticfiles import StaticFiles
     from fastapi.responses import FileResponse
     from pydantic import BaseModel
     
     # Import the usability scenarios database
-    from usability_scenarios_db import get_random_scenarios, get_database_stats, validate_scenarios
+    from usability_scenarios_db import get_random_scenarios, get_database_stats, validate_scenarios, get_scenario
+    from iso_standards_games.core.sampling import session_rng
+    from iso_standards_games.core.sessions import SessionReaper, SessionRecord, SessionStore, game_store
     
     print("All modules imported successfully")
     
@@ -37,6 +40,8 @@ try:
         category: Optional[str] = None  # 'Learnability', 'Efficiency', 'Memorability', 'Error_Prevention', 'User_Satisfaction', or None for mixed
         difficulty: Optional[str] = None  # 'easy', 'medium', 'hard', or None for mixed
         language: str = 'en'  # Default to English
+        player_token: Optional[str] = None  # Device token; the player's name is used if missing
+        seed: Optional[int] = None  # Replays a session: same seed and filters, same scenarios
         scenario_count: int = 5
 
     class UniverseAnswerRequest(BaseModel):
@@ -50,6 +55,7 @@ try:
         current_scenario: Dict[str, Any]
         total_scenarios: int
         current_index: int
+        seed: Optional[int] = None
 
     class UniverseAnswerResponse(BaseModel):
         correct: bool
@@ -60,6 +66,7 @@ try:
         game_completed: bool = False
         final_score: Optional[int] = None
         total_scenarios: Optional[int] = None
+        session_id: Optional[str] = None  # Changes with every answer in token mode
 
 except ImportError as e:
     print(f"Error importing modules: {e}")
@@ -83,8 +90,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Session storage (in production, use a proper database)
-universe_sessions: Dict[str, Dict[str, Any]] = {}
+# Session storage (in production, use a proper database), expired after the
+# configured TTL / idle timeout; this server keeps its 24-hour lifetime unless
+# USABILITY_UNIVERSE_SESSION_TTL is set
+universe_sessions: SessionStore = game_store("usability_universe", default_ttl=24 * 60 * 60)
+session_reaper = SessionReaper({"usability_universe": universe_sessions})
 
 @app.get("/")
 async def root():
@@ -115,7 +125,8 @@ async def get_stats():
         return {
             "database_stats": stats,
             "validation": validation,
-            "active_sessions": len(universe_sessions)
+            "active_sessions": len(universe_sessions),
+            "sessions": session_reaper.stats()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
@@ -135,7 +146,9 @@ async def create_session(request: UniverseSessionCreateRequest):
             count=request.scenario_count,
             category=request.category,
             difficulty=request.difficulty,
-            language=request.language
+            language=request.language,
+            player=request.player_token or request.name if request.seed is None else None,
+            rng=session_rng(session_id, request.seed)
         )
         
         if not scenarios:
@@ -144,22 +157,15 @@ async def create_session(request: UniverseSessionCreateRequest):
                 detail=f"No scenarios found for category: {request.category}, difficulty: {request.difficulty}"
             )
         
-        # Create session
-        session_data = {
-            "id": session_id,
-            "player_name": request.name,
-            "category": request.category,
-            "difficulty": request.difficulty,
-            "language": request.language,
-            "scenarios": scenarios,
-            "current_index": 0,
-            "score": 0,
-            "answers": [],
-            "created_at": datetime.now().isoformat(),
-            "completed": False
-        }
+        # Create session (scenarios are stored by ID)
+        session = SessionRecord.for_scenarios(
+            session_id, "usability_universe", scenarios, request.language, get_scenario,
+            player=request.name, seed=request.seed,
+            category=request.category, difficulty=request.difficulty
+        )
+        session.answers = []
         
-        universe_sessions[session_id] = session_data
+        session_id = universe_sessions.save(session_id, session)
         
         print(f"Session created with {len(scenarios)} scenarios")
         
@@ -170,7 +176,8 @@ async def create_session(request: UniverseSessionCreateRequest):
             id=session_id,
             current_scenario=current_scenario,
             total_scenarios=len(scenarios),
-            current_index=0
+            current_index=0,
+            seed=request.seed
         )
         
     except HTTPException:
@@ -180,80 +187,73 @@ async def create_session(request: UniverseSessionCreateRequest):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error creating session: {str(e)}")
 
+def answer_response(session: SessionRecord, index: int, session_id: str) -> UniverseAnswerResponse:
+    """Response to the answer of the scenario at index (also sent again to retries)"""
+    scenario = session.scenario(index, get_scenario)
+    game_completed = index + 1 >= len(session)
+    return UniverseAnswerResponse(
+        correct=session.is_correct(index),
+        correct_answer=scenario["correct_answer"],
+        feedback=scenario.get("feedback", "No feedback available"),
+        score=session.score,
+        next_scenario=None if game_completed else session.scenario(index + 1, get_scenario),
+        game_completed=game_completed,
+        final_score=session.score if game_completed else None,
+        total_scenarios=len(session) if game_completed else None,
+        session_id=session_id
+    )
+
 @app.post("/universe/answer", response_model=UniverseAnswerResponse)
-async def submit_answer(request: UniverseAnswerRequest):
-    """Submit an answer for evaluation"""
+async def submit_answer(request: UniverseAnswerRequest, idempotency_key: Optional[str] = Header(None, max_length=128)):
+    """Submit an answer for evaluation (retries of the last answer get the same result)"""
     try:
         # Get session
-        if request.session_id not in universe_sessions:
+        session = universe_sessions.get(request.session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session = universe_sessions[request.session_id]
+        # A retry of the last answer (same key or scenario index) is not evaluated again
+        replayed = session.replayed(idempotency_key, request.scenario_index)
+        if replayed is not None:
+            print(f"Replaying answer to scenario {replayed}")
+            return answer_response(session, replayed, request.session_id)
         
-        if session["completed"]:
+        if session.finished is not None:
             raise HTTPException(status_code=400, detail="Session already completed")
         
         # Validate scenario index
-        if request.scenario_index != session["current_index"]:
+        if request.scenario_index != session.cursor:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Invalid scenario index. Expected {session['current_index']}, got {request.scenario_index}"
+                detail=f"Invalid scenario index. Expected {session.cursor}, got {request.scenario_index}"
             )
         
         # Get current scenario
-        scenarios = session["scenarios"]
-        if request.scenario_index >= len(scenarios):
+        current_scenario = session.current(get_scenario)
+        if current_scenario is None:
             raise HTTPException(status_code=400, detail="Scenario index out of range")
         
-        current_scenario = scenarios[request.scenario_index]
         correct_answer = current_scenario["correct_answer"]
         
-        # Evaluate answer
+        # Evaluate answer and update score
         is_correct = request.selected_answer.lower() == correct_answer.lower()
+        session.answer(is_correct, key=idempotency_key)
         
-        # Update score
-        points = 10 if is_correct else 0
-        session["score"] += points
-        
-        # Record answer
-        answer_record = {
-            "scenario_index": request.scenario_index,
-            "scenario_id": current_scenario.get("id", f"scenario_{request.scenario_index}"),
-            "selected_answer": request.selected_answer,
-            "correct_answer": correct_answer,
-            "is_correct": is_correct,
-            "points": points,
-            "time_taken": request.time_taken,
-            "timestamp": datetime.now().isoformat()
-        }
-        session["answers"].append(answer_record)
+        # Record answer (the rest of its details are derived when reported)
+        session.answers.append((request.selected_answer, request.time_taken, time.time()))
         
         # Move to next scenario
-        session["current_index"] += 1
+        session.cursor += 1
         
         # Check if game completed
-        game_completed = session["current_index"] >= len(scenarios)
+        game_completed = session.cursor >= len(session)
         if game_completed:
-            session["completed"] = True
-            session["completed_at"] = datetime.now().isoformat()
-        
-        # Get next scenario
-        next_scenario = None
-        if not game_completed and session["current_index"] < len(scenarios):
-            next_scenario = scenarios[session["current_index"]]
+            session.finish()
         
-        print(f"Answer submitted: {is_correct}, Score: {session['score']}, Completed: {game_completed}")
+        print(f"Answer submitted: {is_correct}, Score: {session.score}, Completed: {game_completed}")
+        session_id = universe_sessions.save(request.session_id, session)
         
-        return UniverseAnswerResponse(
-            correct=is_correct,
-            correct_answer=correct_answer,
-            feedback=current_scenario.get("feedback", "No feedback available"),
-            score=session["score"],
-            next_scenario=next_scenario,
-            game_completed=game_completed,
-            final_score=session["score"] if game_completed else None,
-            total_scenarios=len(scenarios) if game_completed else None
-        )
+        return answer_response(session, request.scenario_index, session_id)
         
     except HTTPException:
         raise
@@ -265,31 +265,49 @@ async def submit_answer(request: UniverseAnswerRequest):
 @app.get("/universe/session/{session_id}")
 async def get_session(session_id: str):
     """Get session information"""
-    if session_id not in universe_sessions:
+    session = universe_sessions.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = universe_sessions[session_id]
-    
     # Don't expose scenarios in session info (they should be requested individually)
     safe_session = {
-        "id": session["id"],
-        "player_name": session["player_name"],
-        "category": session["category"],
-        "difficulty": session["difficulty"],
-        "language": session["language"],
-        "current_index": session["current_index"],
-        "score": session["score"],
-        "total_scenarios": len(session["scenarios"]),
-        "completed": session["completed"],
-        "created_at": session["created_at"]
+        "id": session.id,
+        "player_name": session.player,
+        "category": session.category,
+        "difficulty": session.difficulty,
+        "language": session.language,
+        "current_index": session.cursor,
+        "score": session.score,
+        "total_scenarios": len(session),
+        "completed": session.finished is not None,
+        "created_at": session.created_at
     }
     
-    if session["completed"]:
-        safe_session["completed_at"] = session.get("completed_at")
-        safe_session["answers"] = session["answers"]
+    if session.finished is not None:
+        safe_session["completed_at"] = session.finished_at
+        safe_session["answers"] = [
+            answer_report(session, index, answer)
+            for index, answer in enumerate(session.answers or [])
+        ]
     
     return safe_session
 
+def answer_report(session: SessionRecord, index: int, answer: tuple) -> Dict[str, Any]:
+    """Full report of a recorded (selected answer, time taken, timestamp) answer"""
+    selected_answer, time_taken, timestamp = answer
+    scenario = session.scenario(index, get_scenario)
+    is_correct = session.is_correct(index)
+    return {
+        "scenario_index": index,
+        "scenario_id": scenario.get("id", f"scenario_{index}"),
+        "selected_answer": selected_answer,
+        "correct_answer": scenario["correct_answer"],
+        "is_correct": is_correct,
+        "points": 10 if is_correct else 0,
+        "time_taken": time_taken,
+        "timestamp": datetime.fromtimestamp(timestamp).isoformat()
+    }
+
 @app.delete("/universe/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete a session"""
@@ -299,10 +317,12 @@ async def delete_session(session_id: str):
     del universe_sessions[session_id]
     return {"message": "Session deleted successfully"}
 
-# Cleanup old sessions (simple cleanup - in production use proper job scheduling)
 @app.on_event("startup")
 async def startup_event():
     print("UsabilityUniverse Game Server starting up...")
+    # Reload the sessions of the last snapshot before serving
+    session_reaper.restore()
+    session_reaper.start()
     
     # Validate scenarios database
     try:
@@ -320,26 +340,9 @@ async def startup_event():
     except Exception as e:
         print(f"Error during startup validation: {e}")
 
-async def cleanup_old_sessions():
-    """Clean up sessions older than 24 hours"""
-    try:
-        current_time = datetime.now()
-        to_delete = []
-        
-        for session_id, session in universe_sessions.items():
-            created_at = datetime.fromisoformat(session["created_at"])
-            age = current_time - created_at
-            
-            # Delete sessions older than 24 hours
-            if age.total_seconds() > 24 * 60 * 60:
-                to_delete.append(session_id)
-        
-        for session_id in to_delete:
-            del universe_sessions[session_id]
-            print(f"Cleaned up old session: {session_id}")
-            
-    except Exception as e:
-        print(f"Error during cleanup: {e}")
+@app.on_event("shutdown")
+async def shutdown_event():
+    await session_reaper.stop()
 
 if __name__ == "__main__":
     import uvicorn